@@ -0,0 +1,705 @@
+#!/usr/bin/env python3
+"""
+Benchmark script for Packet Odyssey
+Measures the bulk code paths against their per-packet Scapy equivalents
+"""
+
+import sys
+import os
+import time
+
+# Add current directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+def _timed(func, *args):
+    """Run func once and return (result, seconds)"""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+def benchmark_frame_builder(count: int = 5000) -> float:
+    """Compare FrameBuilder.build_many against bytes(create_scapy_packet())"""
+    from layers import PacketEncapsulator
+    
+    print(f"\n⏱️ Frame generation ({count} frames)...")
+    encapsulator = PacketEncapsulator()
+    stacks = list(encapsulator.encapsulate_many(
+        (f"host{i}.example.com", f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}") for i in range(count)
+    ))
+    
+    batch, native_time = _timed(encapsulator.build_frames, stacks)
+    _, scapy_time = _timed(lambda: [bytes(encapsulator.create_scapy_packet(data)) for data in stacks])
+    
+    speedup = scapy_time / native_time
+    print(f"  FrameBuilder: {native_time * 1000:.1f} ms ({count / native_time:.0f} frames/s, {batch.total_bytes} bytes)")
+    print(f"  Scapy:        {scapy_time * 1000:.1f} ms ({count / scapy_time:.0f} frames/s)")
+    print(f"  Speedup:      {speedup:.1f}x")
+    return speedup
+
+def benchmark_template_cache(count: int = 50000) -> float:
+    """Compare template patching against full frame serialization"""
+    from layers import PacketEncapsulator
+    
+    print(f"\n⏱️ Template cache patching ({count} frames)...")
+    encapsulator = PacketEncapsulator()
+    data = encapsulator.encapsulate_many([("example.com", "93.184.216.34")])[0]
+    variations = [
+        {"identification": i & 0xFFFF, "source_port": 49152 + i % 16384, "sequence_number": 1000 + i * 1460}
+        for i in range(count)
+    ]
+    
+    def full_rebuild():
+        network, transport = dict(data["network"]), dict(data["transport"])
+        stack = dict(data, network=network, transport=transport)
+        frame_length = encapsulator.frame_builder.frame_length(stack)
+        buffer = bytearray(frame_length * count)
+        view = memoryview(buffer)
+        for index, fields in enumerate(variations):
+            network["identification"] = fields["identification"]
+            transport["source_port"] = fields["source_port"]
+            transport["sequence_number"] = fields["sequence_number"]
+            encapsulator.frame_builder.write_frame(stack, view, index * frame_length)
+        return buffer
+    
+    _, patched_time = _timed(encapsulator.generate_frames, data, variations)
+    _, rebuild_time = _timed(full_rebuild)
+    
+    speedup = rebuild_time / patched_time
+    print(f"  Template patching: {patched_time * 1000:.1f} ms ({count / patched_time:.0f} frames/s)")
+    print(f"  Full rebuild:      {rebuild_time * 1000:.1f} ms ({count / rebuild_time:.0f} frames/s)")
+    print(f"  Speedup:           {speedup:.1f}x")
+    return speedup
+
+def benchmark_dissector(count: int = 5000) -> float:
+    """Compare lazy FrameView dissection against Scapy dissection"""
+    from scapy.all import Ether, IP, TCP
+    from dissector import dissect
+    from layers import PacketEncapsulator
+    
+    print(f"\n⏱️ Frame dissection ({count} frames)...")
+    encapsulator = PacketEncapsulator()
+    frames = [bytes(frame) for frame in encapsulator.build_frames(encapsulator.encapsulate_many(
+        (f"host{i}.example.com", f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}") for i in range(count)
+    ))]
+    
+    def native():
+        return [dissect(frame).summary() for frame in frames]
+    
+    def scapy():
+        records = []
+        for frame in frames:
+            packet = Ether(frame)
+            records.append((packet[IP].src, packet[IP].dst, packet[TCP].sport, packet[TCP].dport, str(packet[TCP].flags)))
+        return records
+    
+    _, native_time = _timed(native)
+    _, scapy_time = _timed(scapy)
+    
+    speedup = scapy_time / native_time
+    print(f"  FrameView: {native_time * 1000:.1f} ms ({count / native_time:.0f} frames/s)")
+    print(f"  Scapy:     {scapy_time * 1000:.1f} ms ({count / scapy_time:.0f} frames/s)")
+    print(f"  Speedup:   {speedup:.1f}x")
+    return speedup
+
+def benchmark_header_records(count: int = 20000) -> float:
+    """Compare per-packet memory of slotted header records and layer dicts"""
+    import tracemalloc
+    from layers import PacketEncapsulator
+    
+    print(f"\n⏱️ Encapsulated batch memory ({count} packets)...")
+    encapsulator = PacketEncapsulator()
+    pairs = [(f"host{i}.example.com", "93.184.216.34") for i in range(count)]
+    
+    def measure(compact):
+        tracemalloc.start()
+        batch, elapsed = _timed(encapsulator.encapsulate_many, pairs, compact)
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return size / len(batch), elapsed
+    
+    record_size, record_time = measure(True)
+    dict_size, dict_time = measure(False)
+    
+    ratio = dict_size / record_size
+    print(f"  Header records: {record_size:.0f} bytes/packet, {record_time * 1000:.1f} ms")
+    print(f"  Layer dicts:    {dict_size:.0f} bytes/packet, {dict_time * 1000:.1f} ms")
+    print(f"  Memory ratio:   {ratio:.1f}x")
+    return ratio
+
+def benchmark_layer_profiles(count: int = 50000) -> float:
+    """Compare compiled profiles against per-layer dispatch on a mixed-protocol batch"""
+    from layers import PacketEncapsulator, LAYER_PROFILES
+    
+    print(f"\n⏱️ Mixed-profile encapsulation ({count} packets)...")
+    encapsulator = PacketEncapsulator()
+    profiles = list(LAYER_PROFILES)
+    items = [(f"host{i}.example.com", "93.184.216.34", profiles[i % len(profiles)]) for i in range(count)]
+    
+    _, compiled_time = _timed(encapsulator.encapsulate_many, items, True)
+    _, layered_time = _timed(encapsulator.encapsulate_many, items, False)
+    
+    speedup = layered_time / compiled_time
+    print(f"  Compiled profiles: {compiled_time * 1000:.1f} ms ({count / compiled_time:.0f} packets/s)")
+    print(f"  Per-layer dicts:   {layered_time * 1000:.1f} ms ({count / layered_time:.0f} packets/s)")
+    print(f"  Speedup:           {speedup:.1f}x")
+    return speedup
+
+def benchmark_reassembly(streams: int = 30000) -> float:
+    """Reassemble many interleaved fragment streams at once"""
+    from fragmentation import Reassembler, fragment_payload
+    
+    print(f"\n⏱️ Fragment reassembly ({streams} concurrent streams)...")
+    payload = bytes(4000)
+    fragmented = [
+        fragment_payload(payload, 1500, "10.0.0.1", "10.0.0.2", i & 0xFFFF, 17 + (i >> 16))
+        for i in range(streams)
+    ]
+    # Interleave so every stream is open at the same time
+    fragments = [fragment for group in zip(*fragmented) for fragment in group]
+    reassembler = Reassembler(max_streams=streams)
+    
+    completed, elapsed = _timed(lambda: sum(1 for f in fragments if reassembler.add(f, 0.0) is not None))
+    
+    rate = len(fragments) / elapsed
+    print(f"  Reassembled {completed}/{streams} datagrams from {len(fragments)} fragments")
+    print(f"  {elapsed * 1000:.1f} ms ({rate:.0f} fragments/s)")
+    return rate
+
+def benchmark_segmentation(size: int = 256 * 1024 * 1024) -> float:
+    """Segment and serialize a large payload into MSS-sized frames"""
+    from layers import PacketEncapsulator
+    
+    print(f"\n⏱️ TCP segmentation ({size // (1024 * 1024)} MB payload)...")
+    encapsulator = PacketEncapsulator()
+    data = encapsulator.encapsulate_many([("example.com", "93.184.216.34")])[0]
+    payload = memoryview(bytearray(size))
+    
+    count, elapsed = _timed(lambda: sum(1 for _ in encapsulator.layers[3].segment(data, payload)))
+    print(f"  Segment headers: {count} segments in {elapsed * 1000:.1f} ms "
+          f"({size / elapsed / 1e9:.2f} GB/s)")
+    
+    frame_size = size // 16
+    frames, frame_elapsed = _timed(lambda: sum(1 for _ in encapsulator.stream_segments(data, payload[:frame_size])))
+    throughput = frame_size / frame_elapsed
+    print(f"  Wire frames: {frames} frames in {frame_elapsed * 1000:.1f} ms ({throughput / 1e6:.0f} MB/s)")
+    return throughput
+
+def benchmark_session_simulation(flows: int = 100000) -> float:
+    """Simulate many concurrent TCP flows on the discrete-event scheduler"""
+    from sessions import SessionSimulator
+    
+    print(f"\n⏱️ TCP session simulation ({flows} flows)...")
+    simulator = SessionSimulator()
+    simulator.add_flows(flows, loss_rate=0.01)
+    summary = simulator.run()
+    
+    rate = summary["completed"] / summary["wall_time"]
+    print(f"  {summary['completed']} flows, {summary['events']} events in {summary['wall_time'] * 1000:.1f} ms")
+    print(f"  {summary['events_per_second']:.0f} events/s ({rate:.0f} flows/s)")
+    return rate
+
+def benchmark_hexdump(count: int = 5000) -> float:
+    """Compare write_hexdump against Scapy's hexdump(dump=True)"""
+    import io
+    from scapy.all import Ether
+    from scapy.utils import hexdump as scapy_hexdump
+    from hexdump import write_hexdump
+    from layers import PacketEncapsulator
+    
+    print(f"\n⏱️ Hex dump ({count} frames)...")
+    encapsulator = PacketEncapsulator()
+    frames = [bytes(frame) for frame in encapsulator.build_frames(
+        encapsulator.encapsulate_many([(f"host{i}.example.com", "93.184.216.34") for i in range(count)])
+    )]
+    packets = [Ether(frame) for frame in frames]
+    
+    _, native_time = _timed(write_hexdump, frames, io.StringIO())
+    _, scapy_time = _timed(lambda: [scapy_hexdump(packet, dump=True) for packet in packets])
+    
+    speedup = scapy_time / native_time
+    print(f"  write_hexdump: {native_time * 1000:.1f} ms")
+    print(f"  Scapy hexdump: {scapy_time * 1000:.1f} ms")
+    print(f"  Speedup: {speedup:.1f}x")
+    return speedup
+
+def benchmark_resolve_many(count: int = 2000, latency: float = 0.005) -> float:
+    """Compare resolve_many against one-at-a-time lookups with a fixed resolver latency"""
+    from dns_resolver import DNSResolver
+    
+    class SlowResolver(DNSResolver):
+        def _system_lookup(self, domain, record_type="A"):
+            time.sleep(latency)
+            return ["10.0.0.1"]
+    
+    print(f"\n⏱️ Bulk DNS resolution ({count} names, {latency * 1000:.0f} ms each)...")
+    names = [f"host{i}.example.test" for i in range(count)]
+    sequential_count = count // 10
+    _, sequential_time = _timed(lambda: [SlowResolver().lookup(name) for name in names[:sequential_count]])
+    sequential_time *= count / sequential_count
+    _, bulk_time = _timed(lambda: list(SlowResolver().resolve_many(names, concurrency=256)))
+    
+    speedup = sequential_time / bulk_time
+    print(f"  Sequential lookup: {sequential_time * 1000:.1f} ms (extrapolated)")
+    print(f"  resolve_many: {bulk_time * 1000:.1f} ms ({count / bulk_time:.0f} names/s)")
+    print(f"  Speedup: {speedup:.1f}x")
+    return speedup
+
+def benchmark_dns_wire(count: int = 5000) -> float:
+    """Compare pipelined wire queries against one blocking query at a time"""
+    from dns_stub import StubDNSServer
+    from dns_wire import DNSWireClient
+    
+    print(f"\n⏱️ DNS wire client ({count} queries to a local stub server)...")
+    with StubDNSServer(delay=0.001) as server:
+        for i in range(count):
+            server.add_record(f"host{i}.test", "A", f"10.{i >> 16}.{(i >> 8) & 255}.{i & 255}")
+        client = DNSWireClient([server.address])
+        queries = [(f"host{i}.test", "A") for i in range(count)]
+        
+        sequential_count = count // 10
+        _, sequential_time = _timed(lambda: [client.query(*query) for query in queries[:sequential_count]])
+        sequential_time *= count / sequential_count
+        responses, pipelined_time = _timed(lambda: list(client.query_many(queries)))
+    
+    speedup = sequential_time / pipelined_time
+    print(f"  One at a time: {sequential_time * 1000:.1f} ms (extrapolated)")
+    print(f"  Pipelined: {pipelined_time * 1000:.1f} ms ({len(responses) / pipelined_time:.0f} queries/s)")
+    print(f"  Speedup: {speedup:.1f}x")
+    return speedup
+
+def benchmark_hedged_queries(count: int = 300) -> float:
+    """Compare p99 latency of failover queries and hedged races when the primary server drops queries"""
+    from dns_stub import StubDNSServer
+    from dns_wire import DNSWireClient
+    
+    print(f"\n⏱️ Hedged DNS queries ({count} queries, primary server drops 10%)...")
+    with StubDNSServer(delay=0.002, drop_rate=0.1, seed=1) as primary, StubDNSServer(delay=0.004) as secondary:
+        for server in (primary, secondary):
+            for i in range(count):
+                server.add_record(f"host{i}.test", "A", f"10.0.{i >> 8}.{i & 255}")
+        
+        def latencies(hedge: bool) -> list:
+            client = DNSWireClient([primary.address, secondary.address], timeout=0.25, seed=1)
+            ask = client.race if hedge else client.query
+            samples = []
+            for i in range(count):
+                _, elapsed = _timed(ask, f"host{i}.test", "A")
+                samples.append(elapsed)
+            return sorted(samples)
+        
+        failover = latencies(False)
+        hedged = latencies(True)
+    
+    p99 = int(count * 0.99)
+    speedup = failover[p99] / hedged[p99]
+    print(f"  Failover: p50 {failover[count // 2] * 1000:.1f} ms, p99 {failover[p99] * 1000:.1f} ms")
+    print(f"  Hedged: p50 {hedged[count // 2] * 1000:.1f} ms, p99 {hedged[p99] * 1000:.1f} ms")
+    print(f"  p99 improvement: {speedup:.1f}x")
+    return speedup
+
+def benchmark_persistent_cache(count: int = 1000) -> float:
+    """Compare a cold start that queries a DNS server with one warmed from the cache file"""
+    import tempfile
+    from dns_resolver import DNSResolver
+    from dns_stub import StubDNSServer
+    
+    print(f"\n⏱️ Persistent DNS cache ({count} names, restart between runs)...")
+    with tempfile.TemporaryDirectory() as directory, StubDNSServer(delay=0.001) as server:
+        path = os.path.join(directory, "dns.sqlite")
+        names = [f"host{i}.test" for i in range(count)]
+        for i, name in enumerate(names):
+            server.add_record(name, "A", f"10.0.{i >> 8}.{i & 255}", ttl=3600)
+        
+        def run() -> DNSResolver:
+            resolver = DNSResolver(use_wire=True, cache_path=path)
+            resolver.dns_servers = [server.address]
+            for name in names:
+                resolver.lookup(name)
+            resolver.cache.close()
+            return resolver
+        
+        cold, cold_time = _timed(run)
+        warm, warm_time = _timed(run)
+    
+    speedup = cold_time / warm_time
+    print(f"  Cold start: {cold_time * 1000:.1f} ms ({cold.wire.stats['sent']} queries sent)")
+    print(f"  Warm start: {warm_time * 1000:.1f} ms ({warm.cache.disk_hits} answers read from disk)")
+    print(f"  Speedup: {speedup:.1f}x")
+    return speedup
+
+def benchmark_reverse_dns(count: int = 64, delay: float = 0.02) -> float:
+    """Compare batched concurrent PTR lookups against one blocking lookup per address"""
+    from reverse_dns import ReverseDNS
+    
+    print(f"\n⏱️ Reverse DNS ({count} addresses, {delay * 1000:.0f} ms per PTR lookup)...")
+    def slow_ptr(address: str) -> str:
+        time.sleep(delay)
+        return f"host-{address.replace('.', '-')}.example"
+    
+    addresses = [f"10.0.{i >> 8}.{i & 255}" for i in range(count)]
+    _, sequential_time = _timed(lambda: [slow_ptr(address) for address in addresses])
+    service = ReverseDNS(timeout=5.0, workers=32, lookup=slow_ptr)
+    names, batch_time = _timed(service.lookup_many, addresses)
+    _, cached_time = _timed(service.lookup_many, addresses)
+    service.shutdown()
+    
+    speedup = sequential_time / batch_time
+    print(f"  One at a time: {sequential_time * 1000:.1f} ms")
+    print(f"  Batched: {batch_time * 1000:.1f} ms ({sum(1 for name in names.values() if name)} names)")
+    print(f"  Cached: {cached_time * 1000:.2f} ms")
+    print(f"  Speedup: {speedup:.1f}x")
+    return speedup
+
+def benchmark_simulated_zone(count: int = 500000, lookups: int = 100000) -> float:
+    """Compare opening the mmap zone index against loading the zone file into a dict"""
+    import tempfile
+    from dns_zone import SimulatedZone, generate_zone, parse_zone_lines
+    
+    print(f"\n⏱️ Simulated DNS zone ({count} records, {lookups} lookups)...")
+    with tempfile.TemporaryDirectory() as directory:
+        zone_path = os.path.join(directory, "bench.zone")
+        generate_zone(zone_path, count)
+        names = [f"host{i}.zone{i % 97}.sim" for i in range(0, count, max(count // lookups, 1))]
+        
+        def load_dict() -> dict:
+            with open(zone_path) as source:
+                return {name: (address, ttl) for name, ttl, address in parse_zone_lines(source)}
+        
+        table, dict_time = _timed(load_dict)
+        zone, compile_time = _timed(SimulatedZone.from_zone_file, zone_path)
+        zone.close()
+        zone, open_time = _timed(SimulatedZone.from_zone_file, zone_path)
+        answers, lookup_time = _timed(lambda: [zone.lookup(name) for name in names])
+        zone.close()
+    
+    speedup = dict_time / open_time
+    print(f"  Load zone into dict: {dict_time * 1000:.1f} ms per start")
+    print(f"  Compile index (once): {compile_time * 1000:.1f} ms")
+    print(f"  Open index: {open_time * 1000:.2f} ms per start")
+    print(f"  Lookups: {len(answers) / lookup_time:.0f}/s ({sum(a.source == 'zone' for a in answers)} found)")
+    print(f"  Start-up speedup: {speedup:.0f}x")
+    return speedup
+
+def benchmark_latency_histogram(count: int = 1000000) -> float:
+    """Compare the bounded latency histogram with keeping and sorting every sample"""
+    import random
+    from dns_bench import PERCENTILES, LatencyHistogram
+    
+    print(f"\n⏱️ Latency histogram ({count} samples)...")
+    generator = random.Random(0)
+    samples = [generator.lognormvariate(-6, 1.5) for _ in range(count)]
+    
+    def exact() -> list:
+        ordered = sorted(samples)
+        return [ordered[int(fraction * count) - 1] for fraction in PERCENTILES]
+    
+    def bucketed() -> list:
+        histogram = LatencyHistogram()
+        for sample in samples:
+            histogram.record(sample)
+        return [histogram.percentile(fraction) for fraction in PERCENTILES]
+    
+    expected, sort_time = _timed(exact)
+    measured, histogram_time = _timed(bucketed)
+    error = max(abs(m - e) / e for m, e in zip(measured, expected))
+    ratio = (count * 8) / (LatencyHistogram.BUCKETS * 8)
+    print(f"  Sorted samples: {sort_time * 1000:.1f} ms, {count * 8 / 1e6:.1f} MB of floats")
+    print(f"  Histogram: {histogram_time * 1000:.1f} ms, {LatencyHistogram.BUCKETS * 8 / 1024:.1f} KB fixed")
+    print(f"  Worst percentile error: {error:.2%}")
+    print(f"  Memory reduction: {ratio:.0f}x")
+    return ratio
+
+def benchmark_probe_engine(hops: int = 15, timeout: float = 0.3) -> float:
+    """Compare the parallel-probe engine with classic one-probe-at-a-time traceroute"""
+    import select
+    from probe_engine import BASE_PORT, ProbeEngine
+    from probe_stub import StubPath
+    
+    print(f"\n⏱️ Traceroute ({hops} hops, 3 probes each, 2 silent hops, {timeout:g}s timeout)...")
+    routers = [f"10.{hop}.0.1" for hop in range(1, hops)]
+    def make_path() -> StubPath:
+        return StubPath(routers, "203.0.113.10", hop_latency=0.002, silent={3, 7})
+    
+    def serial() -> int:
+        path = make_path()
+        try:
+            for ttl in range(1, 31):
+                for probe in range(3):
+                    path.send("203.0.113.10", BASE_PORT + (ttl - 1) * 3 + probe, ttl, b"")
+                    select.select([path], [], [], timeout)
+                    path.receive()
+                if ttl == hops:
+                    return ttl
+        finally:
+            path.close()
+        return 30
+    
+    engine = ProbeEngine(timeout=timeout, transport_factory=make_path)
+    _, serial_time = _timed(serial)
+    trace, parallel_time = _timed(engine.trace, "203.0.113.10")
+    
+    speedup = serial_time / parallel_time
+    print(f"  One probe at a time: {serial_time * 1000:.1f} ms")
+    print(f"  Parallel probes: {parallel_time * 1000:.1f} ms ({len(trace)} hops)")
+    print(f"  Speedup: {speedup:.1f}x")
+    return speedup
+
+def benchmark_traceroute_parser(runs: int = 2000, hops: int = 15) -> float:
+    """Parse an archive of traceroute and tracert runs, against the old split-based hop parser"""
+    import random
+    from traceroute_parser import parse_traceroute_log
+    
+    print(f"\n⏱️ Traceroute log parsing ({runs} runs of {hops} hops, Unix and Windows)...")
+    generator = random.Random(0)
+    lines = []
+    for run in range(runs):
+        windows = run % 4 == 3
+        lines.append(f"Tracing route to host{run}.example [203.0.113.{run % 250}]" if windows
+                     else f"traceroute to host{run}.example (203.0.113.{run % 250}), 30 hops max, 60 byte packets")
+        for hop in range(1, hops + 1):
+            address = f"10.{hop}.{run % 250}.{generator.randrange(1, 4)}"
+            rtts = [hop * 2.5 + generator.random() for _ in range(3)]
+            if generator.random() < 0.1:
+                lines.append(f"{hop:>3}     *        *        *     Request timed out." if windows else f"{hop:>2}  * * *")
+            elif windows:
+                lines.append(f"{hop:>3}" + "".join(f"{rtt:>6.0f} ms" for rtt in rtts) + f"  r{hop}.isp.net [{address}]")
+            else:
+                lines.append(f"{hop:>2}  r{hop}.isp.net ({address})  " + "  ".join(f"{rtt:.3f} ms" for rtt in rtts))
+    
+    def legacy(lines: list) -> int:
+        # The parser this module replaced (Traceroute._parse_hop_line): split on spaces, first RTT only
+        hops = []
+        for line in lines:
+            parts = line.split()
+            if len(parts) < 2:
+                continue
+            try:
+                hop_number = int(parts[0])
+            except ValueError:
+                continue
+            latency = None
+            for part in parts[2:]:
+                if part.replace(".", "").replace("ms", "").isdigit():
+                    latency = float(part.replace("ms", ""))
+                    break
+            hops.append({
+                "hop_number": hop_number,
+                "ip": parts[1],
+                "hostname": parts[1],
+                "latency": latency,
+                "status": "OK" if latency else "*",
+                "ttl": 64 - hop_number
+            })
+        return len(hops)
+    
+    def parse(lines: list) -> int:
+        return sum(len(hops) for _, hops in parse_traceroute_log(lines))
+    
+    legacy_hops, legacy_time = _timed(legacy, lines)
+    parsed_hops, parse_time = _timed(parse, lines)
+    
+    rate = len(lines) / parse_time
+    print(f"  Split parser (first RTT only): {legacy_time * 1000:.1f} ms ({legacy_hops} hops)")
+    print(f"  Regex parser (every probe): {parse_time * 1000:.1f} ms ({parsed_hops} hops)")
+    print(f"  Throughput: {rate:,.0f} lines/s")
+    return rate
+
+def benchmark_trace_many(targets: int = 100, rate: float = 20000) -> float:
+    """Compare trace_many's shared stop set with tracing each target on its own"""
+    from probe_engine import ProbeBudget, ProbeEngine
+    from probe_stub import StubNetwork, shared_prefix_routes
+    
+    print(f"\n⏱️ Multi-target traceroute ({targets} targets sharing their first hops, {rate:g} probes/s)...")
+    routes = shared_prefix_routes(targets)
+    def make_network() -> StubNetwork:
+        return StubNetwork(routes, hop_latency=0.001)
+    
+    def one_by_one() -> int:
+        engine = ProbeEngine(timeout=0.2, transport_factory=make_network, budget=ProbeBudget(rate, burst=rate / 20))
+        for target in routes:
+            engine.trace(target)
+        return engine.probes_sent
+    
+    def shared() -> int:
+        engine = ProbeEngine(timeout=0.2, transport_factory=make_network, budget=ProbeBudget(rate, burst=rate / 20))
+        engine.trace_many(routes, concurrency=16)
+        return engine.probes_sent
+    
+    single_probes, single_time = _timed(one_by_one)
+    shared_probes, shared_time = _timed(shared)
+    
+    speedup = single_time / shared_time
+    print(f"  One target at a time: {single_time * 1000:.1f} ms, {single_probes} probes")
+    print(f"  trace_many: {shared_time * 1000:.1f} ms, {shared_probes} probes")
+    print(f"  Speedup: {speedup:.1f}x, {1 - shared_probes / single_probes:.0%} fewer probes")
+    return speedup
+
+def benchmark_topology_graph(traces: int = 5000, queries: int = 200) -> float:
+    """Merge many traces into the topology graph, then time path queries and a save/load round trip"""
+    import random
+    import tempfile
+    from topology import TopologyGraph
+    
+    print(f"\n⏱️ Topology graph ({traces} traces of up to 16 hops, {queries} path queries)...")
+    generator = random.Random(0)
+    samples = []
+    for trace in range(traces):
+        # A shared core fanning out into regions, then per-destination access routers
+        region = generator.randrange(64)
+        path = [f"10.0.0.{hop}" for hop in range(1, 4)]
+        path += [f"10.1.{region}.{hop}" for hop in range(generator.randrange(1, 3), 6)]
+        path += [f"10.2.{trace % 4000}.{hop}" for hop in range(generator.randrange(4, 9))]
+        latency = 0.0
+        hops = []
+        for address in path:
+            latency += generator.uniform(0.2, 3.0)
+            hops.append({"ip": address, "hostname": address, "latency": latency})
+        samples.append((f"203.0.{trace % 4000 // 250}.{trace % 250}", hops))
+    
+    graph = TopologyGraph()
+    def merge() -> int:
+        for target, hops in samples:
+            graph.add_trace(target, hops)
+        return len(graph)
+    
+    def query() -> int:
+        found = 0
+        for target, hops in samples[:queries]:
+            found += graph.shortest_path("local", hops[-1]["ip"]) is not None
+            found += graph.most_common_path("local", hops[-1]["ip"]) is not None
+        return found
+    
+    nodes, merge_time = _timed(merge)
+    _, query_time = _timed(query)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "topology.json")
+        _, save_time = _timed(graph.save, path)
+        _, load_time = _timed(TopologyGraph.load, path)
+    
+    rate = traces / merge_time
+    print(f"  Merged into {nodes} nodes, {graph.edge_count} links: {merge_time * 1000:.1f} ms ({rate:,.0f} traces/s)")
+    print(f"  Path queries: {query_time / (2 * queries) * 1e6:.0f} us each")
+    print(f"  Save: {save_time * 1000:.1f} ms, load: {load_time * 1000:.1f} ms")
+    return rate
+
+def benchmark_synthetic_topology(targets: int = 5000) -> float:
+    """Compare batched synthetic traces with sampling each target on its own"""
+    from synthetic_topology import SyntheticTopology
+    
+    print(f"\n⏱️ Synthetic traceroutes ({targets} targets)...")
+    names = [f"host{i}.example" for i in range(targets)]
+    topology, build_time = _timed(SyntheticTopology)
+    topology.trace_many(names)  # Fill the route cache
+    
+    def one_by_one() -> int:
+        return sum(len(topology.trace(name)) for name in names)
+    
+    hops, single_time = _timed(one_by_one)
+    _, batch_time = _timed(topology.trace_many, names)
+    
+    speedup = single_time / batch_time
+    print(f"  Built {len(topology)} routers in {build_time * 1000:.1f} ms")
+    print(f"  One trace at a time: {single_time * 1000:.1f} ms ({hops} hops)")
+    print(f"  trace_many batch: {batch_time * 1000:.1f} ms")
+    print(f"  Speedup: {speedup:.1f}x")
+    return speedup
+
+def benchmark_path_monitor(rounds: int = 20000) -> float:
+    """Fold many traces into the path monitor and check its memory stays flat"""
+    import tracemalloc
+    from path_monitor import PathMonitor
+    from synthetic_topology import SyntheticTopology
+    
+    print(f"\n⏱️ Path monitor ({rounds} rounds of a simulated path)...")
+    topology = SyntheticTopology()
+    traces = list(topology.trace_many([f"host{i}.example" for i in range(64)]).values())
+    monitor = PathMonitor("bench", lambda: traces[monitor.rounds % len(traces)])
+    
+    def fold(count: int) -> int:
+        for _ in range(count):
+            monitor.probe_round()
+        return monitor.rounds
+    
+    fold(len(traces))  # Every hop's statistics exist from here on
+    tracemalloc.start()
+    _, first_time = _timed(fold, rounds // 2)
+    first_memory = tracemalloc.get_traced_memory()[0]
+    _, second_time = _timed(fold, rounds // 2)
+    second_memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    
+    rate = rounds / (first_time + second_time)
+    samples = sum(hop.sent for hop in monitor.hops)
+    print(f"  {rate:,.0f} rounds/s, {samples} probe samples")
+    print(f"  Memory after {rounds // 2} rounds: {first_memory / 1024:.1f} KiB, after {rounds}: {second_memory / 1024:.1f} KiB")
+    return rate
+
+def benchmark_streaming_traceroute(hops: int = 10, hop_delay: float = 0.05) -> float:
+    """Compare time to first hop when streaming traceroute output against waiting for the process"""
+    import subprocess
+    from tracer import Traceroute
+    
+    print(f"\n⏱️ Streaming traceroute ({hops} hops printed {hop_delay * 1000:.0f} ms apart)...")
+    script = (
+        "import time\n"
+        f"for hop in range(1, {hops + 1}):\n"
+        f"    time.sleep({hop_delay})\n"
+        "    print(f' {hop}  10.0.{hop}.1  {hop:.3f} ms', flush=True)\n"
+    )
+    
+    class ScriptedTraceroute(Traceroute):
+        def _traceroute_command(self, target):
+            return [sys.executable, "-c", script]
+    
+    tracer = ScriptedTraceroute()
+    
+    def batched() -> list:
+        result = subprocess.run(tracer._traceroute_command("example.com"), capture_output=True, text=True)
+        return tracer._parse_traceroute_output(result.stdout, result.stderr)
+    
+    def first_streamed() -> dict:
+        stream = tracer.stream_traceroute("example.com")
+        first = next(stream)
+        stream.close()
+        return first
+    
+    _, batch_time = _timed(batched)
+    _, first_time = _timed(first_streamed)
+    
+    speedup = batch_time / first_time
+    print(f"  First hop shown, batched: {batch_time * 1000:.1f} ms")
+    print(f"  First hop shown, streamed: {first_time * 1000:.1f} ms")
+    print(f"  Speedup: {speedup:.1f}x")
+    return speedup
+
+def main():
+    """Run all benchmarks"""
+    print("🚀 Packet Odyssey - Benchmarks")
+    print("=" * 50)
+    
+    benchmark_frame_builder()
+    benchmark_template_cache()
+    benchmark_dissector()
+    benchmark_header_records()
+    benchmark_layer_profiles()
+    benchmark_reassembly()
+    benchmark_segmentation()
+    benchmark_session_simulation()
+    benchmark_hexdump()
+    benchmark_resolve_many()
+    benchmark_dns_wire()
+    benchmark_hedged_queries()
+    benchmark_persistent_cache()
+    benchmark_reverse_dns()
+    benchmark_simulated_zone()
+    benchmark_latency_histogram()
+    benchmark_probe_engine()
+    benchmark_trace_many()
+    benchmark_streaming_traceroute()
+    benchmark_traceroute_parser()
+    benchmark_topology_graph()
+    benchmark_synthetic_topology()
+    benchmark_path_monitor()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -15,17 +15,20 @@ from rich.table import Table
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich import box
 from scapy.all import *
+from dissector import dissect
+from reverse_dns import ReverseDNS
 
 console = Console()
 
 class PacketCapture:
     """Handles packet capture functionality with cross-platform support"""
     
-    def __init__(self):
+    def __init__(self, reverse_dns: Optional[ReverseDNS] = None):
         self.system = platform.system().lower()
         self.capture_duration = 10  # seconds
         self.max_packets = 50
         self.pcap_file = "packet_odyssey_capture.pcap"
+        self.reverse_dns = reverse_dns if reverse_dns is not None else ReverseDNS()
     
     def capture_packets(self, target: str, simulate: bool = False) -> List[Dict[str, any]]:
         """
@@ -139,34 +142,29 @@ class PacketCapture:
     def _process_packet(self, packet: Packet, packets_list: List[Dict[str, any]]) -> None:
         """Process a captured packet and extract relevant information"""
         try:
-            packet_info = {
-                "timestamp": time.time(),
-                "length": len(packet),
-                "protocol": "Unknown",
-                "source": "Unknown",
-                "destination": "Unknown",
-                "info": str(packet.summary())
-            }
+            # Parse the captured bytes with the lazy dissector instead of walking Scapy layers;
+            # packet.original is what came off the wire, so nothing is re-serialised
+            frame = None
+            if isinstance(packet, Ether):
+                frame = dissect(packet.original or bytes(packet))
+            elif isinstance(packet, IP):
+                frame = dissect(packet.original or bytes(packet), link="ip")
+            elif IP in packet:
+                frame = dissect(bytes(packet[IP]), link="ip")
             
-            # Extract IP layer info
-            if IP in packet:
-                packet_info["source"] = packet[IP].src
-                packet_info["destination"] = packet[IP].dst
-                packet_info["protocol"] = "IP"
-                
-                # Extract transport layer info
-                if TCP in packet:
-                    packet_info["protocol"] = "TCP"
-                    packet_info["source_port"] = packet[TCP].sport
-                    packet_info["dest_port"] = packet[TCP].dport
-                    packet_info["flags"] = str(packet[TCP].flags)
-                elif UDP in packet:
-                    packet_info["protocol"] = "UDP"
-                    packet_info["source_port"] = packet[UDP].sport
-                    packet_info["dest_port"] = packet[UDP].dport
-                elif ICMP in packet:
-                    packet_info["protocol"] = "ICMP"
-                    packet_info["type"] = packet[ICMP].type
+            if frame is not None and frame.has_ipv4:
+                packet_info = frame.summary()
+                packet_info["length"] = len(packet)
+            else:
+                # ARP, IPv6 and other frames the dissector does not decode
+                packet_info = {
+                    "length": len(packet),
+                    "protocol": "Unknown",
+                    "source": "Unknown",
+                    "destination": "Unknown",
+                    "info": str(packet.summary())
+                }
+            packet_info["timestamp"] = time.time()
             
             packets_list.append(packet_info)
             
@@ -239,8 +237,14 @@ class PacketCapture:
         except Exception as e:
             console.print(f"[red]❌ Error saving pcap file: {e}[/red]")
     
-    def display_capture_results(self, packets: List[Dict[str, any]]) -> None:
-        """Display captured packets in a formatted table"""
+    def display_capture_results(self, packets: List[Dict[str, any]], resolve_names: bool = True) -> None:
+        """
+        Display captured packets in a formatted table
+        
+        Args:
+            packets: Captured packet information
+            resolve_names: Label source/destination addresses with their PTR names
+        """
         if not packets:
             console.print("[red]❌ No packets captured[/red]")
             return
@@ -273,6 +277,12 @@ class PacketCapture:
         
         # Recent packets table
         recent_packets = packets[-10:]  # Show last 10 packets
+        names = {}
+        if resolve_names:
+            names = self.reverse_dns.lookup_many(
+                address for packet in recent_packets for address in (packet.get("source"), packet.get("destination"))
+                if address
+            )
         
         table = Table(title="📦 Recent Packets", box=box.ROUNDED)
         table.add_column("Time", style="cyan")
@@ -287,8 +297,8 @@ class PacketCapture:
             table.add_row(
                 timestamp,
                 packet.get("protocol", "Unknown"),
-                packet.get("source", "Unknown"),
-                packet.get("destination", "Unknown"),
+                self.reverse_dns.label(packet.get("source", "Unknown"), names.get(packet.get("source"))),
+                self.reverse_dns.label(packet.get("destination", "Unknown"), names.get(packet.get("destination"))),
                 str(packet.get("length", 0)),
                 packet.get("info", "")[:30] + "..." if len(packet.get("info", "")) > 30 else packet.get("info", "")
             )
@@ -0,0 +1,348 @@
+"""
+De-encapsulation Module for Packet Odyssey
+Parses raw frames bottom-up into the layer dicts used by the display code
+"""
+
+import socket
+import struct
+from typing import Dict, Any, List, Optional, Tuple, Union
+
+ETHERTYPE_IPV4 = 0x0800
+ETHERTYPE_VLAN = 0x8100
+IP_PROTOCOLS = {1: "ICMP", 6: "TCP", 17: "UDP"}
+TCP_FLAG_NAMES = (("FIN", 0x01), ("SYN", 0x02), ("RST", 0x04), ("PSH", 0x08), ("ACK", 0x10), ("URG", 0x20))
+HTTP_METHODS = (b"GET ", b"POST ", b"PUT ", b"DELETE ", b"HEAD ", b"OPTIONS ", b"PATCH ", b"HTTP/")
+
+_ETHERNET = struct.Struct("!6s6sH")
+_VLAN_TAG = struct.Struct("!HH")
+_IPV4 = struct.Struct("!BBHHHBBH4s4s")
+_TCP = struct.Struct("!HHIIBBHHH")
+_UDP = struct.Struct("!HHHH")
+_ICMP = struct.Struct("!BBH")
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+class FrameView:
+    """
+    Lazy, zero-copy view over one raw frame
+    
+    Each header is unpacked with struct.unpack_from the first time one of its
+    fields is accessed, so reading just the addresses never touches TCP.
+    """
+    
+    __slots__ = ("view", "link", "_ethernet", "_network_offset", "_ipv4", "_transport", "_payload_offset")
+    
+    def __init__(self, frame: BytesLike, link: str = "ethernet"):
+        self.view = memoryview(frame)
+        self.link = link
+        self._ethernet = None
+        self._network_offset = None
+        self._ipv4 = None
+        self._transport = None
+        self._payload_offset = None
+    
+    def __len__(self) -> int:
+        return len(self.view)
+    
+    # Layer 2
+    
+    def _parse_ethernet(self) -> Optional[tuple]:
+        if self._ethernet is None and self.link == "ethernet" and len(self.view) >= _ETHERNET.size:
+            dest_mac, source_mac, ethertype = _ETHERNET.unpack_from(self.view, 0)
+            offset = _ETHERNET.size
+            vlan_ids = []
+            while ethertype == ETHERTYPE_VLAN and len(self.view) >= offset + _VLAN_TAG.size:
+                tci, ethertype = _VLAN_TAG.unpack_from(self.view, offset)
+                vlan_ids.append(tci & 0x0FFF)
+                offset += _VLAN_TAG.size
+            self._ethernet = (dest_mac, source_mac, ethertype, tuple(vlan_ids))
+            self._network_offset = offset
+        return self._ethernet
+    
+    @property
+    def dest_mac(self) -> Optional[str]:
+        ethernet = self._parse_ethernet()
+        return ethernet[0].hex(":").upper() if ethernet else None
+    
+    @property
+    def source_mac(self) -> Optional[str]:
+        ethernet = self._parse_ethernet()
+        return ethernet[1].hex(":").upper() if ethernet else None
+    
+    @property
+    def ethertype(self) -> Optional[int]:
+        ethernet = self._parse_ethernet()
+        if ethernet:
+            return ethernet[2]
+        return ETHERTYPE_IPV4 if self.link == "ip" else None
+    
+    @property
+    def vlan_ids(self) -> tuple:
+        ethernet = self._parse_ethernet()
+        return ethernet[3] if ethernet else ()
+    
+    # Layer 3
+    
+    def _parse_ipv4(self) -> Optional[tuple]:
+        if self._ipv4 is None:
+            if self.link == "ip":
+                self._network_offset = 0
+            elif self._parse_ethernet() is None or self._ethernet[2] != ETHERTYPE_IPV4:
+                return None
+            offset = self._network_offset
+            if len(self.view) < offset + _IPV4.size or self.view[offset] >> 4 != 4:
+                return None
+            self._ipv4 = _IPV4.unpack_from(self.view, offset)
+        return self._ipv4
+    
+    @property
+    def has_ipv4(self) -> bool:
+        return self._parse_ipv4() is not None
+    
+    @property
+    def source_ip(self) -> Optional[str]:
+        ipv4 = self._parse_ipv4()
+        return socket.inet_ntoa(ipv4[8]) if ipv4 else None
+    
+    @property
+    def dest_ip(self) -> Optional[str]:
+        ipv4 = self._parse_ipv4()
+        return socket.inet_ntoa(ipv4[9]) if ipv4 else None
+    
+    @property
+    def ttl(self) -> Optional[int]:
+        ipv4 = self._parse_ipv4()
+        return ipv4[5] if ipv4 else None
+    
+    @property
+    def ip_protocol(self) -> Optional[int]:
+        ipv4 = self._parse_ipv4()
+        return ipv4[6] if ipv4 else None
+    
+    @property
+    def protocol(self) -> str:
+        """Highest recognized protocol name (TCP, UDP, ICMP, IP or Unknown)"""
+        ipv4 = self._parse_ipv4()
+        if ipv4 is None:
+            return "Unknown"
+        if ipv4[4] & 0x1FFF:
+            return "IP"
+        return IP_PROTOCOLS.get(ipv4[6], "IP")
+    
+    # Layer 4
+    
+    def _parse_transport(self) -> Optional[tuple]:
+        if self._transport is None:
+            ipv4 = self._parse_ipv4()
+            if ipv4 is None or ipv4[4] & 0x1FFF:
+                return None
+            offset = self._network_offset + (ipv4[0] & 0x0F) * 4
+            protocol = ipv4[6]
+            if protocol == 6 and len(self.view) >= offset + _TCP.size:
+                self._transport = _TCP.unpack_from(self.view, offset)
+                self._payload_offset = offset + (self._transport[4] >> 4) * 4
+            elif protocol == 17 and len(self.view) >= offset + _UDP.size:
+                self._transport = _UDP.unpack_from(self.view, offset)
+                self._payload_offset = offset + _UDP.size
+            elif protocol == 1 and len(self.view) >= offset + _ICMP.size:
+                self._transport = _ICMP.unpack_from(self.view, offset)
+                self._payload_offset = offset + 4
+        return self._transport
+    
+    @property
+    def source_port(self) -> Optional[int]:
+        transport = self._parse_transport()
+        return transport[0] if transport and self.ip_protocol in (6, 17) else None
+    
+    @property
+    def dest_port(self) -> Optional[int]:
+        transport = self._parse_transport()
+        return transport[1] if transport and self.ip_protocol in (6, 17) else None
+    
+    @property
+    def tcp_flags(self) -> Optional[int]:
+        transport = self._parse_transport()
+        return transport[5] if transport and self.ip_protocol == 6 else None
+    
+    @property
+    def icmp_type(self) -> Optional[int]:
+        transport = self._parse_transport()
+        return transport[0] if transport and self.ip_protocol == 1 else None
+    
+    @property
+    def icmp_code(self) -> Optional[int]:
+        transport = self._parse_transport()
+        return transport[1] if transport and self.ip_protocol == 1 else None
+    
+    @property
+    def payload(self) -> memoryview:
+        """Transport payload, trimmed to the IP total length (drops Ethernet padding)"""
+        if self._parse_transport() is None:
+            return self.view[0:0]
+        end = min(len(self.view), self._network_offset + self._ipv4[2])
+        return self.view[self._payload_offset:end]
+    
+    # Dict views for the layer display code
+    
+    def datalink_dict(self) -> Dict[str, Any]:
+        if self._parse_ethernet() is None:
+            return {}
+        data = {
+            "protocol": "Ethernet II",
+            "source_mac": self.source_mac,
+            "dest_mac": self.dest_mac,
+            "ethertype": f"0x{self.ethertype:04X}",
+            "frame_size": len(self.view),
+            "crc": "Not captured"
+        }
+        if self.vlan_ids:
+            data["vlan_ids"] = list(self.vlan_ids)
+        return data
+    
+    def network_dict(self) -> Dict[str, Any]:
+        ipv4 = self._parse_ipv4()
+        if ipv4 is None:
+            return {}
+        return {
+            "protocol": "IPv4",
+            "source_ip": self.source_ip,
+            "dest_ip": self.dest_ip,
+            "ttl": ipv4[5],
+            "protocol_id": ipv4[6],
+            "header_checksum": f"0x{ipv4[7]:04X}",
+            "total_length": ipv4[2],
+            "identification": ipv4[3],
+            "flags": {
+                "DF": bool(ipv4[4] & 0x4000),
+                "MF": bool(ipv4[4] & 0x2000)
+            },
+            "fragment_offset": ipv4[4] & 0x1FFF
+        }
+    
+    def transport_dict(self) -> Dict[str, Any]:
+        transport = self._parse_transport()
+        if transport is None:
+            return {}
+        protocol = self.ip_protocol
+        if protocol == 6:
+            return {
+                "protocol": "TCP",
+                "source_port": transport[0],
+                "dest_port": transport[1],
+                "sequence_number": transport[2],
+                "ack_number": transport[3],
+                "flags": {name: bool(transport[5] & bit) for name, bit in TCP_FLAG_NAMES},
+                "window_size": transport[6],
+                "checksum": f"0x{transport[7]:04X}"
+            }
+        if protocol == 17:
+            return {
+                "protocol": "UDP",
+                "source_port": transport[0],
+                "dest_port": transport[1],
+                "length": transport[2],
+                "checksum": f"0x{transport[3]:04X}"
+            }
+        return {
+            "protocol": "ICMP",
+            "type": transport[0],
+            "code": transport[1],
+            "checksum": f"0x{transport[2]:04X}"
+        }
+    
+    def application_dict(self) -> Dict[str, Any]:
+        """Parse an HTTP request/response head from the payload, if there is one"""
+        payload = self.payload
+        if not payload or not bytes(payload[:8]).startswith(HTTP_METHODS):
+            return {}
+        head, _, body = bytes(payload).partition(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        request_line = lines[0].split(" ", 2)
+        if request_line[0].startswith("HTTP/"):
+            # Response status line: version, status code, reason
+            method, path, version = "", "", request_line[0]
+        else:
+            method, path, version = (request_line + ["", ""])[:3]
+        headers = {}
+        for line in lines[1:]:
+            key, sep, value = line.partition(":")
+            if sep:
+                headers[key.strip()] = value.strip()
+        return {
+            "method": method,
+            "path": path,
+            "version": version,
+            "headers": headers,
+            "body": body.decode("latin-1")
+        }
+    
+    def as_layers(self) -> Dict[str, Any]:
+        """Return every recognized layer as the dicts produced by encapsulate()"""
+        layers = {}
+        for key, builder in (("application", self.application_dict), ("transport", self.transport_dict),
+                             ("network", self.network_dict), ("datalink", self.datalink_dict)):
+            layer = builder()
+            if layer:
+                layers[key] = layer
+        return layers
+    
+    def layer_spans(self) -> List[Tuple[str, int, int]]:
+        """
+        Byte ranges of each recognized layer as (layer key, start, end)
+        
+        Bytes after the last recognized header are "payload"; bytes past the
+        IP total length are Ethernet "padding".
+        """
+        length = len(self.view)
+        spans = []
+        covered = 0
+        if self._parse_ethernet() is not None:
+            covered = min(self._network_offset, length)
+            spans.append(("datalink", 0, covered))
+        ipv4 = self._parse_ipv4()
+        if ipv4 is not None:
+            network_start = self._network_offset
+            end = min(length, network_start + ipv4[2])
+            covered = min(network_start + (ipv4[0] & 0x0F) * 4, end)
+            spans.append(("network", network_start, covered))
+            if self._parse_transport() is not None:
+                covered = min(self._payload_offset, end)
+                spans.append(("transport", spans[-1][2], covered))
+                if covered < end:
+                    spans.append(("application", covered, end))
+                    covered = end
+            if covered < end:
+                spans.append(("payload", covered, end))
+            covered = end
+        if covered < length:
+            spans.append(("padding" if ipv4 is not None else "payload", covered, length))
+        return spans
+    
+    def summary(self) -> Dict[str, Any]:
+        """Compact per-packet record in the shape used by PacketCapture"""
+        info = {
+            "length": len(self.view),
+            "protocol": self.protocol,
+            "source": self.source_ip or "Unknown",
+            "destination": self.dest_ip or "Unknown"
+        }
+        protocol = info["protocol"]
+        # A frame cut off inside its transport header names the protocol but has no ports or flags
+        if protocol in ("TCP", "UDP") and self.source_port is not None:
+            info["source_port"] = self.source_port
+            info["dest_port"] = self.dest_port
+            info["info"] = f"{protocol} {info['source']}:{self.source_port} > {info['destination']}:{self.dest_port}"
+            flags = self.tcp_flags
+            if flags is not None:
+                info["flags"] = "".join(name[0] for name, bit in TCP_FLAG_NAMES if flags & bit)
+                info["info"] += f" {info['flags']}"
+        elif protocol == "ICMP" and self.icmp_type is not None:
+            info["type"] = self.icmp_type
+            info["info"] = f"ICMP {info['source']} > {info['destination']} type {info['type']}"
+        else:
+            info["info"] = f"{protocol} {info['source']} > {info['destination']}"
+        return info
+
+def dissect(frame: BytesLike, link: str = "ethernet") -> FrameView:
+    """Wrap a raw frame in a lazy FrameView"""
+    return FrameView(frame, link)
\ No newline at end of file
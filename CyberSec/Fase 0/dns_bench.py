@@ -0,0 +1,214 @@
+"""
+DNS Benchmark Module for Packet Odyssey
+Load-tests DNSResolver against DNS servers and reports latency percentiles
+"""
+
+import time
+from array import array
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Sequence
+from rich.console import Console
+from rich.table import Table
+from rich import box
+from dns_resolver import DNSResolver
+from dns_stub import StubDNSServer
+from dns_zone import SimulatedZone
+
+console = Console()
+
+PERCENTILES = (0.5, 0.9, 0.99, 0.999)
+
+class LatencyHistogram:
+    """
+    Log-linear latency histogram with a fixed memory footprint
+    
+    Values are kept in microseconds: exactly below 64 us, and above that in
+    32 sub-buckets per power of two, so any recorded value is off by at most
+    about 3% while the whole histogram stays a single array of counters
+    regardless of how many samples it holds.
+    """
+    
+    SUB_BUCKETS = 32
+    MAX_SHIFT = 32  # Values up to 2**38 us (about three days) before clamping
+    BUCKETS = SUB_BUCKETS * (MAX_SHIFT + 2)
+    
+    def __init__(self):
+        self.counts = array("Q", bytes(8 * self.BUCKETS))
+        self.count = 0
+        self.total = 0.0
+        self.minimum = float("inf")
+        self.maximum = 0.0
+    
+    @classmethod
+    def _bucket(cls, microseconds: int) -> int:
+        shift = max(microseconds.bit_length() - 6, 0)
+        if shift > cls.MAX_SHIFT:
+            return cls.BUCKETS - 1
+        return shift * cls.SUB_BUCKETS + (microseconds >> shift)
+    
+    @classmethod
+    def _bucket_value(cls, bucket: int) -> float:
+        """Midpoint of a bucket, in seconds"""
+        if bucket < 2 * cls.SUB_BUCKETS:
+            return bucket / 1e6
+        shift = bucket // cls.SUB_BUCKETS - 1
+        mantissa = bucket - shift * cls.SUB_BUCKETS
+        return ((mantissa << shift) + (1 << shift) / 2) / 1e6
+    
+    def record(self, seconds: float) -> None:
+        self.counts[self._bucket(int(seconds * 1e6))] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds < self.minimum:
+            self.minimum = seconds
+        if seconds > self.maximum:
+            self.maximum = seconds
+    
+    def merge(self, other: "LatencyHistogram") -> None:
+        for bucket, count in enumerate(other.counts):
+            if count:
+                self.counts[bucket] += count
+        self.count += other.count
+        self.total += other.total
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+    
+    def percentile(self, fraction: float) -> float:
+        """Latency in seconds below which the given fraction of samples fall"""
+        if not self.count:
+            return 0.0
+        rank = max(int(fraction * self.count + 0.999999), 1)
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(max(self._bucket_value(bucket), self.minimum), self.maximum)
+        return self.maximum
+    
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+def bench_server(server: str, names: Sequence[str], queries: int, rate: Optional[float] = None,
+                 concurrency: int = 64, timeout: float = 1.0, use_cache: bool = True,
+                 record_type: str = "A") -> Dict[str, Any]:
+    """
+    Resolve queries names (cycling through names) through DNSResolver against one server
+    
+    Args:
+        server: "host" or "host:port" of the DNS server
+        rate: Upstream queries per second, on a fixed schedule (unlimited when None)
+        concurrency: Maximum queries in flight
+        timeout: Per-query budget in seconds, retransmits included
+        use_cache: Answer repeated names from the resolver cache
+    
+    Returns:
+        Report dictionary: QPS, latency percentiles, timeout rate and cache hit ratio
+    """
+    resolver = DNSResolver(use_wire=True, wire_timeout=timeout, cache_size=len(names) if use_cache else 0)
+    resolver.dns_servers = [server]
+    histogram = LatencyHistogram()
+    started: Dict[str, Deque[float]] = defaultdict(deque)
+    hits = 0
+    timeouts = 0
+    failures = 0
+    
+    def workload() -> Iterator[str]:
+        # Cache hits are timed here, misses from when the resolver takes them until it yields them
+        nonlocal hits
+        for i in range(queries):
+            name = names[i % len(names)]
+            lookup_start = time.perf_counter()
+            if use_cache and resolver.cache.get(name, record_type) is not None:
+                histogram.record(time.perf_counter() - lookup_start)
+                hits += 1
+                continue
+            started[name].append(time.perf_counter())
+            yield name
+    
+    begin = time.perf_counter()
+    for name, entry in resolver.resolve_many(workload(), record_type, concurrency, timeout, rate):
+        histogram.record(time.perf_counter() - started[name].popleft())
+        if entry.timed_out:
+            timeouts += 1
+        elif entry.error:
+            failures += 1
+    elapsed = time.perf_counter() - begin
+    
+    report: Dict[str, Any] = {
+        "server": server,
+        "queries": queries,
+        "elapsed": elapsed,
+        "qps": queries / elapsed if elapsed else 0.0,
+        "mean": histogram.mean,
+        "max": histogram.maximum,
+        "timeouts": timeouts,
+        "timeout_rate": timeouts / queries if queries else 0.0,
+        "failures": failures,
+        "cache_hit_ratio": hits / queries if queries else 0.0,
+        "sent": resolver.wire.stats["sent"],
+        "retransmits": resolver.wire.stats["retransmits"]
+    }
+    for fraction in PERCENTILES:
+        report[f"p{fraction * 100:g}".replace(".", "")] = histogram.percentile(fraction)
+    return report
+
+def run_dns_bench(names: Sequence[str], servers: Iterable[str], queries: int = 5000, **options) -> List[Dict[str, Any]]:
+    """Benchmark each server in turn with the same workload; options go to bench_server"""
+    return [bench_server(server, names, queries, **options) for server in servers]
+
+@contextmanager
+def stub_servers(names: Sequence[str], count: int = 1, delay: float = 0.0, drop_rate: float = 0.0,
+                 record_type: str = "A") -> Iterator[List[str]]:
+    """
+    Run local stand-in DNS servers answering every name, for benchmarks without network
+    
+    Addresses come from the simulated zone, so every run serves the same data.
+    
+    Yields:
+        The servers' "host:port" addresses
+    """
+    zone = SimulatedZone()
+    servers = [StubDNSServer(delay=delay, drop_rate=drop_rate, seed=index) for index in range(count)]
+    try:
+        for server in servers:
+            for name in names:
+                server.add_record(name, record_type, zone.resolve(name))
+            server.start()
+        yield [server.address for server in servers]
+    finally:
+        for server in servers:
+            server.stop()
+
+def default_names(count: int = 1000) -> List[str]:
+    return [f"host{i}.bench.test" for i in range(count)]
+
+def load_names(path: str) -> List[str]:
+    """Read one name per line, skipping blanks and # comments"""
+    with open(path) as source:
+        return [line.split("#", 1)[0].strip() for line in source if line.split("#", 1)[0].strip()]
+
+def display_bench_results(reports: List[Dict[str, Any]]) -> None:
+    """Print one row of throughput and latency figures per server"""
+    table = Table(title="⏱️ DNS Benchmark Results", box=box.ROUNDED)
+    table.add_column("Server", style="cyan", no_wrap=True)
+    table.add_column("Queries", justify="right")
+    table.add_column("QPS", justify="right", style="green")
+    for label in ("p50", "p90", "p99", "p99.9"):
+        table.add_column(f"{label} (ms)", justify="right", style="yellow")
+    table.add_column("Timeouts", justify="right", style="red")
+    table.add_column("Cache Hits", justify="right", style="magenta")
+    
+    for report in reports:
+        table.add_row(
+            report["server"],
+            str(report["queries"]),
+            f"{report['qps']:.0f}",
+            *(f"{report[key] * 1000:.2f}" for key in ("p50", "p90", "p99", "p999")),
+            f"{report['timeout_rate']:.1%}",
+            f"{report['cache_hit_ratio']:.1%}"
+        )
+    
+    console.print(table)
+    console.print()
\ No newline at end of file
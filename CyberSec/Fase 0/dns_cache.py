@@ -0,0 +1,230 @@
+"""
+DNS Cache Module for Packet Odyssey
+TTL-aware LRU cache of positive and negative DNS answers
+"""
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Callable, List, Optional, Sequence, Tuple
+
+CacheKey = Tuple[str, str]
+
+DEFAULT_MAX_ENTRIES = 4096
+DEFAULT_NEGATIVE_TTL = 60.0  # RFC 2308 suggests 1-3 hours; keep failures short-lived here
+MAX_TTL = 86400.0
+
+def cache_key(name: str, record_type: str = "A") -> CacheKey:
+    """Normalize a query into its cache key (names are case-insensitive, trailing dot optional)"""
+    return name.lower().rstrip("."), record_type.upper()
+
+class CacheEntry:
+    """
+    One cached answer: a list of addresses, or the error of a failed lookup
+    
+    timed_out marks a lookup that got no answer in time; such entries are
+    only reported, never cached.
+    """
+    
+    __slots__ = ("addresses", "expires", "ttl", "error", "source", "timed_out")
+    
+    def __init__(self, addresses: Sequence[str], expires: float, ttl: float, error: Optional[str] = None,
+                 source: str = "", timed_out: bool = False):
+        self.addresses = list(addresses)
+        self.expires = expires
+        self.ttl = ttl
+        self.error = error
+        self.source = source
+        self.timed_out = timed_out
+    
+    @property
+    def negative(self) -> bool:
+        return self.error is not None
+    
+    @property
+    def address(self) -> Optional[str]:
+        """First address of a positive answer"""
+        return self.addresses[0] if self.addresses else None
+    
+    def remaining(self, now: float) -> int:
+        """Seconds left before the entry expires, as a DNS TTL"""
+        return max(int(self.expires - now), 0)
+
+class DNSCache:
+    """
+    LRU cache keyed by (name, record type) with per-entry TTL expiry
+    
+    Failed lookups are cached too (negative caching) for negative_ttl seconds,
+    so a dead name does not cost a resolver round-trip on every journey.
+    Expired entries are dropped lazily when they are looked up.
+    """
+    
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, negative_ttl: float = DEFAULT_NEGATIVE_TTL,
+                 max_ttl: float = MAX_TTL, clock: Callable[[], float] = time.time):
+        self.max_entries = max_entries
+        self.negative_ttl = negative_ttl
+        self.max_ttl = max_ttl
+        self.clock = clock
+        self.entries: "OrderedDict[CacheKey, CacheEntry]" = OrderedDict()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+    
+    def get(self, name: str, record_type: str = "A", now: Optional[float] = None) -> Optional[CacheEntry]:
+        """Return the live entry for a query, or None on a miss"""
+        key = cache_key(name, record_type)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        now = self.clock() if now is None else now
+        if entry.expires <= now:
+            del self.entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        
+        self.entries.move_to_end(key)
+        if entry.negative:
+            self.negative_hits += 1
+        else:
+            self.hits += 1
+        return entry
+    
+    def put(self, name: str, record_type: str, addresses: Sequence[str], ttl: float,
+            now: Optional[float] = None, source: str = "") -> CacheEntry:
+        """Cache a positive answer for ttl seconds (capped at max_ttl)"""
+        ttl = min(max(ttl, 0.0), self.max_ttl)
+        now = self.clock() if now is None else now
+        return self._insert(cache_key(name, record_type), CacheEntry(addresses, now + ttl, ttl, None, source))
+    
+    def put_failure(self, name: str, record_type: str, error: str, ttl: Optional[float] = None,
+                    now: Optional[float] = None, source: str = "") -> CacheEntry:
+        """Cache a failed lookup so it is not retried until the negative TTL runs out"""
+        ttl = self.negative_ttl if ttl is None else min(ttl, self.max_ttl)
+        now = self.clock() if now is None else now
+        return self._insert(cache_key(name, record_type), CacheEntry((), now + ttl, ttl, error, source))
+    
+    def _insert(self, key: CacheKey, entry: CacheEntry) -> CacheEntry:
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        return entry
+    
+    def invalidate(self, name: str, record_type: Optional[str] = None) -> int:
+        """Drop one record type of a name, or every type when record_type is None"""
+        if record_type is not None:
+            return 1 if self.entries.pop(cache_key(name, record_type), None) is not None else 0
+        name = cache_key(name)[0]
+        keys: List[CacheKey] = [key for key in self.entries if key[0] == name]
+        for key in keys:
+            del self.entries[key]
+        return len(keys)
+    
+    def clear(self) -> None:
+        self.entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size, hit/miss counters and the hit ratio"""
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "expirations": self.expirations,
+            "evictions": self.evictions,
+            "hit_ratio": (self.hits + self.negative_hits) / lookups if lookups else 0.0
+        }
+
+class PersistentDNSCache(DNSCache):
+    """
+    DNSCache backed by a SQLite file so answers survive restarts
+    
+    Entries store their absolute expiry time, so TTLs keep running while no
+    process is up. The file is opened on the first lookup; a name missing
+    from memory is then read through from disk, which also picks up answers
+    written by other processes sharing the file. WAL mode and a busy timeout
+    let several processes read and write the file at once.
+    """
+    
+    def __init__(self, path: str, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 negative_ttl: float = DEFAULT_NEGATIVE_TTL, max_ttl: float = MAX_TTL,
+                 clock: Callable[[], float] = time.time):
+        super().__init__(max_entries, negative_ttl, max_ttl, clock)
+        self.path = path
+        self.disk_hits = 0
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def db(self) -> sqlite3.Connection:
+        """Connection to the cache file, created and pruned of expired rows on first use"""
+        if self._db is None:
+            db = sqlite3.connect(self.path, timeout=10.0, isolation_level=None, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS dns_cache ("
+                "name TEXT NOT NULL, type TEXT NOT NULL, addresses TEXT NOT NULL, expires REAL NOT NULL, "
+                "ttl REAL NOT NULL, error TEXT, source TEXT NOT NULL, PRIMARY KEY (name, type))"
+            )
+            db.execute("DELETE FROM dns_cache WHERE expires <= ?", (self.clock(),))
+            self._db = db
+        return self._db
+    
+    def get(self, name: str, record_type: str = "A", now: Optional[float] = None) -> Optional[CacheEntry]:
+        key = cache_key(name, record_type)
+        if key not in self.entries:
+            now = self.clock() if now is None else now
+            with self._lock:
+                row = self.db.execute(
+                    "SELECT addresses, expires, ttl, error, source FROM dns_cache "
+                    "WHERE name = ? AND type = ? AND expires > ?", (*key, now)
+                ).fetchone()
+            if row is not None:
+                addresses, expires, ttl, error, source = row
+                DNSCache._insert(self, key, CacheEntry(addresses.split() if addresses else (),
+                                                       expires, ttl, error, source))
+                self.disk_hits += 1
+        return super().get(name, record_type, now)
+    
+    def _insert(self, key: CacheKey, entry: CacheEntry) -> CacheEntry:
+        with self._lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO dns_cache VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (*key, " ".join(entry.addresses), entry.expires, entry.ttl, entry.error, entry.source)
+            )
+        return super()._insert(key, entry)
+    
+    def invalidate(self, name: str, record_type: Optional[str] = None) -> int:
+        with self._lock:
+            if record_type is not None:
+                self.db.execute("DELETE FROM dns_cache WHERE name = ? AND type = ?", cache_key(name, record_type))
+            else:
+                self.db.execute("DELETE FROM dns_cache WHERE name = ?", (cache_key(name)[0],))
+        return super().invalidate(name, record_type)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self.db.execute("DELETE FROM dns_cache")
+        super().clear()
+    
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+    
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats["disk_hits"] = self.disk_hits
+        return stats
\ No newline at end of file
@@ -10,19 +10,242 @@ from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich import box
 import socket
 import time
-from typing import Optional, Tuple
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from dns_cache import DEFAULT_MAX_ENTRIES, DEFAULT_NEGATIVE_TTL, CacheEntry, DNSCache, PersistentDNSCache
+from dns_wire import DNSResponse, DNSWireClient, reverse_name
+from dns_zone import SimulatedZone
+from reverse_dns import ReverseDNS
 
 console = Console()
 
+DNS_PROVIDERS = {"8.8.8.8": "Google", "1.1.1.1": "Cloudflare", "208.67.222.222": "OpenDNS"}
+
 class DNSResolver:
     """Handles DNS resolution with visual feedback"""
     
-    def __init__(self):
+    def __init__(self, cache_size: int = DEFAULT_MAX_ENTRIES, negative_ttl: float = DEFAULT_NEGATIVE_TTL,
+                 default_ttl: float = 300.0, use_wire: bool = False, wire_timeout: float = 2.0,
+                 hedge: bool = False, cache_path: Optional[str] = None,
+                 reverse_dns: Optional[ReverseDNS] = None, zone: Optional[SimulatedZone] = None):
+        """
+        Args:
+            use_wire: Query dns_servers directly over UDP instead of the system resolver
+            wire_timeout: Per-attempt timeout for wire queries, in seconds
+            hedge: Race wire queries across dns_servers instead of failing over one at a time
+            cache_path: SQLite file that keeps the cache across runs (in memory only when None)
+            reverse_dns: PTR lookup service to share with other modules (a private one when None)
+            zone: Simulated zone answering simulate_dns_query (built-in names only when None)
+        """
         self.dns_servers = [
             "8.8.8.8",      # Google DNS
             "1.1.1.1",      # Cloudflare DNS
             "208.67.222.222" # OpenDNS
         ]
+        # The system resolver does not report TTLs, so its answers are kept for default_ttl
+        self.default_ttl = default_ttl
+        if cache_path:
+            self.cache: DNSCache = PersistentDNSCache(cache_path, cache_size, negative_ttl)
+        else:
+            self.cache = DNSCache(cache_size, negative_ttl)
+        self.use_wire = use_wire
+        self.wire_timeout = wire_timeout
+        self.hedge = hedge
+        self.reverse_dns = reverse_dns if reverse_dns is not None else ReverseDNS()
+        self.zone = zone if zone is not None else SimulatedZone()
+        self._wire: Optional[DNSWireClient] = None
+    
+    @property
+    def wire(self) -> DNSWireClient:
+        """Wire-protocol client for dns_servers, rebuilt if the server list changes"""
+        if self._wire is None or self._wire.servers != self.dns_servers:
+            self._wire = DNSWireClient(self.dns_servers, timeout=self.wire_timeout)
+        return self._wire
+    
+    def server_health(self) -> List[Dict[str, Any]]:
+        """Latency and failure statistics of each DNS server, best first"""
+        wire = self.wire
+        return [wire.health_of(server).as_dict() for server in wire.ranked_servers()]
+    
+    def lookup(self, domain: str, record_type: str = "A") -> CacheEntry:
+        """
+        Resolve a name without any rendering, answering from the cache when possible
+        
+        Returns:
+            The cache entry: addresses on success, error set on failure
+        """
+        entry = self.cache.get(domain, record_type)
+        if entry is None:
+            entry = self._query(domain, record_type)
+        return entry
+    
+    def _query(self, domain: str, record_type: str = "A") -> CacheEntry:
+        """Ask the configured backend and cache the answer, including gaierror failures"""
+        if self.use_wire:
+            query_name = self._wire_name(domain, record_type)
+            if self.hedge:
+                response = self.wire.race(query_name, record_type)
+            else:
+                response = self.wire.query(query_name, record_type)
+            return self._cache_response(domain, response)
+        try:
+            addresses = self._system_lookup(domain, record_type)
+        except socket.gaierror as e:
+            return self._cache_failure(domain, record_type, e)
+        return self.cache.put(domain, record_type, addresses, self.default_ttl, source="System resolver")
+    
+    def _system_lookup(self, domain: str, record_type: str = "A") -> List[str]:
+        """Blocking getaddrinfo call; safe to run in worker threads since it never touches the cache"""
+        if record_type.upper() == "CNAME":
+            infos = socket.getaddrinfo(domain, None, socket.AF_UNSPEC, socket.SOCK_STREAM, 0, socket.AI_CANONNAME)
+            canonical = infos[0][3]
+            return [canonical] if canonical and canonical.lower() != domain.lower() else []
+        family = socket.AF_INET6 if record_type.upper() == "AAAA" else socket.AF_INET
+        infos = socket.getaddrinfo(domain, None, family, socket.SOCK_STREAM)
+        return list(dict.fromkeys(info[4][0] for info in infos))
+    
+    @staticmethod
+    def _wire_name(domain: str, record_type: str) -> str:
+        """PTR lookups accept a plain IP address and query its reverse name"""
+        if record_type.upper() == "PTR" and not domain.endswith(".arpa"):
+            return reverse_name(domain)
+        return domain
+    
+    def _cache_response(self, domain: str, response: DNSResponse) -> CacheEntry:
+        """Turn a wire response into a cache entry, using the real TTLs it carries"""
+        record_type = response.record_type
+        if response.timed_out:
+            # Timeouts say nothing about the name, so they are not cached
+            return CacheEntry((), 0.0, 0.0, f"Timed out resolving {domain} via {', '.join(self.dns_servers)}",
+                              response.server, timed_out=True)
+        if response.ok and response.addresses:
+            return self.cache.put(domain, record_type, response.addresses, response.ttl, source=response.server)
+        if response.ok:
+            error = f"No {record_type} records for {domain}"
+        else:
+            error = f"Failed to resolve {domain}: {response.status}"
+        return self.cache.put_failure(domain, record_type, error, response.negative_ttl, source=response.server)
+    
+    def _cache_failure(self, domain: str, record_type: str, error: Exception) -> CacheEntry:
+        return self.cache.put_failure(domain, record_type, f"Failed to resolve {domain}: {str(error)}")
+    
+    def resolve_many(self, domains: Iterable[str], record_type: str = "A", concurrency: int = 64,
+                     timeout: float = 5.0, rate: Optional[float] = None) -> Iterator[Tuple[str, CacheEntry]]:
+        """
+        Resolve many names concurrently, yielding (domain, entry) as each one completes
+        
+        Cached names are yielded straight away; the rest run on a pool of at most
+        concurrency threads. A query that takes longer than timeout seconds is
+        yielded as a failed entry (not cached), and its thread keeps counting
+        against the concurrency cap until the system resolver gives up.
+        
+        Args:
+            domains: Names to resolve, consumed lazily
+            concurrency: Maximum number of lookups in flight
+            timeout: Per-query time budget in seconds
+            rate: Maximum lookups started per second (unlimited when None); cache hits never wait
+        """
+        if self.use_wire:
+            yield from self._resolve_many_wire(domains, record_type, concurrency, timeout, rate)
+            return
+        
+        executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="resolve")
+        pending: Dict[Future, Tuple[str, float]] = {}
+        abandoned: Set[Future] = set()
+        names = iter(domains)
+        exhausted = False
+        interval = 1.0 / rate if rate else 0.0
+        next_release = time.monotonic()
+        held: Optional[str] = None  # Cache miss waiting for the rate limit
+        
+        try:
+            while True:
+                # Top up the pool, answering cached names without a worker
+                while not exhausted and len(pending) + len(abandoned) < concurrency:
+                    if held is None:
+                        domain = next(names, None)
+                        if domain is None:
+                            exhausted = True
+                            break
+                        entry = self.cache.get(domain, record_type)
+                        if entry is not None:
+                            yield domain, entry
+                            continue
+                        held = domain
+                    if interval:
+                        if time.monotonic() < next_release:
+                            break
+                        next_release += interval
+                    future = executor.submit(self._system_lookup, held, record_type)
+                    pending[future] = (held, time.monotonic() + timeout)
+                    held = None
+                
+                paced = held is not None and len(pending) + len(abandoned) < concurrency
+                if not pending:
+                    if exhausted:
+                        return
+                    if paced:
+                        time.sleep(max(next_release - time.monotonic(), 0))
+                        continue
+                    # Every worker is stuck on a timed-out query; wait for one to free up
+                    wait(abandoned, return_when=FIRST_COMPLETED)
+                    abandoned = {future for future in abandoned if not future.done()}
+                    continue
+                
+                next_deadline = min(deadline for _, deadline in pending.values())
+                if paced:
+                    next_deadline = min(next_deadline, next_release)
+                done, _ = wait(pending, timeout=max(next_deadline - time.monotonic(), 0),
+                               return_when=FIRST_COMPLETED)
+                for future in done:
+                    domain, _ = pending.pop(future)
+                    try:
+                        entry = self.cache.put(domain, record_type, future.result(), self.default_ttl)
+                    except socket.gaierror as e:
+                        entry = self._cache_failure(domain, record_type, e)
+                    except Exception as e:
+                        entry = CacheEntry((), 0.0, 0.0, f"Unexpected error: {str(e)}")
+                    yield domain, entry
+                
+                now = time.monotonic()
+                for future, (domain, deadline) in list(pending.items()):
+                    if deadline <= now:
+                        del pending[future]
+                        abandoned.add(future)
+                        yield domain, CacheEntry((), 0.0, 0.0, f"Timed out resolving {domain} after {timeout:g}s",
+                                                 timed_out=True)
+                abandoned = {future for future in abandoned if not future.done()}
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _resolve_many_wire(self, domains: Iterable[str], record_type: str, concurrency: int,
+                           timeout: float, rate: Optional[float] = None) -> Iterator[Tuple[str, CacheEntry]]:
+        """Pipeline every cache miss over one UDP socket to the best-ranked server"""
+        hits: "deque[Tuple[str, CacheEntry]]" = deque()
+        names: Dict[str, str] = {}
+        
+        def misses() -> Iterator[Tuple[str, str]]:
+            for domain in domains:
+                entry = self.cache.get(domain, record_type)
+                if entry is not None:
+                    hits.append((domain, entry))
+                    continue
+                query_name = self._wire_name(domain, record_type)
+                names[query_name] = domain
+                yield query_name, record_type
+        
+        per_attempt = timeout / (self.wire.retries + 1)
+        server = self.wire.ranked_servers()[0]
+        for response in self.wire.query_many(misses(), server, max_in_flight=concurrency, timeout=per_attempt,
+                                             rate=rate):
+            while hits:
+                yield hits.popleft()
+            domain = names.pop(response.name, response.name)
+            yield domain, self._cache_response(domain, response)
+        while hits:
+            yield hits.popleft()
     
     def resolve_domain(self, domain: str) -> Tuple[bool, Optional[str], Optional[str]]:
         """
@@ -38,13 +261,25 @@ class DNSResolver:
         ))
         console.print()
         
+        # Answer repeated lookups straight from the local cache
+        entry = self.cache.get(domain, "A")
+        if entry is not None:
+            if entry.negative:
+                console.print(f"[yellow]⚡ Cached failure: {entry.error}[/yellow]")
+                console.print()
+                return False, None, entry.error
+            console.print(f"[green]⚡ Local cache hit: {domain} → {entry.address}[/green]")
+            console.print()
+            self._display_resolution_results(domain, entry.address, entry, cached=True)
+            return True, entry.address, None
+        
         # Show DNS servers
         table = Table(title="🌐 DNS Servers", box=box.ROUNDED)
         table.add_column("Server", style="cyan", no_wrap=True)
         table.add_column("Provider", style="green")
         
         for i, server in enumerate(self.dns_servers, 1):
-            provider = "Google" if server == "8.8.8.8" else "Cloudflare" if server == "1.1.1.1" else "OpenDNS"
+            provider = DNS_PROVIDERS.get(server, "Custom")
             table.add_row(f"{i}. {server}", provider)
         
         console.print(table)
@@ -71,50 +306,66 @@ class DNSResolver:
             time.sleep(1)
             
             try:
-                # Actual DNS resolution
-                ip_address = socket.gethostbyname(domain)
+                # Actual DNS resolution; failures are negatively cached
+                entry = self._query(domain, "A")
+                if entry.negative:
+                    progress.update(task2, description=f"❌ {entry.error}")
+                    time.sleep(0.5)
+                    return False, None, entry.error
+                
+                ip_address = entry.address
                 progress.update(task2, description=f"✅ Resolved: {domain} → {ip_address}")
                 time.sleep(0.5)
                 
                 # Display results
-                self._display_resolution_results(domain, ip_address)
+                self._display_resolution_results(domain, ip_address, entry)
                 return True, ip_address, None
                 
-            except socket.gaierror as e:
-                error_msg = f"Failed to resolve {domain}: {str(e)}"
-                progress.update(task2, description=f"❌ {error_msg}")
-                time.sleep(0.5)
-                return False, None, error_msg
             except Exception as e:
                 error_msg = f"Unexpected error: {str(e)}"
                 progress.update(task2, description=f"❌ {error_msg}")
                 time.sleep(0.5)
                 return False, None, error_msg
     
-    def _display_resolution_results(self, domain: str, ip_address: str) -> None:
+    def _display_resolution_results(self, domain: str, ip_address: str, entry: Optional[CacheEntry] = None,
+                                    cached: bool = False) -> None:
         """Display DNS resolution results"""
+        # Start the PTR lookup now so it runs while the table renders
+        ptr_lookup = self.reverse_dns.submit(ip_address)
         table = Table(title="✅ DNS Resolution Results", box=box.ROUNDED)
         table.add_column("Field", style="cyan", no_wrap=True)
         table.add_column("Value", style="green")
         
+        ttl = entry.remaining(self.cache.clock()) if entry is not None else int(self.default_ttl)
         table.add_row("Domain", domain)
         table.add_row("IP Address", ip_address)
+        if entry is not None and len(entry.addresses) > 1:
+            table.add_row("Other Addresses", ", ".join(entry.addresses[1:]))
         table.add_row("Record Type", "A")
-        table.add_row("TTL", "300 seconds")
-        table.add_row("DNS Server", "8.8.8.8 (Google)")
+        table.add_row("TTL", f"{ttl} seconds")
+        table.add_row("DNS Server", self._server_label(entry.source if entry is not None else ""))
+        table.add_row("Cache", "Hit" if cached else "Miss (now cached)")
         
         console.print(table)
         console.print()
         
-        # Show reverse DNS lookup
+        # Show reverse DNS lookup, waiting no longer than the PTR service's budget
         try:
-            reverse_name = socket.gethostbyaddr(ip_address)[0]
-            console.print(f"[dim]Reverse DNS: {ip_address} → {reverse_name}[/dim]")
-        except:
-            console.print(f"[dim]Reverse DNS: {ip_address} → No PTR record[/dim]")
+            ptr_name = ptr_lookup.result(timeout=self.reverse_dns.timeout)
+        except FutureTimeoutError:
+            console.print(f"[dim]Reverse DNS: {ip_address} → lookup still pending[/dim]")
+        else:
+            console.print(f"[dim]Reverse DNS: {ip_address} → {ptr_name or 'No PTR record'}[/dim]")
         
         console.print()
     
+    @staticmethod
+    def _server_label(source: str) -> str:
+        """Label the server an answer came from, with its provider when known"""
+        if source in DNS_PROVIDERS:
+            return f"{source} ({DNS_PROVIDERS[source]})"
+        return source or "System resolver"
+    
     def simulate_dns_query(self, domain: str) -> str:
         """Simulate DNS query for offline mode"""
         console.print(Panel.fit(
@@ -124,24 +375,11 @@ class DNSResolver:
         ))
         console.print()
         
-        # Simulate common domain resolutions
-        common_domains = {
-            "example.com": "93.184.216.34",
-            "google.com": "142.250.185.78",
-            "github.com": "140.82.113.4",
-            "stackoverflow.com": "151.101.193.69",
-            "reddit.com": "151.101.193.140"
-        }
-        
-        if domain in common_domains:
-            ip_address = common_domains[domain]
-        else:
-            # Generate a fake IP for unknown domains
-            import random
-            ip_address = f"192.168.{random.randint(1, 254)}.{random.randint(1, 254)}"
-        
-        time.sleep(1)
-        console.print(f"[green]✅ Simulated resolution: {domain} → {ip_address}[/green]")
+        # Known names come from the zone; unknown ones get a hash-derived address, so runs are reproducible
+        answer = self.zone.lookup(domain)
+        origin = "zone" if answer.source != "fallback" else "generated"
+        console.print(f"[green]✅ Simulated resolution: {domain} → {answer.address}[/green] "
+                      f"[dim]({origin}, TTL {answer.ttl}s)[/dim]")
         console.print()
         
-        return ip_address 
\ No newline at end of file
+        return answer.address 
\ No newline at end of file
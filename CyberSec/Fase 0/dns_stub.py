@@ -0,0 +1,155 @@
+"""
+Stub DNS Server Module for Packet Odyssey
+Local stand-in UDP DNS server for tests and benchmarks without network access
+"""
+
+import heapq
+import random
+import selectors
+import socket
+import struct
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+from dns_wire import (
+    CLASS_IN, RECORD_NAMES, RECORD_TYPES, DNSFormatError, decode_name, encode_name
+)
+
+_HEADER = struct.Struct("!HHHHHH")
+_QUESTION = struct.Struct("!HH")
+_RECORD = struct.Struct("!HHIH")
+_SOA_TIMERS = struct.Struct("!IIIII")
+
+RecordKey = Tuple[str, str]
+
+class StubDNSServer:
+    """
+    Authoritative-only UDP DNS server answering from an in-memory record table
+    
+    Answers A/AAAA/CNAME/PTR/NS queries (following CNAME chains), returns
+    NXDOMAIN with an SOA for unknown names, and can add latency or drop a
+    fraction of queries to imitate a slow or lossy upstream, or answer every
+    query with a fixed error rcode (2 for SERVFAIL, 5 for REFUSED). Delayed answers
+    are scheduled rather than slept on, so one slow query never holds up others.
+    """
+    
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, delay: float = 0.0,
+                 drop_rate: float = 0.0, negative_ttl: int = 60, seed: int = 0, rcode: Optional[int] = None):
+        self.records: Dict[RecordKey, List[Tuple[str, int]]] = {}
+        self.names: Set[str] = set()
+        self.delay = delay
+        self.drop_rate = drop_rate
+        self.negative_ttl = negative_ttl
+        self.rcode = rcode
+        self.random = random.Random(seed)
+        self.queries = 0
+        self.sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, port))
+        self.sock.setblocking(False)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def address(self) -> str:
+        """host:port string accepted as a DNS server by DNSWireClient and DNSResolver"""
+        host, port = self.sock.getsockname()[:2]
+        return f"[{host}]:{port}" if ":" in host else f"{host}:{port}"
+    
+    def add_record(self, name: str, record_type: str, value: str, ttl: int = 300) -> None:
+        name = name.rstrip(".").lower()
+        self.records.setdefault((name, record_type), []).append((value, ttl))
+        self.names.add(name)
+    
+    def start(self) -> "StubDNSServer":
+        self._thread = threading.Thread(target=self._serve, name="stub-dns", daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.sock.close()
+    
+    def __enter__(self) -> "StubDNSServer":
+        return self.start()
+    
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+    
+    def _serve(self) -> None:
+        selector = selectors.DefaultSelector()
+        selector.register(self.sock, selectors.EVENT_READ)
+        scheduled: List[Tuple[float, int, bytes, Tuple]] = []
+        order = 0
+        while not self._stop.is_set():
+            wait = min(max(scheduled[0][0] - time.monotonic(), 0), 0.05) if scheduled else 0.05
+            if selector.select(wait):
+                while True:
+                    try:
+                        message, source = self.sock.recvfrom(4096)
+                    except (BlockingIOError, InterruptedError):
+                        break
+                    self.queries += 1
+                    if self.drop_rate and self.random.random() < self.drop_rate:
+                        continue
+                    try:
+                        response = self.answer(message)
+                    except (DNSFormatError, struct.error):
+                        continue
+                    order += 1
+                    heapq.heappush(scheduled, (time.monotonic() + self.delay, order, response, source))
+            now = time.monotonic()
+            while scheduled and scheduled[0][0] <= now:
+                _, _, response, source = heapq.heappop(scheduled)
+                self.sock.sendto(response, source)
+        selector.close()
+    
+    def answer(self, message: bytes) -> bytes:
+        """Build the response to one query message"""
+        transaction_id, flags, qdcount, _, _, _ = _HEADER.unpack_from(message, 0)
+        if qdcount != 1:
+            raise DNSFormatError("Stub server only answers single-question queries")
+        name, offset = decode_name(message, _HEADER.size)
+        type_id, _ = _QUESTION.unpack_from(message, offset)
+        question = message[_HEADER.size:offset + _QUESTION.size]
+        if self.rcode is not None:
+            return _HEADER.pack(transaction_id, 0x8000 | (flags & 0x0100) | 0x0080 | self.rcode, 1, 0, 0, 0) + question
+        record_type = RECORD_NAMES.get(type_id, "")
+        
+        answers = []
+        current = name.lower()
+        for _ in range(8):
+            records = self.records.get((current, record_type))
+            if records:
+                answers += [(current, record_type, value, ttl) for value, ttl in records]
+                break
+            aliases = self.records.get((current, "CNAME"))
+            if not aliases or record_type == "CNAME":
+                break
+            target, ttl = aliases[0]
+            answers.append((current, "CNAME", target, ttl))
+            current = target.rstrip(".").lower()
+        
+        rcode = 0 if answers or name.lower() in self.names else 3
+        body = bytearray(question)
+        for owner, kind, value, ttl in answers:
+            rdata = self._encode_rdata(kind, value)
+            body += encode_name(owner) + _RECORD.pack(RECORD_TYPES[kind], CLASS_IN, ttl, len(rdata)) + rdata
+        authority = 0
+        if not answers:
+            # SOA in the authority section carries the negative caching TTL (RFC 2308)
+            rdata = encode_name("ns.stub.test") + encode_name("hostmaster.stub.test") + \
+                _SOA_TIMERS.pack(1, 3600, 600, 86400, self.negative_ttl)
+            body += encode_name("stub.test") + _RECORD.pack(6, CLASS_IN, self.negative_ttl, len(rdata)) + rdata
+            authority = 1
+        header_flags = 0x8000 | 0x0400 | (flags & 0x0100) | 0x0080 | rcode
+        return _HEADER.pack(transaction_id, header_flags, 1, len(answers), authority, 0) + bytes(body)
+    
+    @staticmethod
+    def _encode_rdata(record_type: str, value: str) -> bytes:
+        if record_type == "A":
+            return socket.inet_pton(socket.AF_INET, value)
+        if record_type == "AAAA":
+            return socket.inet_pton(socket.AF_INET6, value)
+        return encode_name(value)
\ No newline at end of file
@@ -0,0 +1,547 @@
+"""
+DNS Wire Protocol Module for Packet Odyssey
+Encodes and decodes DNS messages and pipelines queries over one UDP socket
+"""
+
+import ipaddress
+import random
+import selectors
+import socket
+import struct
+import time
+from collections import deque
+from typing import Dict, Any, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+DNS_PORT = 53
+MAX_UDP_PAYLOAD = 4096
+
+RECORD_TYPES = {"A": 1, "NS": 2, "CNAME": 5, "SOA": 6, "PTR": 12, "AAAA": 28}
+RECORD_NAMES = {value: name for name, value in RECORD_TYPES.items()}
+RCODE_NAMES = {0: "NOERROR", 1: "FORMERR", 2: "SERVFAIL", 3: "NXDOMAIN", 4: "NOTIMP", 5: "REFUSED"}
+CLASS_IN = 1
+
+_HEADER = struct.Struct("!HHHHHH")
+_QUESTION = struct.Struct("!HH")
+_RECORD = struct.Struct("!HHIH")
+_SOA_TIMERS = struct.Struct("!IIIII")
+
+class DNSFormatError(ValueError):
+    """Raised when a DNS message cannot be parsed"""
+
+class ResourceRecord(NamedTuple):
+    name: str
+    record_type: str
+    ttl: int
+    data: str
+
+class DNSResponse:
+    """One answer to a query, or the record of a query that timed out"""
+    
+    __slots__ = ("name", "record_type", "transaction_id", "rcode", "answers", "negative_ttl",
+                 "server", "elapsed")
+    
+    def __init__(self, name: str, record_type: str, transaction_id: int, rcode: Optional[int],
+                 answers: Sequence[ResourceRecord] = (), negative_ttl: Optional[int] = None,
+                 server: str = "", elapsed: float = 0.0):
+        self.name = name
+        self.record_type = record_type
+        self.transaction_id = transaction_id
+        self.rcode = rcode
+        self.answers = list(answers)
+        self.negative_ttl = negative_ttl
+        self.server = server
+        self.elapsed = elapsed
+    
+    @property
+    def timed_out(self) -> bool:
+        return self.rcode is None
+    
+    @property
+    def ok(self) -> bool:
+        return self.rcode == 0
+    
+    @property
+    def status(self) -> str:
+        return "TIMEOUT" if self.rcode is None else RCODE_NAMES.get(self.rcode, f"RCODE{self.rcode}")
+    
+    @property
+    def addresses(self) -> List[str]:
+        """Record data of the requested type, following any CNAME chain in the answer"""
+        return [record.data for record in self.answers if record.record_type == self.record_type]
+    
+    @property
+    def ttl(self) -> int:
+        """Smallest TTL along the answer chain, or the negative TTL of a failure"""
+        if self.answers:
+            return min(record.ttl for record in self.answers)
+        return self.negative_ttl or 0
+
+def reverse_name(address: str) -> str:
+    """PTR query name for an IPv4 or IPv6 address (in-addr.arpa / ip6.arpa)"""
+    return ipaddress.ip_address(address).reverse_pointer
+
+def encode_name(name: str) -> bytes:
+    """Encode a dotted name as length-prefixed labels"""
+    encoded = bytearray()
+    for label in name.rstrip(".").split("."):
+        if not label:
+            continue
+        raw = label.encode("idna")
+        if len(raw) > 63:
+            raise DNSFormatError(f"Label too long in {name}")
+        encoded.append(len(raw))
+        encoded += raw
+    encoded.append(0)
+    return bytes(encoded)
+
+def encode_query(transaction_id: int, name: str, record_type: str = "A", recursion_desired: bool = True) -> bytes:
+    """Build a standard query with one question"""
+    flags = 0x0100 if recursion_desired else 0
+    return (_HEADER.pack(transaction_id, flags, 1, 0, 0, 0) + encode_name(name)
+            + _QUESTION.pack(RECORD_TYPES[record_type], CLASS_IN))
+
+def decode_name(message: bytes, offset: int) -> Tuple[str, int]:
+    """
+    Decode a possibly compressed name
+    
+    Returns:
+        (name, offset just past the name in the original position)
+    """
+    labels = []
+    end = None
+    jumps = 0
+    while True:
+        if offset >= len(message):
+            raise DNSFormatError("Name runs past the end of the message")
+        length = message[offset]
+        if length & 0xC0 == 0xC0:
+            if offset + 1 >= len(message):
+                raise DNSFormatError("Truncated compression pointer")
+            if end is None:
+                end = offset + 2
+            jumps += 1
+            if jumps > 32:
+                raise DNSFormatError("Compression pointer loop")
+            offset = ((length & 0x3F) << 8) | message[offset + 1]
+        elif length == 0:
+            return ".".join(labels), end if end is not None else offset + 1
+        else:
+            labels.append(message[offset + 1:offset + 1 + length].decode("ascii", "replace"))
+            offset += 1 + length
+
+def _decode_rdata(message: bytes, offset: int, length: int, type_id: int) -> str:
+    if type_id == 1 and length == 4:
+        return socket.inet_ntop(socket.AF_INET, message[offset:offset + 4])
+    if type_id == 28 and length == 16:
+        return socket.inet_ntop(socket.AF_INET6, message[offset:offset + 16])
+    if type_id in (2, 5, 12):
+        return decode_name(message, offset)[0]
+    return message[offset:offset + length].hex()
+
+def parse_response(message: bytes) -> Tuple[int, int, str, str, List[ResourceRecord], Optional[int]]:
+    """
+    Parse a response message
+    
+    Returns:
+        (transaction_id, rcode, question name, question type, answers, negative TTL from the SOA)
+    """
+    if len(message) < _HEADER.size:
+        raise DNSFormatError("Message shorter than a DNS header")
+    transaction_id, flags, qdcount, ancount, nscount, _ = _HEADER.unpack_from(message, 0)
+    if not flags & 0x8000:
+        raise DNSFormatError("Message is not a response")
+    offset = _HEADER.size
+    question_name, question_type = "", ""
+    for _ in range(qdcount):
+        question_name, offset = decode_name(message, offset)
+        type_id, _ = _QUESTION.unpack_from(message, offset)
+        question_type = RECORD_NAMES.get(type_id, str(type_id))
+        offset += _QUESTION.size
+    
+    answers = []
+    negative_ttl = None
+    for index in range(ancount + nscount):
+        name, offset = decode_name(message, offset)
+        if offset + _RECORD.size > len(message):
+            raise DNSFormatError("Truncated resource record")
+        type_id, _, ttl, length = _RECORD.unpack_from(message, offset)
+        offset += _RECORD.size
+        if index < ancount:
+            answers.append(ResourceRecord(name, RECORD_NAMES.get(type_id, str(type_id)), ttl,
+                                          _decode_rdata(message, offset, length, type_id)))
+        elif type_id == 6:
+            # RFC 2308: negative answers live for min(SOA TTL, SOA MINIMUM)
+            _, timers_offset = decode_name(message, offset)
+            _, timers_offset = decode_name(message, timers_offset)
+            minimum = _SOA_TIMERS.unpack_from(message, timers_offset)[4]
+            negative_ttl = min(ttl, minimum)
+        offset += length
+    return transaction_id, flags & 0x000F, question_name, question_type, answers, negative_ttl
+
+class ServerHealth:
+    """
+    Latency and failure tracking for one upstream server
+    
+    Latency is smoothed like TCP's RTT estimator (RFC 6298): an EWMA of the
+    samples plus an EWMA of their deviation. Consecutive failures push a
+    server down the ranking until it answers again.
+    """
+    
+    __slots__ = ("server", "latency", "deviation", "samples", "failures", "consecutive_failures")
+    
+    ALPHA = 0.125
+    BETA = 0.25
+    
+    def __init__(self, server: str, initial_latency: float = 0.1):
+        self.server = server
+        self.latency = initial_latency
+        self.deviation = initial_latency / 2
+        self.samples = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+    
+    def observe(self, elapsed: float) -> None:
+        """Fold one latency sample into the averages"""
+        if self.samples == 0:
+            self.latency = elapsed
+            self.deviation = elapsed / 2
+        else:
+            self.deviation += self.BETA * (abs(elapsed - self.latency) - self.deviation)
+            self.latency += self.ALPHA * (elapsed - self.latency)
+        self.samples += 1
+    
+    def fail(self) -> None:
+        self.failures += 1
+        self.consecutive_failures += 1
+    
+    def record(self, response: "DNSResponse") -> None:
+        """Update from a response: timeouts and server errors count as failures"""
+        if response.timed_out or response.rcode not in (0, 3):
+            self.fail()
+            if response.timed_out:
+                return
+        else:
+            self.consecutive_failures = 0
+        self.observe(response.elapsed)
+    
+    @property
+    def score(self) -> float:
+        """Expected latency, doubled for every consecutive failure"""
+        return (self.latency + self.deviation) * (2 ** min(self.consecutive_failures, 10))
+    
+    def hedge_delay(self, floor: float = 0.005, ceiling: float = 1.0) -> float:
+        """How long to wait for this server before hedging to the next one"""
+        return min(max(self.latency + 4 * self.deviation, floor), ceiling)
+    
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "server": self.server,
+            "latency_ms": self.latency * 1000,
+            "deviation_ms": self.deviation * 1000,
+            "samples": self.samples,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures
+        }
+
+class _Pending:
+    """Bookkeeping for one in-flight query"""
+    
+    __slots__ = ("name", "record_type", "packet", "sent", "deadline", "attempts")
+    
+    def __init__(self, name: str, record_type: str, packet: bytes):
+        self.name = name
+        self.record_type = record_type
+        self.packet = packet
+        self.sent = 0.0
+        self.deadline = 0.0
+        self.attempts = 0
+
+class DNSWireClient:
+    """
+    Minimal stub resolver speaking the DNS wire protocol over UDP
+    
+    query_many() pipelines any number of queries over one non-blocking socket:
+    up to max_in_flight are outstanding at once, responses are matched by
+    transaction ID, source address and question, and unanswered queries are
+    retransmitted until their retries run out.
+    """
+    
+    def __init__(self, servers: Sequence[str], port: int = DNS_PORT, timeout: float = 2.0,
+                 retries: int = 1, seed: Optional[int] = None):
+        self.servers = list(servers)
+        self.port = port
+        self.timeout = timeout
+        self.retries = retries
+        self.random = random.Random(seed)
+        self.stats = {"sent": 0, "received": 0, "retransmits": 0, "timeouts": 0, "mismatched": 0,
+                      "hedges": 0}
+        self.health: Dict[str, ServerHealth] = {}
+    
+    def health_of(self, server: str) -> ServerHealth:
+        health = self.health.get(server)
+        if health is None:
+            health = self.health[server] = ServerHealth(server)
+        return health
+    
+    def ranked_servers(self) -> List[str]:
+        """Configured servers, fastest and healthiest first"""
+        return sorted(self.servers, key=lambda server: self.health_of(server).score)
+    
+    def _new_transaction_id(self, in_flight: Dict[int, _Pending]) -> int:
+        while True:
+            transaction_id = self.random.getrandbits(16)
+            if transaction_id not in in_flight:
+                return transaction_id
+    
+    def _address(self, server: str) -> Tuple[Any, ...]:
+        """Split "host", "host:port" or "[v6]:port" into a socket address"""
+        if server.startswith("["):
+            host, _, port = server[1:].partition("]:")
+        elif server.count(":") == 1:
+            host, _, port = server.partition(":")
+        else:
+            host, port = server, ""
+        return (host.rstrip("]"), int(port) if port else self.port)
+    
+    def query(self, name: str, record_type: str = "A", server: Optional[str] = None) -> DNSResponse:
+        """
+        Send one query, failing over to the next best-ranked server on timeout
+        
+        Returns:
+            The first response received; a timed-out DNSResponse if no server answered
+        """
+        response = None
+        for candidate in [server] if server else self.ranked_servers():
+            response = next(self.query_many([(name, record_type)], candidate))
+            if not response.timed_out:
+                return response
+        return response
+    
+    def race(self, name: str, record_type: str = "A", timeout: Optional[float] = None,
+             max_hedge_delay: float = 1.0) -> DNSResponse:
+        """
+        Hedged query: ask the best-ranked server, then the next ones if it is slow
+        
+        Each further server is queried once the previous one has had its hedge
+        delay (its smoothed latency plus four deviations) without answering, or
+        immediately when it answers SERVFAIL/REFUSED. The first NOERROR or
+        NXDOMAIN answer from any server wins.
+        
+        Returns:
+            The winning response; a timed-out DNSResponse if nothing valid arrived within timeout
+        """
+        timeout = self.timeout if timeout is None else timeout
+        servers = self.ranked_servers()
+        started = time.monotonic()
+        deadline = started + timeout
+        sockets: Dict[int, socket.socket] = {}
+        selector = selectors.DefaultSelector()
+        # transaction_id -> (server, address, send time)
+        in_flight: Dict[int, Tuple[str, Tuple[Any, ...], float]] = {}
+        next_server = 0
+        next_hedge = started
+        last = None
+        
+        try:
+            while True:
+                now = time.monotonic()
+                if next_server < len(servers) and now >= next_hedge:
+                    server = servers[next_server]
+                    address = self._address(server)
+                    family = socket.AF_INET6 if ":" in address[0] else socket.AF_INET
+                    sock = sockets.get(family)
+                    if sock is None:
+                        sock = sockets[family] = socket.socket(family, socket.SOCK_DGRAM)
+                        sock.setblocking(False)
+                        selector.register(sock, selectors.EVENT_READ)
+                    transaction_id = self._new_transaction_id(in_flight)
+                    try:
+                        sock.sendto(encode_query(transaction_id, name, record_type), address)
+                    except OSError:
+                        pass
+                    in_flight[transaction_id] = (server, address, now)
+                    self.stats["sent"] += 1
+                    if next_server:
+                        self.stats["hedges"] += 1
+                    next_server += 1
+                    next_hedge = now + self.health_of(server).hedge_delay(ceiling=max_hedge_delay)
+                    continue
+                
+                if not in_flight and next_server >= len(servers):
+                    return last  # Every server answered with an error: nothing left to wait for
+                if now >= deadline:
+                    break
+                wait = deadline - now
+                if next_server < len(servers):
+                    wait = min(wait, max(next_hedge - now, 0))
+                for key, _ in selector.select(wait):
+                    while True:
+                        try:
+                            message, source = key.fileobj.recvfrom(MAX_UDP_PAYLOAD)
+                        except (BlockingIOError, InterruptedError):
+                            break
+                        except OSError:
+                            break
+                        response = self._match_race(message, source, name, record_type, in_flight)
+                        if response is None:
+                            continue
+                        self.health_of(response.server).record(response)
+                        if response.rcode in (0, 3):
+                            self.stats["received"] += 1
+                            self._penalize_slower(in_flight, response.elapsed)
+                            return response
+                        last = response
+                        next_hedge = time.monotonic()  # Server error: hedge right away
+            
+            self.stats["timeouts"] += 1
+            for server, _, _ in in_flight.values():
+                self.health_of(server).fail()
+            return last or DNSResponse(name, record_type, 0, None, server=",".join(servers),
+                                       elapsed=time.monotonic() - started)
+        finally:
+            selector.close()
+            for sock in sockets.values():
+                sock.close()
+    
+    def _match_race(self, message: bytes, source: Tuple[Any, ...], name: str, record_type: str,
+                    in_flight: Dict[int, Tuple[str, Tuple[Any, ...], float]]) -> Optional[DNSResponse]:
+        try:
+            transaction_id, rcode, question_name, question_type, answers, negative_ttl = parse_response(message)
+        except (DNSFormatError, struct.error, UnicodeError):
+            self.stats["mismatched"] += 1
+            return None
+        entry = in_flight.get(transaction_id)
+        if (entry is None or source[:2] != entry[1] or question_type != record_type
+                or question_name.lower() != name.rstrip(".").lower()):
+            self.stats["mismatched"] += 1
+            return None
+        del in_flight[transaction_id]
+        server, _, sent = entry
+        return DNSResponse(name, record_type, transaction_id, rcode, answers, negative_ttl,
+                           server, time.monotonic() - sent)
+    
+    def _penalize_slower(self, in_flight: Dict[int, Tuple[str, Tuple[Any, ...], float]], elapsed: float) -> None:
+        """Servers queried before the winner that have not answered were at least this slow"""
+        now = time.monotonic()
+        for server, _, sent in in_flight.values():
+            waited = now - sent
+            if waited > elapsed:
+                health = self.health_of(server)
+                health.observe(max(waited, health.latency))
+    
+    def query_many(self, queries: Iterable[Tuple[str, str]], server: Optional[str] = None,
+                   max_in_flight: int = 256, timeout: Optional[float] = None,
+                   rate: Optional[float] = None) -> Iterator[DNSResponse]:
+        """
+        Pipeline (name, record type) queries to one server, yielding responses as they arrive
+        
+        Queries are consumed lazily, so any number can be streamed through with
+        at most max_in_flight outstanding. timeout overrides the per-attempt
+        timeout for this batch; rate caps new queries per second on a fixed
+        schedule, so slow answers do not lower the offered load.
+        """
+        label = server or self.servers[0]
+        address = self._address(label)
+        health = self.health_of(label)
+        timeout = self.timeout if timeout is None else timeout
+        family = socket.AF_INET6 if ":" in address[0] else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_DGRAM)
+        sock.setblocking(False)
+        selector = selectors.DefaultSelector()
+        selector.register(sock, selectors.EVENT_READ)
+        pending_queries = iter(queries)
+        in_flight: Dict[int, _Pending] = {}
+        deadlines: "deque[Tuple[float, int, int]]" = deque()
+        exhausted = False
+        stats = self.stats
+        interval = 1.0 / rate if rate else 0.0
+        next_release = time.monotonic()
+        
+        def send(transaction_id: int, query: _Pending) -> None:
+            query.attempts += 1
+            query.sent = time.monotonic()
+            query.deadline = query.sent + timeout
+            deadlines.append((query.deadline, transaction_id, query.attempts))
+            try:
+                sock.sendto(query.packet, address)
+            except (BlockingIOError, InterruptedError):
+                pass  # Treated as a lost datagram: the retransmit timer covers it
+            stats["sent"] += 1
+        
+        try:
+            while True:
+                while not exhausted and len(in_flight) < max_in_flight:
+                    if interval:
+                        if time.monotonic() < next_release:
+                            break
+                        next_release += interval
+                    item = next(pending_queries, None)
+                    if item is None:
+                        exhausted = True
+                        break
+                    name, record_type = item
+                    transaction_id = self._new_transaction_id(in_flight)
+                    query = _Pending(name, record_type, encode_query(transaction_id, name, record_type))
+                    in_flight[transaction_id] = query
+                    send(transaction_id, query)
+                
+                if not in_flight and exhausted:
+                    return
+                
+                while deadlines and (deadlines[0][1] not in in_flight
+                                     or in_flight[deadlines[0][1]].attempts != deadlines[0][2]):
+                    deadlines.popleft()  # Answered or already retransmitted
+                wait = max(deadlines[0][0] - time.monotonic(), 0) if deadlines else timeout
+                if interval and not exhausted and len(in_flight) < max_in_flight:
+                    wait = min(wait, max(next_release - time.monotonic(), 0))
+                if selector.select(wait):
+                    while True:
+                        try:
+                            message, source = sock.recvfrom(MAX_UDP_PAYLOAD)
+                        except (BlockingIOError, InterruptedError):
+                            break
+                        except OSError:
+                            break  # e.g. ICMP port unreachable surfaced as ECONNREFUSED
+                        response = self._match(message, source, address, label, in_flight)
+                        if response is not None:
+                            health.record(response)
+                            yield response
+                
+                now = time.monotonic()
+                while deadlines and deadlines[0][0] <= now:
+                    _, transaction_id, attempt = deadlines.popleft()
+                    query = in_flight.get(transaction_id)
+                    if query is None or query.attempts != attempt:
+                        continue
+                    if query.attempts <= self.retries:
+                        stats["retransmits"] += 1
+                        send(transaction_id, query)
+                    else:
+                        del in_flight[transaction_id]
+                        stats["timeouts"] += 1
+                        response = DNSResponse(query.name, query.record_type, transaction_id, None,
+                                               server=label, elapsed=now - query.sent)
+                        health.record(response)
+                        yield response
+        finally:
+            selector.close()
+            sock.close()
+    
+    def _match(self, message: bytes, source: Tuple[Any, ...], address: Tuple[Any, ...], label: str,
+               in_flight: Dict[int, _Pending]) -> Optional[DNSResponse]:
+        """Pair a datagram with its query; spoofed or stray datagrams are counted and dropped"""
+        try:
+            transaction_id, rcode, question_name, question_type, answers, negative_ttl = parse_response(message)
+        except (DNSFormatError, struct.error, UnicodeError):
+            self.stats["mismatched"] += 1
+            return None
+        query = in_flight.get(transaction_id)
+        if (query is None or source[0] != address[0] or source[1] != address[1]
+                or question_name.lower() != query.name.rstrip(".").lower()
+                or question_type != query.record_type):
+            self.stats["mismatched"] += 1
+            return None
+        del in_flight[transaction_id]
+        self.stats["received"] += 1
+        return DNSResponse(query.name, query.record_type, transaction_id, rcode, answers, negative_ttl,
+                           label, time.monotonic() - query.sent)
\ No newline at end of file
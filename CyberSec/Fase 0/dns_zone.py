@@ -0,0 +1,267 @@
+"""
+DNS Zone Module for Packet Odyssey
+Deterministic simulated DNS zone backed by a memory-mapped, sorted index
+"""
+
+import bisect
+import hashlib
+import mmap
+import os
+import random
+import re
+import socket
+import struct
+import sys
+from array import array
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional, Tuple
+
+# Names the simulation has always known, answered before the zone index
+COMMON_DOMAINS = {
+    "example.com": "93.184.216.34",
+    "google.com": "142.250.185.78",
+    "github.com": "140.82.113.4",
+    "stackoverflow.com": "151.101.193.69",
+    "reddit.com": "151.101.193.140"
+}
+
+DEFAULT_TTL = 300
+INDEX_MAGIC = b"PODZ"
+INDEX_VERSION = 1
+# magic, version, little-endian flag, record count, names blob size
+_INDEX_HEADER = struct.Struct("<4sHHQQ")
+# BIND TTLs: plain seconds or unit-suffixed parts such as "1h30m"
+_TTL = re.compile(r"\d+|(?:\d+[smhdw])+", re.IGNORECASE)
+_TTL_PART = re.compile(r"(\d+)([smhdw])", re.IGNORECASE)
+_TTL_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+MAX_TTL = 0xFFFFFFFF
+
+class ZoneAnswer(NamedTuple):
+    """A simulated answer and where it came from: static table, zone index or hash fallback"""
+    address: str
+    ttl: int
+    source: str
+
+def _normalize(name: str) -> str:
+    return name.lower().rstrip(".")
+
+def name_hash(name: str) -> int:
+    """64-bit key a normalized name is sorted and searched by in the index"""
+    return int.from_bytes(hashlib.blake2b(name.encode(), digest_size=8).digest(), sys.byteorder)
+
+def fallback_address(name: str) -> str:
+    """
+    Deterministic private address for names the zone does not know
+    
+    Derived from the name's hash, so the same name gets the same address in
+    every run and on every machine.
+    """
+    digest = hashlib.blake2b(_normalize(name).encode(), digest_size=2).digest()
+    return f"192.168.{digest[0] % 254 + 1}.{digest[1] % 254 + 1}"
+
+def parse_ttl(value: str) -> Optional[int]:
+    """Seconds in a zone file TTL ("3600", "1h", "1w2d"), or None when it is not one"""
+    if _TTL.fullmatch(value) is None:
+        return None
+    if value.isdigit():
+        ttl = int(value)
+    else:
+        ttl = sum(int(number) * _TTL_UNITS[unit.lower()] for number, unit in _TTL_PART.findall(value))
+    return ttl if ttl <= MAX_TTL else None
+
+def _qualify(name: str, origin: str) -> str:
+    """Absolute normalized name for an owner field, relative to origin ("@" is origin itself)"""
+    if name == "@":
+        return origin
+    if name.endswith(".") or not origin:
+        return _normalize(name)
+    return f"{name.lower()}.{origin}"
+
+def parse_zone_lines(lines: Iterable[str], default_ttl: int = DEFAULT_TTL) -> Iterator[Tuple[str, int, str]]:
+    """
+    Yield (name, ttl, address) for the A records of master-file style lines
+    
+    Accepts "name [ttl] [IN] A address" lines, ";" comments, $TTL and
+    $ORIGIN. TTLs may carry BIND unit suffixes (s, m, h, d, w). "@" and
+    relative names are qualified with the origin, and a line starting with
+    whitespace belongs to the previous line's owner. Records of other types
+    and malformed directives are skipped.
+    """
+    origin = ""
+    owner: Optional[str] = None
+    for line in lines:
+        line = line.split(";", 1)[0]
+        fields = line.split()
+        if not fields:
+            continue
+        directive = fields[0].upper()
+        if directive == "$TTL":
+            ttl = parse_ttl(fields[1]) if len(fields) > 1 else None
+            if ttl is not None:
+                default_ttl = ttl
+            continue
+        if directive == "$ORIGIN":
+            if len(fields) > 1:
+                origin = _qualify(fields[1], origin)
+            continue
+        if line[0].isspace():
+            if owner is None:
+                continue
+        else:
+            owner = _qualify(fields[0], origin)
+            fields = fields[1:]
+        if len(fields) < 2 or fields[-2].upper() != "A":
+            continue
+        ttl = default_ttl
+        for field in fields[:-2]:
+            value = parse_ttl(field)
+            if value is not None:
+                ttl = value
+        yield owner, ttl, fields[-1]
+
+def compile_zone(records: Iterable[Tuple[str, int, str]], index_path: str) -> int:
+    """
+    Write records to a binary index sorted by name hash
+    
+    Layout after the header: sorted 64-bit name hashes, then per record its
+    IPv4 address, TTL, name offset and name length, then the name bytes.
+    Names stay in input order; only the fixed-width columns are permuted.
+    
+    Returns:
+        Number of records written; records with malformed addresses are skipped
+    """
+    keys = array("Q")
+    addresses = array("I")
+    ttls = array("I")
+    offsets = array("Q")
+    lengths = array("H")
+    names = bytearray()
+    blake2b, inet_aton, from_bytes, byteorder = hashlib.blake2b, socket.inet_aton, int.from_bytes, sys.byteorder
+    for name, ttl, address in records:
+        try:
+            packed = inet_aton(address)
+        except OSError:
+            continue  # Malformed address: skip the record rather than abandon the whole index
+        encoded = name.encode()
+        keys.append(from_bytes(blake2b(encoded, digest_size=8).digest(), byteorder))
+        addresses.append(from_bytes(packed, "big"))
+        ttls.append(ttl)
+        offsets.append(len(names))
+        lengths.append(len(encoded))
+        names += encoded
+    
+    order = sorted(range(len(keys)), key=keys.__getitem__)
+    columns = [array(column.typecode, map(column.__getitem__, order))
+               for column in (keys, addresses, ttls, offsets, lengths)]
+    temporary = f"{index_path}.tmp{os.getpid()}"
+    with open(temporary, "wb") as output:
+        output.write(_INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, sys.byteorder == "little", len(keys), len(names)))
+        for column in columns:
+            column.tofile(output)
+        output.write(names)
+    os.replace(temporary, index_path)
+    return len(keys)
+
+def generate_zone(path: str, count: int, seed: int = 0, ttl: int = DEFAULT_TTL) -> None:
+    """Write a reproducible synthetic zone file of count A records"""
+    generator = random.Random(seed)
+    with open(path, "w") as output:
+        output.write(f"$TTL {ttl}\n")
+        for i in range(count):
+            address = generator.getrandbits(24)
+            output.write(f"host{i}.zone{i % 97}.sim. IN A 10.{address >> 16}.{(address >> 8) & 255}.{address & 255}\n")
+
+class SimulatedZone:
+    """
+    Offline DNS zone: a few static names, an optional indexed zone file and a hash fallback
+    
+    The index file is memory-mapped and searched by binary search over its
+    sorted hash column, so lookups stay O(log n) and start-up stays instant
+    however many records the zone holds.
+    """
+    
+    def __init__(self, index_path: Optional[str] = None, static: Optional[Dict[str, str]] = None):
+        self.index_path = index_path
+        self.static = dict(COMMON_DOMAINS if static is None else static)
+        self.count = 0
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+        self._columns: Tuple[memoryview, ...] = ()
+        self._names_offset = 0
+        if index_path is not None:
+            self._open(index_path)
+    
+    @classmethod
+    def from_zone_file(cls, zone_path: str, index_path: Optional[str] = None,
+                       static: Optional[Dict[str, str]] = None) -> "SimulatedZone":
+        """Open a zone file, compiling its index first when missing or older than the zone"""
+        index_path = index_path or zone_path + ".idx"
+        if not os.path.exists(index_path) or os.path.getmtime(index_path) < os.path.getmtime(zone_path):
+            with open(zone_path) as source:
+                compile_zone(parse_zone_lines(source), index_path)
+        return cls(index_path, static)
+    
+    def _open(self, index_path: str) -> None:
+        self._file = open(index_path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, little_endian, count, names_size = _INDEX_HEADER.unpack_from(self._map, 0)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION or bool(little_endian) != (sys.byteorder == "little"):
+            self.close()
+            raise ValueError(f"{index_path} is not a compatible zone index")
+        view = memoryview(self._map)
+        offset = _INDEX_HEADER.size
+        columns = []
+        for typecode in "QIIQH":
+            size = count * array(typecode).itemsize
+            columns.append(view[offset:offset + size].cast(typecode))
+            offset += size
+        self._columns = tuple(columns)
+        self._names_offset = offset
+        self.count = count
+    
+    def __len__(self) -> int:
+        return len(self.static) + self.count
+    
+    def __enter__(self) -> "SimulatedZone":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    def close(self) -> None:
+        # Release the memoryviews before the map, or mmap.close() refuses
+        for column in self._columns:
+            column.release()
+        self._columns = ()
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+            self._map = self._file = None
+    
+    def _find(self, name: str) -> Optional[Tuple[str, int]]:
+        if not self._columns:
+            return None
+        keys, addresses, ttls, offsets, lengths = self._columns
+        key = name_hash(name)
+        encoded = name.encode()
+        position = bisect.bisect_left(keys, key)
+        # Equal hashes sit next to each other; compare names to rule out collisions
+        while position < self.count and keys[position] == key:
+            start = self._names_offset + offsets[position]
+            if self._map[start:start + lengths[position]] == encoded:
+                address = addresses[position]
+                return f"{address >> 24}.{(address >> 16) & 255}.{(address >> 8) & 255}.{address & 255}", ttls[position]
+            position += 1
+        return None
+    
+    def lookup(self, name: str) -> ZoneAnswer:
+        """Answer a name from the static table, then the index, then the hash fallback"""
+        name = _normalize(name)
+        if name in self.static:
+            return ZoneAnswer(self.static[name], DEFAULT_TTL, "static")
+        found = self._find(name)
+        if found is not None:
+            return ZoneAnswer(found[0], found[1], "zone")
+        return ZoneAnswer(fallback_address(name), DEFAULT_TTL, "fallback")
+    
+    def resolve(self, name: str) -> str:
+        return self.lookup(name).address
\ No newline at end of file
@@ -0,0 +1,282 @@
+"""
+IP Fragmentation Module for Packet Odyssey
+MTU-aware IPv4 fragmentation and bounded, timeout-driven reassembly
+"""
+
+import socket
+import struct
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Dict, Any, Callable, List, Mapping, Optional, Tuple, Union
+from frames import IP_FLAG_BITS, internet_checksum, ipv4_to_bytes
+
+IPV4_HEADER_LEN = 20
+MAX_DATAGRAM_SIZE = 65535
+
+_IPV4 = struct.Struct("!BBHHHBBH4s4s")
+_CHECKSUM = struct.Struct("!H")
+
+BytesLike = Union[bytes, bytearray, memoryview]
+StreamKey = Tuple[str, str, int, int]
+
+class FragmentationNeeded(Exception):
+    """Raised when a DF packet is larger than the MTU (ICMP type 3 code 4)"""
+    
+    def __init__(self, mtu: int, length: int):
+        super().__init__(f"Packet of {length} bytes exceeds MTU {mtu} and DF is set")
+        self.mtu = mtu
+        self.length = length
+
+class Fragment:
+    """One IPv4 fragment; the payload is a memoryview slice of the original datagram"""
+    
+    __slots__ = ("source_ip", "dest_ip", "identification", "protocol_id", "ttl",
+                 "offset", "more_fragments", "payload")
+    
+    def __init__(self, source_ip: str, dest_ip: str, identification: int, protocol_id: int,
+                 offset: int, more_fragments: bool, payload: memoryview, ttl: int = 64):
+        self.source_ip = source_ip
+        self.dest_ip = dest_ip
+        self.identification = identification
+        self.protocol_id = protocol_id
+        self.ttl = ttl
+        self.offset = offset
+        self.more_fragments = more_fragments
+        self.payload = payload
+    
+    @property
+    def key(self) -> StreamKey:
+        return (self.source_ip, self.dest_ip, self.identification, self.protocol_id)
+    
+    @property
+    def total_length(self) -> int:
+        return IPV4_HEADER_LEN + len(self.payload)
+    
+    @property
+    def fragment_offset(self) -> int:
+        """Offset in 8-byte units, as carried in the IPv4 header"""
+        return self.offset // 8
+    
+    def network_dict(self) -> Dict[str, Any]:
+        """Network layer dict for this fragment, in the shape NetworkLayer.display() expects"""
+        return {
+            "protocol": "IPv4",
+            "source_ip": self.source_ip,
+            "dest_ip": self.dest_ip,
+            "ttl": self.ttl,
+            "protocol_id": self.protocol_id,
+            "total_length": self.total_length,
+            "identification": self.identification,
+            "flags": {
+                "DF": False,
+                "MF": self.more_fragments
+            },
+            "fragment_offset": self.fragment_offset
+        }
+    
+    def write_into(self, buffer: Union[bytearray, memoryview], offset: int = 0) -> int:
+        """
+        Write the IPv4 header (with checksum) and payload into buffer at offset
+        
+        Returns:
+            Number of bytes written
+        """
+        flags = (IP_FLAG_BITS["MF"] if self.more_fragments else 0) | self.fragment_offset
+        _IPV4.pack_into(buffer, offset, 0x45, 0, self.total_length, self.identification, flags,
+                        self.ttl, self.protocol_id, 0,
+                        ipv4_to_bytes(self.source_ip), ipv4_to_bytes(self.dest_ip))
+        end = offset + self.total_length
+        buffer[offset + IPV4_HEADER_LEN:end] = self.payload
+        view = memoryview(buffer)
+        _CHECKSUM.pack_into(buffer, offset + 10, internet_checksum(view[offset:offset + IPV4_HEADER_LEN]))
+        return end - offset
+    
+    @classmethod
+    def from_ipv4(cls, packet: BytesLike) -> "Fragment":
+        """Parse a raw IPv4 packet; the payload stays a view into packet"""
+        view = memoryview(packet)
+        version_ihl, _, total_length, identification, flags, ttl, protocol_id, _, src, dst = \
+            _IPV4.unpack_from(view, 0)
+        header_length = (version_ihl & 0x0F) * 4
+        return cls(socket.inet_ntoa(src), socket.inet_ntoa(dst), identification, protocol_id,
+                   (flags & 0x1FFF) * 8, bool(flags & IP_FLAG_BITS["MF"]),
+                   view[header_length:min(total_length, len(view))], ttl)
+
+def fragment_payload(payload: BytesLike, mtu: int, source_ip: str, dest_ip: str,
+                     identification: int, protocol_id: int = 6, ttl: int = 64,
+                     dont_fragment: bool = False) -> List[Fragment]:
+    """
+    Split an IPv4 payload into fragments that fit the MTU
+    
+    Every fragment but the last carries a multiple of 8 bytes. No payload bytes
+    are copied: each fragment holds a memoryview slice.
+    
+    Raises:
+        FragmentationNeeded: if the packet is too big and dont_fragment is set
+    """
+    view = memoryview(payload)
+    if IPV4_HEADER_LEN + len(view) <= mtu:
+        return [Fragment(source_ip, dest_ip, identification, protocol_id, 0, False, view, ttl)]
+    if dont_fragment:
+        raise FragmentationNeeded(mtu, IPV4_HEADER_LEN + len(view))
+    
+    chunk = (mtu - IPV4_HEADER_LEN) // 8 * 8
+    if chunk <= 0:
+        raise ValueError(f"MTU {mtu} is too small to carry any fragment data")
+    
+    length = len(view)
+    return [
+        Fragment(source_ip, dest_ip, identification, protocol_id, start,
+                 start + chunk < length, view[start:start + chunk], ttl)
+        for start in range(0, length, chunk)
+    ]
+
+def fragment_packet(network: Mapping, payload: BytesLike, mtu: int) -> List[Fragment]:
+    """Fragment a payload using the addresses, ID and DF flag of a network layer dict or record"""
+    return fragment_payload(
+        payload, mtu,
+        network.get("source_ip", "192.168.1.100"),
+        network.get("dest_ip", "93.184.216.34"),
+        network.get("identification", 12345),
+        network.get("protocol_id", 6),
+        network.get("ttl", 64),
+        network.get("flags", {}).get("DF", False)
+    )
+
+class _Stream:
+    """Reassembly state for one (src, dst, id, proto) datagram"""
+    
+    __slots__ = ("buffer", "starts", "ends", "received", "total", "created")
+    
+    def __init__(self, created: float):
+        self.buffer = bytearray()
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        self.received = 0
+        self.total = -1
+        self.created = created
+    
+    def add_range(self, start: int, end: int) -> int:
+        """Record [start, end) as received; return how many bytes were new"""
+        starts, ends = self.starts, self.ends
+        # Fast path: in-order arrival
+        if not ends or start >= ends[-1]:
+            if ends and start == ends[-1]:
+                ends[-1] = end
+            else:
+                starts.append(start)
+                ends.append(end)
+            self.received += end - start
+            return end - start
+        
+        # General case: merge with every overlapping or touching interval
+        index = bisect_left(ends, start)
+        covered = 0
+        new_start, new_end = start, end
+        last = index
+        while last < len(starts) and starts[last] <= end:
+            new_start = min(new_start, starts[last])
+            new_end = max(new_end, ends[last])
+            covered += min(end, ends[last]) - max(start, starts[last])
+            last += 1
+        starts[index:last] = [new_start]
+        ends[index:last] = [new_end]
+        added = (end - start) - max(covered, 0)
+        self.received += added
+        return added
+
+class Reassembler:
+    """
+    Bounded IPv4 reassembly engine indexed by (src, dst, id, proto)
+    
+    Streams are kept in arrival order so expired ones are evicted from the
+    front in O(1); the number of streams and bytes per stream are capped.
+    """
+    
+    def __init__(self, max_streams: int = 65536, timeout: float = 30.0,
+                 max_datagram_size: int = MAX_DATAGRAM_SIZE,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_streams = max_streams
+        self.timeout = timeout
+        self.max_datagram_size = max_datagram_size
+        self.clock = clock
+        self.streams: "OrderedDict[StreamKey, _Stream]" = OrderedDict()
+        self.stats = {
+            "fragments": 0,
+            "completed": 0,
+            "timed_out": 0,
+            "evicted": 0,
+            "overlapping": 0,
+            "dropped": 0
+        }
+    
+    def __len__(self) -> int:
+        return len(self.streams)
+    
+    def add(self, fragment: Fragment, now: Optional[float] = None) -> Optional[memoryview]:
+        """
+        Add a fragment
+        
+        Returns:
+            The reassembled payload once every byte has arrived, otherwise None
+        """
+        now = self.clock() if now is None else now
+        self.stats["fragments"] += 1
+        self.expire(now)
+        
+        start = fragment.offset
+        end = start + len(fragment.payload)
+        if end > self.max_datagram_size - IPV4_HEADER_LEN:
+            self.stats["dropped"] += 1
+            return None
+        
+        key = fragment.key
+        stream = self.streams.get(key)
+        if stream is None:
+            if not fragment.more_fragments and start == 0:
+                # Unfragmented packet: nothing to reassemble
+                self.stats["completed"] += 1
+                return fragment.payload
+            if len(self.streams) >= self.max_streams:
+                self.streams.popitem(last=False)
+                self.stats["evicted"] += 1
+            stream = self.streams[key] = _Stream(now)
+        
+        # Nothing may lie past the end the last fragment set, and only one end may be set
+        if stream.total >= 0 and (end > stream.total or (not fragment.more_fragments and end != stream.total)):
+            self.stats["dropped"] += 1
+            return None
+        if not fragment.more_fragments and stream.ends and stream.ends[-1] > end:
+            self.stats["dropped"] += 1
+            return None
+        
+        if len(stream.buffer) < end:
+            stream.buffer.extend(bytes(end - len(stream.buffer)))
+        stream.buffer[start:end] = fragment.payload
+        if stream.add_range(start, end) < end - start:
+            self.stats["overlapping"] += 1
+        if not fragment.more_fragments:
+            stream.total = end
+        
+        # Complete once the received ranges have merged into the single interval [0, total)
+        if stream.total >= 0 and len(stream.starts) == 1 and stream.starts[0] == 0 and stream.ends[0] == stream.total:
+            del self.streams[key]
+            self.stats["completed"] += 1
+            return memoryview(stream.buffer)[:stream.total]
+        return None
+    
+    def expire(self, now: Optional[float] = None) -> int:
+        """Drop streams older than the timeout; return how many were dropped"""
+        now = self.clock() if now is None else now
+        deadline = now - self.timeout
+        expired = 0
+        streams = self.streams
+        while streams:
+            key, stream = next(iter(streams.items()))
+            if stream.created > deadline:
+                break
+            del streams[key]
+            expired += 1
+        self.stats["timed_out"] += expired
+        return expired
\ No newline at end of file
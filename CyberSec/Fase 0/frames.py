@@ -0,0 +1,369 @@
+"""
+Wire Format Module for Packet Odyssey
+Serializes encapsulated layer data into real Ethernet/IPv4/TCP/HTTP frames
+"""
+
+import socket
+import struct
+from array import array
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Any, Iterable, Iterator, Optional, Tuple, Union
+
+ETHERNET_HEADER_LEN = 14
+IPV4_HEADER_LEN = 20
+TCP_HEADER_LEN = 20
+HEADERS_LEN = ETHERNET_HEADER_LEN + IPV4_HEADER_LEN + TCP_HEADER_LEN
+
+IP_FLAG_BITS = {"DF": 0x4000, "MF": 0x2000}
+TCP_FLAG_BITS = {"FIN": 0x01, "SYN": 0x02, "RST": 0x04, "PSH": 0x08, "ACK": 0x10, "URG": 0x20}
+
+# Ethernet + IPv4 + TCP headers packed in one pass (checksums written afterwards)
+_HEADERS = struct.Struct("!6s6sH BBHHHBBH4s4s HHIIBBHHH")
+_PSEUDO_HEADER = struct.Struct("!4s4sBBH")
+_CHECKSUM = struct.Struct("!H")
+_IP_CHECKSUM_OFFSET = ETHERNET_HEADER_LEN + 10
+_TCP_CHECKSUM_OFFSET = ETHERNET_HEADER_LEN + IPV4_HEADER_LEN + 16
+_WORD = struct.Struct("!H")
+_DWORD = struct.Struct("!I")
+
+# Fields a cached template may vary: name -> (frame offset, width, covered by IP checksum)
+PATCHABLE_FIELDS = {
+    "identification": (ETHERNET_HEADER_LEN + 4, 2, True),
+    "source_port": (ETHERNET_HEADER_LEN + IPV4_HEADER_LEN, 2, False),
+    "dest_port": (ETHERNET_HEADER_LEN + IPV4_HEADER_LEN + 2, 2, False),
+    "sequence_number": (ETHERNET_HEADER_LEN + IPV4_HEADER_LEN + 4, 4, False),
+    "ack_number": (ETHERNET_HEADER_LEN + IPV4_HEADER_LEN + 8, 4, False)
+}
+
+DEFAULT_PROFILE = "tcp-http"
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+def ones_complement_sum(*parts: BytesLike) -> int:
+    """
+    RFC 1071 one's complement sum of big-endian 16-bit words
+    
+    Every part except the last must have an even length. Because 2**16 is
+    congruent to 1 modulo 0xFFFF, each part can be folded as one big integer
+    instead of word by word.
+    """
+    total = 0
+    for part in parts:
+        value = int.from_bytes(part, "big")
+        if len(part) & 1:
+            value <<= 8
+        total += value
+    folded = total % 0xFFFF
+    if folded == 0 and total:
+        return 0xFFFF
+    return folded
+
+def internet_checksum(*parts: BytesLike) -> int:
+    """Compute the Internet checksum over one or more byte ranges"""
+    return ~ones_complement_sum(*parts) & 0xFFFF
+
+def _fold_adjusted(checksum: int, delta: int) -> int:
+    """Apply a pre-summed RFC 1624 delta (sum of ~m + m' words) to a checksum"""
+    total = (~checksum & 0xFFFF) + delta
+    while total >> 16:
+        total = (total & 0xFFFF) + (total >> 16)
+    return ~total & 0xFFFF
+
+@lru_cache(maxsize=4096)
+def mac_to_bytes(mac: str) -> bytes:
+    """Convert a MAC address like 00:1B:44:11:3A:B7 to 6 raw bytes"""
+    return bytes.fromhex(mac.replace(":", "").replace("-", ""))
+
+@lru_cache(maxsize=65536)
+def ipv4_to_bytes(ip: str) -> bytes:
+    """Convert a dotted-quad IPv4 address to 4 raw bytes"""
+    return socket.inet_aton(ip)
+
+def _as_int(value: Union[int, str]) -> int:
+    """Accept both 6 and "0x0800" style numeric fields"""
+    return value if isinstance(value, int) else int(value, 0)
+
+def flag_bits(flags: Dict[str, bool], bit_map: Dict[str, int]) -> int:
+    """Fold a {flag: enabled} dict into its header bitfield"""
+    bits = 0
+    for flag, enabled in flags.items():
+        if enabled:
+            bits |= bit_map.get(flag, 0)
+    return bits
+
+def _layer_flag_bits(layer: Dict[str, Any], bit_map: Dict[str, int]) -> int:
+    """Read flags from a header record bitfield, or fold a legacy flags dict"""
+    bits = getattr(layer, "flag_bits", None)
+    if bits is not None:
+        return bits
+    return flag_bits(layer.get("flags", {}), bit_map)
+
+def render_http_payload(app_data: Dict[str, Any]) -> bytes:
+    """Render the application layer dict as an HTTP/1.1 request"""
+    lines = [f"{app_data.get('method', 'GET')} {app_data.get('path', '/')} {app_data.get('version', 'HTTP/1.1')}"]
+    for key, value in app_data.get("headers", {}).items():
+        lines.append(f"{key}: {value}")
+    lines.append("")
+    lines.append("")
+    head = "\r\n".join(lines).encode("latin-1")
+    body = app_data.get("body", "")
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    return head + body if body else head
+
+class FrameBatch:
+    """Many wire-format frames packed back to back in one shared buffer"""
+    
+    __slots__ = ("buffer", "offsets", "lengths")
+    
+    def __init__(self, buffer: bytearray, offsets: array, lengths: array):
+        self.buffer = buffer
+        self.offsets = offsets
+        self.lengths = lengths
+    
+    def __len__(self) -> int:
+        return len(self.offsets)
+    
+    def __getitem__(self, index: int) -> memoryview:
+        offset = self.offsets[index]
+        return memoryview(self.buffer)[offset:offset + self.lengths[index]]
+    
+    def __iter__(self) -> Iterator[memoryview]:
+        view = memoryview(self.buffer)
+        for offset, length in zip(self.offsets, self.lengths):
+            yield view[offset:offset + length]
+    
+    @property
+    def total_bytes(self) -> int:
+        return len(self.buffer)
+
+class FrameBuilder:
+    """Writes Ethernet/IPv4/TCP/HTTP frames straight into preallocated buffers"""
+    
+    def frame_length(self, data: Dict[str, Any]) -> int:
+        """Return the on-wire size of the frame for one encapsulated stack"""
+        return HEADERS_LEN + len(render_http_payload(data.get("application", {})))
+    
+    def write_frame(self, data: Dict[str, Any], buffer: Union[bytearray, memoryview], offset: int = 0) -> int:
+        """
+        Serialize one encapsulated stack into buffer at offset
+        
+        Returns:
+            Number of bytes written
+        """
+        payload = render_http_payload(data.get("application", {}))
+        return self._write(buffer, offset, data, payload)
+    
+    def build_frame(self, data: Dict[str, Any]) -> bytearray:
+        """Serialize one encapsulated stack into a new buffer"""
+        payload = render_http_payload(data.get("application", {}))
+        buffer = bytearray(HEADERS_LEN + len(payload))
+        self._write(buffer, 0, data, payload)
+        return buffer
+    
+    def build_many(self, stacks: Iterable[Dict[str, Any]]) -> FrameBatch:
+        """Serialize many encapsulated stacks into one shared buffer"""
+        stacks = list(stacks)
+        payloads = [render_http_payload(data.get("application", {})) for data in stacks]
+        
+        offsets = array("I")
+        lengths = array("I")
+        position = 0
+        for payload in payloads:
+            offsets.append(position)
+            lengths.append(HEADERS_LEN + len(payload))
+            position += HEADERS_LEN + len(payload)
+        
+        buffer = bytearray(position)
+        view = memoryview(buffer)
+        for data, payload, offset in zip(stacks, payloads, offsets):
+            self._write(view, offset, data, payload)
+        
+        return FrameBatch(buffer, offsets, lengths)
+    
+    def write_segment(self, data: Dict[str, Any], transport: Dict[str, Any], payload: BytesLike,
+                      buffer: Union[bytearray, memoryview], offset: int = 0,
+                      identification: Optional[int] = None) -> int:
+        """
+        Serialize one TCP segment of data's connection into buffer at offset
+        
+        The transport header and raw payload replace the stack's own transport
+        layer and HTTP rendering; identification overrides the IP ID.
+        
+        Returns:
+            Number of bytes written
+        """
+        return self._write(buffer, offset, data, payload, transport, identification)
+    
+    def _write(self, buffer: Union[bytearray, memoryview], offset: int,
+               data: Dict[str, Any], payload: BytesLike,
+               transport: Optional[Dict[str, Any]] = None,
+               identification: Optional[int] = None) -> int:
+        """Pack headers and payload, then fill in the IP and TCP checksums"""
+        datalink = data.get("datalink", {})
+        network = data.get("network", {})
+        if transport is None:
+            transport = data.get("transport", {})
+        if identification is None:
+            identification = network.get("identification", 12345)
+        if (transport.get("protocol", "TCP") != "TCP" or network.get("protocol", "IPv4") != "IPv4"
+                or _as_int(datalink.get("ethertype", 0x0800)) != 0x0800):
+            raise ValueError("FrameBuilder only serializes Ethernet II/IPv4/TCP stacks")
+        
+        src_ip = ipv4_to_bytes(network.get("source_ip", "192.168.1.100"))
+        dst_ip = ipv4_to_bytes(network.get("dest_ip", "93.184.216.34"))
+        protocol_id = network.get("protocol_id", 6)
+        tcp_length = TCP_HEADER_LEN + len(payload)
+        ip_flags = _layer_flag_bits(network, IP_FLAG_BITS)
+        
+        _HEADERS.pack_into(
+            buffer, offset,
+            mac_to_bytes(datalink.get("dest_mac", "00:50:56:C0:00:08")),
+            mac_to_bytes(datalink.get("source_mac", "00:1B:44:11:3A:B7")),
+            _as_int(datalink.get("ethertype", 0x0800)),
+            0x45, 0, IPV4_HEADER_LEN + tcp_length,
+            identification & 0xFFFF,
+            ip_flags | (network.get("fragment_offset", 0) & 0x1FFF),
+            network.get("ttl", 64), protocol_id, 0, src_ip, dst_ip,
+            transport.get("source_port", 49152),
+            transport.get("dest_port", 80),
+            transport.get("sequence_number", 1000),
+            transport.get("ack_number", 0),
+            (TCP_HEADER_LEN // 4) << 4,
+            _layer_flag_bits(transport, TCP_FLAG_BITS),
+            transport.get("window_size", 65535), 0, 0
+        )
+        
+        end = offset + HEADERS_LEN + len(payload)
+        buffer[offset + HEADERS_LEN:end] = payload
+        
+        ip_start = offset + ETHERNET_HEADER_LEN
+        tcp_start = ip_start + IPV4_HEADER_LEN
+        view = memoryview(buffer)
+        _CHECKSUM.pack_into(buffer, offset + _IP_CHECKSUM_OFFSET,
+                            internet_checksum(view[ip_start:tcp_start]))
+        pseudo_header = _PSEUDO_HEADER.pack(src_ip, dst_ip, 0, protocol_id, tcp_length)
+        _CHECKSUM.pack_into(buffer, offset + _TCP_CHECKSUM_OFFSET,
+                            internet_checksum(pseudo_header, view[tcp_start:end]))
+        
+        return end - offset
+
+class FrameTemplate:
+    """A pre-serialized frame plus the checksums needed for incremental patching"""
+    
+    __slots__ = ("frame", "ip_checksum", "tcp_checksum", "complemented_words")
+    
+    def __init__(self, frame: bytes):
+        self.frame = frame
+        self.ip_checksum = _CHECKSUM.unpack_from(frame, _IP_CHECKSUM_OFFSET)[0]
+        self.tcp_checksum = _CHECKSUM.unpack_from(frame, _TCP_CHECKSUM_OFFSET)[0]
+        # Sum of ~m for every 16-bit word of each patchable field, as RFC 1624 needs
+        self.complemented_words = {}
+        for name, (field_offset, width, _) in PATCHABLE_FIELDS.items():
+            words = struct.unpack_from(f"!{width // 2}H", frame, field_offset)
+            self.complemented_words[name] = sum(~word & 0xFFFF for word in words)
+    
+    def __len__(self) -> int:
+        return len(self.frame)
+    
+    def patch_into(self, buffer: Union[bytearray, memoryview], offset: int, fields: Dict[str, int]) -> int:
+        """
+        Copy the template into buffer at offset and rewrite only the varying fields
+        
+        Checksums are adjusted incrementally (RFC 1624) instead of being recomputed.
+        
+        Returns:
+            Number of bytes written
+        """
+        frame = self.frame
+        end = offset + len(frame)
+        buffer[offset:end] = frame
+        ip_delta = 0
+        tcp_delta = 0
+        
+        for name, value in fields.items():
+            field_offset, width, in_ip_header = PATCHABLE_FIELDS[name]
+            if width == 2:
+                value &= 0xFFFF
+                _WORD.pack_into(buffer, offset + field_offset, value)
+                delta = self.complemented_words[name] + value
+            else:
+                value &= 0xFFFFFFFF
+                _DWORD.pack_into(buffer, offset + field_offset, value)
+                delta = self.complemented_words[name] + (value >> 16) + (value & 0xFFFF)
+            if in_ip_header:
+                ip_delta += delta
+            else:
+                tcp_delta += delta
+        
+        if ip_delta:
+            _CHECKSUM.pack_into(buffer, offset + _IP_CHECKSUM_OFFSET,
+                                _fold_adjusted(self.ip_checksum, ip_delta))
+        if tcp_delta:
+            _CHECKSUM.pack_into(buffer, offset + _TCP_CHECKSUM_OFFSET,
+                                _fold_adjusted(self.tcp_checksum, tcp_delta))
+        return end - offset
+
+class FrameTemplateCache:
+    """LRU cache of frame templates keyed by (host, resolved_ip, layer profile)"""
+    
+    def __init__(self, builder: Optional[FrameBuilder] = None, max_entries: int = 1024):
+        self.builder = builder or FrameBuilder()
+        self.max_entries = max_entries
+        self.templates: "OrderedDict[Tuple[str, str, str], FrameTemplate]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def __len__(self) -> int:
+        return len(self.templates)
+    
+    def get(self, data: Dict[str, Any], profile: Optional[str] = None) -> FrameTemplate:
+        """Return the template for an encapsulated stack, building it on a miss"""
+        key = (data.get("host", ""), data.get("resolved_ip", ""), profile or data.get("profile", DEFAULT_PROFILE))
+        template = self.templates.get(key)
+        if template is not None:
+            self.hits += 1
+            self.templates.move_to_end(key)
+            return template
+        
+        self.misses += 1
+        template = FrameTemplate(bytes(self.builder.build_frame(data)))
+        self.templates[key] = template
+        if len(self.templates) > self.max_entries:
+            self.templates.popitem(last=False)
+            self.evictions += 1
+        return template
+    
+    def render(self, data: Dict[str, Any], profile: Optional[str] = None, **fields: int) -> bytearray:
+        """Render one frame from the cached template with the given field values"""
+        template = self.get(data, profile)
+        buffer = bytearray(len(template))
+        template.patch_into(buffer, 0, fields)
+        return buffer
+    
+    def render_many(self, data: Dict[str, Any], variations: Iterable[Dict[str, int]],
+                    profile: Optional[str] = None) -> FrameBatch:
+        """Render one frame per field variation into a single shared buffer"""
+        template = self.get(data, profile)
+        variations = list(variations)
+        frame_length = len(template)
+        
+        buffer = bytearray(frame_length * len(variations))
+        view = memoryview(buffer)
+        offsets = array("I", range(0, len(buffer), frame_length))
+        lengths = array("I", [frame_length]) * len(variations)
+        for offset, fields in zip(offsets, variations):
+            template.patch_into(view, offset, fields)
+        
+        return FrameBatch(buffer, offsets, lengths)
+    
+    def stats(self) -> Dict[str, int]:
+        """Return cache size and hit/miss/eviction counters"""
+        return {
+            "entries": len(self.templates),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
\ No newline at end of file
@@ -0,0 +1,272 @@
+"""
+Header Records Module for Packet Odyssey
+Compact slotted header records for bulk encapsulation runs
+"""
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+from zlib import crc32
+from typing import Any, ClassVar, Dict, Iterator, Tuple
+from frames import IP_FLAG_BITS, TCP_FLAG_BITS
+
+# Immutable per-layer defaults shared by every record
+HTTP_DEFAULT_HEADERS = MappingProxyType({
+    "User-Agent": "PacketOdyssey/1.0",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive"
+})
+
+PRESENTATION_DEFAULTS = MappingProxyType({
+    "encoding": "UTF-8",
+    "compression": "gzip",
+    "encryption": "TLS 1.3",
+    "data_format": "JSON/XML"
+})
+
+PHYSICAL_DEFAULTS = MappingProxyType({
+    "medium": "Ethernet Cable (Cat6)",
+    "encoding": "Manchester",
+    "data_rate": "1 Gbps",
+    "signal_type": "Electrical",
+    "bit_pattern": "10101010..."
+})
+
+def dns_transaction_id(name: str) -> int:
+    """Deterministic 16-bit DNS transaction ID for a query name"""
+    return crc32(name.encode("utf-8")) & 0xFFFF
+
+def ipv6_destination(resolved_ip: str) -> str:
+    """Use an IPv6 address as-is, or map an IPv4 one to ::ffff:a.b.c.d"""
+    return resolved_ip if ":" in resolved_ip else f"::ffff:{resolved_ip}"
+
+def _flag_view(bits: int, bit_map: Dict[str, int]) -> Dict[str, bool]:
+    """Expand a header bitfield back into the {flag: enabled} dict display() expects"""
+    return {flag: bool(bits & bit) for flag, bit in bit_map.items()}
+
+class HeaderRecord(Mapping):
+    """
+    Base for slotted header records
+    
+    Records read like the legacy layer dicts through the Mapping interface, so
+    display() and FrameBuilder accept them unchanged. Keys listed in _keys map
+    onto attributes or properties of the same name.
+    """
+    
+    __slots__ = ()
+    _keys: ClassVar[Tuple[str, ...]] = ()
+    
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._keys:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+    
+    def __len__(self) -> int:
+        return len(self._keys)
+    
+    def as_dict(self) -> Dict[str, Any]:
+        """Materialize a plain dict copy of this record"""
+        return {key: getattr(self, key) for key in self._keys}
+
+@dataclass(slots=True, eq=False)
+class ApplicationHeader(HeaderRecord):
+    """Layer 7 HTTP request line plus the Host header"""
+    
+    _keys: ClassVar[Tuple[str, ...]] = ("method", "path", "version", "headers", "body")
+    
+    host: str
+    method: str = "GET"
+    path: str = "/"
+    version: str = "HTTP/1.1"
+    body: str = ""
+    
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Host": self.host, **HTTP_DEFAULT_HEADERS}
+
+@dataclass(slots=True, eq=False)
+class DNSQueryHeader(HeaderRecord):
+    """Layer 7 DNS query; the transaction ID is derived from the name so runs are reproducible"""
+    
+    _keys: ClassVar[Tuple[str, ...]] = ("protocol", "transaction_id", "query_name", "query_type",
+                                        "query_class", "recursion_desired")
+    protocol: ClassVar[str] = "DNS"
+    query_class: ClassVar[str] = "IN"
+    recursion_desired: ClassVar[bool] = True
+    
+    query_name: str
+    query_type: str = "A"
+    
+    @property
+    def transaction_id(self) -> str:
+        return f"0x{dns_transaction_id(self.query_name):04X}"
+
+@dataclass(slots=True, eq=False, frozen=True)
+class SessionHeader(HeaderRecord):
+    """Layer 5 session record; immutable so one instance can serve a whole batch"""
+    
+    _keys: ClassVar[Tuple[str, ...]] = ("session_id", "authentication", "session_timeout", "connection_type")
+    authentication: ClassVar[str] = "Bearer Token"
+    session_timeout: ClassVar[str] = "30 minutes"
+    connection_type: ClassVar[str] = "persistent"
+    
+    started: int
+    
+    @property
+    def session_id(self) -> str:
+        return f"session_{self.started}"
+
+@dataclass(slots=True, eq=False)
+class TransportHeader(HeaderRecord):
+    """Layer 4 TCP header with flags stored as a bitfield"""
+    
+    _keys: ClassVar[Tuple[str, ...]] = ("protocol", "source_port", "dest_port", "sequence_number",
+                                        "ack_number", "flags", "window_size", "checksum")
+    protocol: ClassVar[str] = "TCP"
+    
+    source_port: int = 49152
+    dest_port: int = 80
+    sequence_number: int = 1000
+    ack_number: int = 0
+    flag_bits: int = TCP_FLAG_BITS["SYN"]
+    window_size: int = 65535
+    checksum_value: int = 0x1234
+    
+    @property
+    def flags(self) -> Dict[str, bool]:
+        return _flag_view(self.flag_bits, TCP_FLAG_BITS)
+    
+    @property
+    def checksum(self) -> str:
+        return f"0x{self.checksum_value:04X}"
+
+@dataclass(slots=True, eq=False)
+class UDPHeader(HeaderRecord):
+    """Layer 4 UDP header"""
+    
+    _keys: ClassVar[Tuple[str, ...]] = ("protocol", "source_port", "dest_port", "length", "checksum")
+    protocol: ClassVar[str] = "UDP"
+    
+    source_port: int = 49152
+    dest_port: int = 53
+    length: int = 8
+    checksum_value: int = 0
+    
+    @property
+    def checksum(self) -> str:
+        return f"0x{self.checksum_value:04X}"
+
+@dataclass(slots=True, eq=False)
+class NetworkHeader(HeaderRecord):
+    """Layer 3 IPv4 header with DF/MF stored as a bitfield"""
+    
+    _keys: ClassVar[Tuple[str, ...]] = ("protocol", "source_ip", "dest_ip", "ttl", "protocol_id",
+                                        "header_checksum", "total_length", "identification",
+                                        "flags", "fragment_offset")
+    protocol: ClassVar[str] = "IPv4"
+    
+    dest_ip: str
+    source_ip: str = "192.168.1.100"
+    ttl: int = 64
+    protocol_id: int = 6
+    header_checksum_value: int = 0x5678
+    total_length: int = 1500
+    identification: int = 12345
+    flag_bits: int = IP_FLAG_BITS["DF"]
+    fragment_offset: int = 0
+    
+    @property
+    def flags(self) -> Dict[str, bool]:
+        return _flag_view(self.flag_bits, IP_FLAG_BITS)
+    
+    @property
+    def header_checksum(self) -> str:
+        return f"0x{self.header_checksum_value:04X}"
+
+@dataclass(slots=True, eq=False)
+class IPv6Header(HeaderRecord):
+    """Layer 3 IPv6 header"""
+    
+    _keys: ClassVar[Tuple[str, ...]] = ("protocol", "source_ip", "dest_ip", "hop_limit", "next_header",
+                                        "payload_length", "traffic_class", "flow_label")
+    protocol: ClassVar[str] = "IPv6"
+    
+    dest_ip: str
+    source_ip: str = "2001:db8::100"
+    hop_limit: int = 64
+    next_header: int = 6
+    payload_length: int = 1460
+    traffic_class: int = 0
+    flow_label: int = 0
+
+@dataclass(slots=True, eq=False, frozen=True)
+class DataLinkHeader(HeaderRecord):
+    """Layer 2 Ethernet II header; immutable so the default can be shared"""
+    
+    _keys: ClassVar[Tuple[str, ...]] = ("protocol", "source_mac", "dest_mac", "ethertype", "frame_size", "crc")
+    protocol: ClassVar[str] = "Ethernet II"
+    frame_size: ClassVar[int] = 1518
+    crc: ClassVar[str] = "0xABCD1234"
+    
+    source_mac: str = "00:1B:44:11:3A:B7"
+    dest_mac: str = "00:50:56:C0:00:08"
+    ethertype_value: int = 0x0800
+    
+    @property
+    def ethertype(self) -> str:
+        return f"0x{self.ethertype_value:04X}"
+
+@dataclass(slots=True, eq=False, frozen=True)
+class VLANDataLinkHeader(DataLinkHeader):
+    """Layer 2 Ethernet II header with one 802.1Q tag"""
+    
+    _keys: ClassVar[Tuple[str, ...]] = DataLinkHeader._keys + ("vlan_id", "priority", "inner_ethertype")
+    frame_size: ClassVar[int] = 1522
+    
+    ethertype_value: int = 0x8100
+    vlan_id: int = 100
+    priority: int = 0
+    inner_ethertype_value: int = 0x0800
+    
+    @property
+    def inner_ethertype(self) -> str:
+        return f"0x{self.inner_ethertype_value:04X}"
+
+@dataclass(slots=True, eq=False)
+class PacketRecord(HeaderRecord):
+    """
+    One encapsulated packet built from header records
+    
+    Indexing by layer name ("application", "network", ...) returns the header
+    record, which itself reads like the layer dict, so a PacketRecord can be
+    passed anywhere a full encapsulation dict is expected.
+    """
+    
+    _keys: ClassVar[Tuple[str, ...]] = ("host", "resolved_ip", "timestamp", "profile", "application",
+                                        "presentation", "session", "transport", "network", "datalink",
+                                        "physical")
+    presentation: ClassVar[Mapping] = PRESENTATION_DEFAULTS
+    physical: ClassVar[Mapping] = PHYSICAL_DEFAULTS
+    
+    host: str
+    resolved_ip: str
+    timestamp: float
+    application: HeaderRecord
+    session: SessionHeader
+    transport: HeaderRecord
+    network: HeaderRecord
+    datalink: DataLinkHeader
+    profile: str = "tcp-http"
+    
+    def as_dict(self) -> Dict[str, Any]:
+        """Materialize the nested dict produced by the per-layer encapsulate() path"""
+        data = {}
+        for key in self._keys:
+            value = getattr(self, key)
+            data[key] = dict(value) if isinstance(value, Mapping) else value
+        return data
\ No newline at end of file
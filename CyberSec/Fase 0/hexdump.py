@@ -0,0 +1,158 @@
+"""
+Hex Dump Module for Packet Odyssey
+Fast hex/ASCII dumps of raw frames with per-layer highlighting
+"""
+
+import binascii
+from typing import Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+from rich.console import Console
+from rich.table import Table
+from rich.text import Text
+from rich import box
+from dissector import dissect
+
+console = Console()
+
+BytesLike = Union[bytes, bytearray, memoryview]
+Span = Tuple[str, int, int]
+
+DEFAULT_WIDTH = 16
+CHUNK_LINES = 4096  # Lines hexlified per binascii call when streaming large buffers
+
+LAYER_STYLES = {
+    "datalink": "bold cyan",
+    "network": "bold green",
+    "transport": "bold yellow",
+    "application": "bold magenta",
+    "payload": "white",
+    "padding": "dim"
+}
+
+LAYER_LABELS = {
+    "datalink": "Layer 2: Data Link",
+    "network": "Layer 3: Network",
+    "transport": "Layer 4: Transport",
+    "application": "Layer 7: Application",
+    "payload": "Payload",
+    "padding": "Padding"
+}
+
+# Printable ASCII maps to itself, everything else to "."
+_ASCII_TABLE = bytes(byte if 32 <= byte < 127 else 46 for byte in range(256))
+
+def _byte_view(data: BytesLike) -> memoryview:
+    view = memoryview(data)
+    return view if view.format in ("B", "b", "c") and view.ndim == 1 else view.cast("B")
+
+def hexdump_lines(data: BytesLike, width: int = DEFAULT_WIDTH, base_offset: int = 0) -> Iterator[str]:
+    """
+    Lazily yield "offset  hex bytes  |ascii|" lines for a buffer of any size
+    
+    The buffer is hexlified CHUNK_LINES lines at a time with binascii, so the
+    extra memory used is bounded no matter how large the buffer is.
+    """
+    view = _byte_view(data)
+    hex_width = width * 3 - 1
+    step = width * CHUNK_LINES
+    for chunk_start in range(0, len(view), step):
+        chunk = view[chunk_start:chunk_start + step]
+        hexed = binascii.hexlify(chunk, " ").decode("ascii")
+        text = chunk.tobytes().translate(_ASCII_TABLE).decode("ascii")
+        for start in range(0, len(chunk), width):
+            yield (f"{base_offset + chunk_start + start:04x}  "
+                   f"{hexed[start * 3:start * 3 + hex_width]:<{hex_width}}  |{text[start:start + width]}|")
+
+def hexdump(data: BytesLike, width: int = DEFAULT_WIDTH) -> str:
+    """Return the whole hex dump of a buffer as one string"""
+    return "\n".join(hexdump_lines(data, width))
+
+def write_hexdump(frames: Iterable[BytesLike], stream: TextIO, width: int = DEFAULT_WIDTH) -> int:
+    """
+    Stream the hex dumps of many frames to a file or pager
+    
+    Returns:
+        Number of frames written
+    """
+    count = 0
+    write = stream.write
+    for count, frame in enumerate(frames, 1):
+        write(f"Frame {count}: {len(frame)} bytes\n")
+        write("\n".join(hexdump_lines(frame, width)))
+        write("\n\n")
+    return count
+
+def _style_at(spans: List[Span], position: int) -> Tuple[str, int]:
+    """Style of the span containing position, and where that span ends"""
+    for layer, start, end in spans:
+        if start <= position < end:
+            return LAYER_STYLES.get(layer, ""), end
+    return "", position + 1
+
+def highlighted_lines(data: BytesLike, spans: List[Span], width: int = DEFAULT_WIDTH,
+                      first_line: int = 0, max_lines: Optional[int] = None) -> Iterator[Text]:
+    """
+    Yield Rich Text hex dump lines with each layer's bytes in its own color
+    
+    Only the requested page of lines is rendered, so paging through a large
+    frame never styles more than what is shown.
+    """
+    view = _byte_view(data)
+    hex_width = width * 3 - 1
+    start = first_line * width
+    stop = len(view) if max_lines is None else min(len(view), start + max_lines * width)
+    for line_start in range(start, stop, width):
+        line = view[line_start:min(line_start + width, stop)]
+        hexed = binascii.hexlify(line, " ").decode("ascii")
+        ascii_text = line.tobytes().translate(_ASCII_TABLE).decode("ascii")
+        text = Text(f"{line_start:04x}  ", style="dim")
+        hex_part = Text()
+        ascii_part = Text()
+        position = 0
+        while position < len(line):
+            style, end = _style_at(spans, line_start + position)
+            end = min(end - line_start, len(line))
+            hex_part.append(hexed[position * 3:end * 3], style=style)
+            ascii_part.append(ascii_text[position:end], style=style)
+            position = end
+        hex_part.rstrip()
+        hex_part.pad_right(hex_width - len(hex_part))
+        text.append_text(hex_part)
+        text.append("  |")
+        text.append_text(ascii_part)
+        text.append("|")
+        yield text
+
+def display_hexdump(frame: BytesLike, link: str = "ethernet", width: int = DEFAULT_WIDTH,
+                    max_lines: Optional[int] = 64, pager: bool = False) -> None:
+    """
+    Print a frame's hex dump with a legend of the layer byte ranges
+    
+    Args:
+        frame: Raw frame bytes
+        link: "ethernet" for Ethernet frames, "ip" for bare IP packets
+        max_lines: Lines shown before the dump is truncated (None for all)
+        pager: Send the full dump through the system pager instead
+    """
+    spans = dissect(frame, link).layer_spans()
+    
+    legend = Table(box=box.SIMPLE, show_header=True)
+    legend.add_column("Layer", style="cyan")
+    legend.add_column("Bytes", justify="right")
+    legend.add_column("Length", justify="right")
+    for layer, start, end in spans:
+        legend.add_row(Text(LAYER_LABELS.get(layer, layer), style=LAYER_STYLES.get(layer, "")),
+                       f"{start}-{end - 1}", str(end - start))
+    console.print(legend)
+    
+    total_lines = -(-len(frame) // width)
+    if pager:
+        with console.pager(styles=True):
+            for line in highlighted_lines(frame, spans, width):
+                console.print(line)
+        return
+    
+    for line in highlighted_lines(frame, spans, width, max_lines=max_lines):
+        console.print(line)
+    if max_lines is not None and total_lines > max_lines:
+        console.print(f"[dim]… {total_lines - max_lines} more lines ({len(frame)} bytes total)[/dim]")
+    console.print()
\ No newline at end of file
@@ -11,10 +11,26 @@ from rich import box
 from scapy.all import *
 import socket
 import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable, Iterable, Iterator, List, Mapping, Tuple, Union
+from dissector import dissect
+from fragmentation import Fragment, fragment_packet
+from frames import BytesLike, FrameBatch, FrameBuilder, FrameTemplateCache, render_http_payload
+from headers import (
+    ApplicationHeader, DataLinkHeader, DNSQueryHeader, IPv6Header, NetworkHeader, PacketRecord,
+    SessionHeader, TransportHeader, UDPHeader, VLANDataLinkHeader, dns_transaction_id, ipv6_destination
+)
+from hexdump import display_hexdump
+from segmentation import DEFAULT_MSS, segment_frames, segment_transport
+from sessions import SessionSimulator
 
 console = Console()
 
+IP_PROTOCOL_IDS = {"ICMP": 1, "TCP": 6, "UDP": 17}
+ETHERTYPES = {"IPv4": 0x0800, "IPv6": 0x86DD}
+
+# Builds one layer's header record from (host, resolved_ip)
+RecordBuilder = Callable[[str, str], Any]
+
 class OSILayer:
     """Base class for OSI layer operations"""
     
@@ -30,6 +46,28 @@ class OSILayer:
     def display(self, data: Dict[str, Any]) -> None:
         """Display layer information in a formatted way"""
         raise NotImplementedError
+    
+    def compile_record(self, context: Dict[str, Any]) -> Optional[RecordBuilder]:
+        """
+        Return a builder for this layer's compact header record
+        
+        Called once per profile, top-down like encapsulate(), so lower layers
+        can read what upper layers stored in context. Layers without
+        per-packet state return None and are shared by every PacketRecord.
+        """
+        return None
+    
+    def _display_fields(self, icon: str, layer_data: Mapping) -> None:
+        """Display every field of a layer dict as a two-column table"""
+        table = Table(title=f"{icon} Layer {self.layer_number}: {self.layer_name}", box=box.ROUNDED)
+        table.add_column("Field", style="cyan", no_wrap=True)
+        table.add_column("Value", style="green")
+        
+        for key, value in layer_data.items():
+            table.add_row(key.replace("_", " ").title(), str(value))
+        
+        console.print(table)
+        console.print()
 
 class ApplicationLayer(OSILayer):
     """Layer 7: Application Layer - HTTP, DNS, etc."""
@@ -57,6 +95,10 @@ class ApplicationLayer(OSILayer):
         data["application"] = http_data
         return data
     
+    def compile_record(self, context: Dict[str, Any]) -> Optional[RecordBuilder]:
+        context["application_protocol"] = "HTTP"
+        return lambda host, resolved_ip: ApplicationHeader(host)
+    
     def display(self, data: Dict[str, Any]) -> None:
         """Display HTTP request details"""
         app_data = data.get("application", {})
@@ -77,6 +119,30 @@ class ApplicationLayer(OSILayer):
         console.print(table)
         console.print()
 
+class DNSApplicationLayer(ApplicationLayer):
+    """Layer 7: Application Layer - DNS query"""
+    
+    def encapsulate(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create DNS query data"""
+        host = data.get("host", "example.com")
+        data["application"] = {
+            "protocol": "DNS",
+            "transaction_id": f"0x{dns_transaction_id(host):04X}",
+            "query_name": host,
+            "query_type": "A",
+            "query_class": "IN",
+            "recursion_desired": True
+        }
+        return data
+    
+    def display(self, data: Dict[str, Any]) -> None:
+        """Display DNS query details"""
+        self._display_fields("🔧", data.get("application", {}))
+    
+    def compile_record(self, context: Dict[str, Any]) -> Optional[RecordBuilder]:
+        context["application_protocol"] = "DNS"
+        return lambda host, resolved_ip: DNSQueryHeader(host)
+
 class PresentationLayer(OSILayer):
     """Layer 6: Presentation Layer - Data formatting, encryption"""
     
@@ -140,6 +206,31 @@ class SessionLayer(OSILayer):
         
         console.print(table)
         console.print()
+    
+    def display_simulation(self, summary: Mapping) -> None:
+        """Display the outcome of a multi-flow session simulation"""
+        table = Table(title=f"🤝 Layer {self.layer_number}: Session Simulation", box=box.ROUNDED)
+        table.add_column("Metric", style="cyan", no_wrap=True)
+        table.add_column("Value", style="green", justify="right")
+        
+        table.add_row("Flows", f"{summary['flows']:,}")
+        table.add_row("Completed", f"{summary['completed']:,}")
+        for state, count in summary["states"].items():
+            if count and state != "DONE":
+                table.add_row(f"Still {state}", f"{count:,}")
+        table.add_row("Events", f"{summary['events']:,}")
+        table.add_row("Virtual Time", f"{summary['virtual_time']:.3f} s")
+        table.add_row("Wall Time", f"{summary['wall_time']:.3f} s")
+        table.add_row("Events/s", f"{summary['events_per_second']:,.0f}")
+        table.add_row("Bytes Delivered", f"{summary['bytes_delivered']:,}")
+        table.add_row("Segments", f"{summary['segments']:,}")
+        table.add_row("Retransmits", f"{summary['retransmits']:,}")
+        table.add_row("Completion p50", f"{summary['p50_completion'] * 1000:.1f} ms")
+        table.add_row("Completion p99", f"{summary['p99_completion'] * 1000:.1f} ms")
+        table.add_row("Goodput", f"{summary['goodput_bps'] / 1e6:,.1f} Mbps")
+        
+        console.print(table)
+        console.print()
 
 class TransportLayer(OSILayer):
     """Layer 4: Transport Layer - TCP/UDP"""
@@ -170,6 +261,10 @@ class TransportLayer(OSILayer):
         data["transport"] = transport_data
         return data
     
+    def compile_record(self, context: Dict[str, Any]) -> Optional[RecordBuilder]:
+        context["transport_protocol"] = "TCP"
+        return lambda host, resolved_ip: TransportHeader()
+    
     def display(self, data: Dict[str, Any]) -> None:
         """Display TCP segment details"""
         transport_data = data.get("transport", {})
@@ -178,6 +273,14 @@ class TransportLayer(OSILayer):
         table.add_column("Field", style="cyan", no_wrap=True)
         table.add_column("Value", style="green")
         
+        if transport_data.get("protocol", "TCP") != "TCP":
+            # UDP/ICMP headers recovered by the dissector
+            for key, value in transport_data.items():
+                table.add_row(key.replace("_", " ").title(), str(value))
+            console.print(table)
+            console.print()
+            return
+        
         table.add_row("Protocol", transport_data.get("protocol", "TCP"))
         table.add_row("Source Port", str(transport_data.get("source_port", 49152)))
         table.add_row("Dest Port", str(transport_data.get("dest_port", 80)))
@@ -193,6 +296,80 @@ class TransportLayer(OSILayer):
         
         console.print(table)
         console.print()
+    
+    def segment(self, data: Mapping, payload: BytesLike, mss: int = DEFAULT_MSS) -> Iterator[Tuple[TransportHeader, memoryview]]:
+        """
+        Lazily split a large payload into MSS-sized segments of this connection
+        
+        Payload slices are memoryviews, so a memory-mapped file of any size can
+        be segmented in constant memory.
+        """
+        return segment_transport(data.get("transport", {}), payload, mss)
+    
+    def simulate_sessions(self, data: Mapping, flows: int, size: int = 64 * 1024,
+                          loss_rate: float = 0.0, seed: int = 0, **kwargs: Any) -> Dict[str, Any]:
+        """
+        Run a discrete-event simulation of many TCP flows shaped like this segment
+        
+        Ports, initial sequence number and receive window come from the transport
+        layer of data; extra keyword arguments go to SessionSimulator.add_flows().
+        
+        Returns:
+            Summary statistics of the run
+        """
+        simulator = SessionSimulator(data.get("transport", {}), seed=seed)
+        simulator.add_flows(flows, size, loss_rate=loss_rate, **kwargs)
+        return simulator.run()
+    
+    def display_segments(self, segments: Iterable[Tuple[TransportHeader, memoryview]],
+                         mss: int, limit: int = 10) -> None:
+        """Display the first segments of a transfer and totals for the rest"""
+        table = Table(title=f"✂️ Layer {self.layer_number}: Segmentation (MSS {mss})", box=box.ROUNDED)
+        table.add_column("#", style="cyan", justify="center")
+        table.add_column("Seq Number", style="green", justify="right")
+        table.add_column("Ack Number", style="green", justify="right")
+        table.add_column("Length", style="yellow", justify="right")
+        table.add_column("Flags", style="magenta")
+        
+        count = 0
+        total = 0
+        for count, (header, chunk) in enumerate(segments, 1):
+            total += len(chunk)
+            if count <= limit:
+                flags_str = ", ".join(flag for flag, value in header.flags.items() if value)
+                table.add_row(str(count), str(header.sequence_number), str(header.ack_number),
+                              str(len(chunk)), flags_str)
+        
+        if count > limit:
+            table.add_row("…", "", "", "", f"{count - limit} more")
+        console.print(table)
+        console.print(f"[dim]{count} segments, {total:,} bytes[/dim]")
+        console.print()
+
+class UDPTransportLayer(TransportLayer):
+    """Layer 4: Transport Layer - UDP datagrams"""
+    
+    def __init__(self, dest_port: int = 53):
+        super().__init__()
+        self.dest_port = dest_port
+    
+    def encapsulate(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create UDP datagram"""
+        data["transport"] = {
+            "protocol": "UDP",
+            "source_port": 49152,
+            "dest_port": self.dest_port,
+            "length": 8 + _application_length(data.get("application", {})),
+            "checksum": "0x0000"
+        }
+        return data
+    
+    def compile_record(self, context: Dict[str, Any]) -> Optional[RecordBuilder]:
+        context["transport_protocol"] = "UDP"
+        dest_port = self.dest_port
+        if context.get("application_protocol") == "DNS":
+            return lambda host, resolved_ip: UDPHeader(dest_port=dest_port, length=8 + _dns_query_length(host))
+        return lambda host, resolved_ip: UDPHeader(dest_port=dest_port)
 
 class NetworkLayer(OSILayer):
     """Layer 3: Network Layer - IP"""
@@ -207,7 +384,7 @@ class NetworkLayer(OSILayer):
             "source_ip": "192.168.1.100",
             "dest_ip": data.get("resolved_ip", "93.184.216.34"),
             "ttl": 64,
-            "protocol_id": 6,  # TCP
+            "protocol_id": IP_PROTOCOL_IDS.get(data.get("transport", {}).get("protocol"), 6),
             "header_checksum": "0x5678",
             "total_length": 1500,
             "identification": 12345,
@@ -221,6 +398,11 @@ class NetworkLayer(OSILayer):
         data["network"] = network_data
         return data
     
+    def compile_record(self, context: Dict[str, Any]) -> Optional[RecordBuilder]:
+        context["network_protocol"] = "IPv4"
+        protocol_id = IP_PROTOCOL_IDS.get(context.get("transport_protocol"), 6)
+        return lambda host, resolved_ip: NetworkHeader(resolved_ip, protocol_id=protocol_id)
+    
     def display(self, data: Dict[str, Any]) -> None:
         """Display IP packet details"""
         network_data = data.get("network", {})
@@ -246,6 +428,64 @@ class NetworkLayer(OSILayer):
         
         console.print(table)
         console.print()
+    
+    def fragment(self, data: Mapping, payload: bytes, mtu: int = 1500) -> List[Fragment]:
+        """
+        Split the IP payload of an encapsulated packet into MTU-sized fragments
+        
+        Raises:
+            FragmentationNeeded: if the packet is too big and its DF flag is set
+        """
+        return fragment_packet(data.get("network", {}), payload, mtu)
+    
+    def display_fragments(self, fragments: List[Fragment], mtu: int) -> None:
+        """Display how a packet was split into fragments"""
+        table = Table(title=f"🧩 Layer {self.layer_number}: Fragmentation (MTU {mtu})", box=box.ROUNDED)
+        table.add_column("#", style="cyan", justify="center")
+        table.add_column("Identification", style="green")
+        table.add_column("Offset (bytes)", style="yellow", justify="right")
+        table.add_column("Fragment Offset", style="yellow", justify="right")
+        table.add_column("Total Length", style="blue", justify="right")
+        table.add_column("MF", style="magenta", justify="center")
+        
+        for index, fragment in enumerate(fragments, 1):
+            table.add_row(
+                str(index),
+                str(fragment.identification),
+                str(fragment.offset),
+                str(fragment.fragment_offset),
+                str(fragment.total_length),
+                "1" if fragment.more_fragments else "0"
+            )
+        
+        console.print(table)
+        console.print()
+
+class IPv6NetworkLayer(NetworkLayer):
+    """Layer 3: Network Layer - IPv6"""
+    
+    def encapsulate(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create IPv6 packet"""
+        data["network"] = {
+            "protocol": "IPv6",
+            "source_ip": "2001:db8::100",
+            "dest_ip": ipv6_destination(data.get("resolved_ip", "93.184.216.34")),
+            "hop_limit": 64,
+            "next_header": IP_PROTOCOL_IDS.get(data.get("transport", {}).get("protocol"), 6),
+            "payload_length": 1460,
+            "traffic_class": 0,
+            "flow_label": 0
+        }
+        return data
+    
+    def display(self, data: Dict[str, Any]) -> None:
+        """Display IPv6 packet details"""
+        self._display_fields("🌐", data.get("network", {}))
+    
+    def compile_record(self, context: Dict[str, Any]) -> Optional[RecordBuilder]:
+        context["network_protocol"] = "IPv6"
+        next_header = IP_PROTOCOL_IDS.get(context.get("transport_protocol"), 6)
+        return lambda host, resolved_ip: IPv6Header(ipv6_destination(resolved_ip), next_header=next_header)
 
 class DataLinkLayer(OSILayer):
     """Layer 2: Data Link Layer - Ethernet"""
@@ -259,7 +499,7 @@ class DataLinkLayer(OSILayer):
             "protocol": "Ethernet II",
             "source_mac": "00:1B:44:11:3A:B7",
             "dest_mac": "00:50:56:C0:00:08",  # Gateway MAC
-            "ethertype": "0x0800",  # IPv4
+            "ethertype": f"0x{ETHERTYPES.get(data.get('network', {}).get('protocol'), 0x0800):04X}",
             "frame_size": 1518,
             "crc": "0xABCD1234"
         }
@@ -267,6 +507,11 @@ class DataLinkLayer(OSILayer):
         data["datalink"] = datalink_data
         return data
     
+    def compile_record(self, context: Dict[str, Any]) -> Optional[RecordBuilder]:
+        ethertype = ETHERTYPES.get(context.get("network_protocol"), 0x0800)
+        shared = DataLinkHeader(ethertype_value=ethertype)
+        return lambda host, resolved_ip: shared
+    
     def display(self, data: Dict[str, Any]) -> None:
         """Display Ethernet frame details"""
         datalink_data = data.get("datalink", {})
@@ -285,6 +530,35 @@ class DataLinkLayer(OSILayer):
         console.print(table)
         console.print()
 
+class VLANDataLinkLayer(DataLinkLayer):
+    """Layer 2: Data Link Layer - Ethernet with an 802.1Q VLAN tag"""
+    
+    def __init__(self, vlan_id: int = 100, priority: int = 0):
+        super().__init__()
+        self.vlan_id = vlan_id
+        self.priority = priority
+    
+    def encapsulate(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create tagged Ethernet frame"""
+        data = super().encapsulate(data)
+        datalink_data = data["datalink"]
+        datalink_data["inner_ethertype"] = datalink_data["ethertype"]
+        datalink_data["ethertype"] = "0x8100"
+        datalink_data["frame_size"] = 1522
+        datalink_data["vlan_id"] = self.vlan_id
+        datalink_data["priority"] = self.priority
+        return data
+    
+    def display(self, data: Dict[str, Any]) -> None:
+        """Display tagged Ethernet frame details"""
+        self._display_fields("🔗", data.get("datalink", {}))
+    
+    def compile_record(self, context: Dict[str, Any]) -> Optional[RecordBuilder]:
+        inner_ethertype = ETHERTYPES.get(context.get("network_protocol"), 0x0800)
+        shared = VLANDataLinkHeader(vlan_id=self.vlan_id, priority=self.priority,
+                                    inner_ethertype_value=inner_ethertype)
+        return lambda host, resolved_ip: shared
+
 class PhysicalLayer(OSILayer):
     """Layer 1: Physical Layer - Bits transmission"""
     
@@ -318,19 +592,115 @@ class PhysicalLayer(OSILayer):
         console.print(table)
         console.print()
 
+def _dns_query_length(name: str) -> int:
+    """Size of a single-question DNS query: header, QNAME labels, QTYPE and QCLASS"""
+    return 12 + len(name.strip(".")) + 2 + 4
+
+def _application_length(app_data: Mapping) -> int:
+    """Payload size of an application layer dict carried over UDP"""
+    if app_data.get("protocol") == "DNS":
+        return _dns_query_length(app_data.get("query_name", ""))
+    return len(render_http_payload(app_data))
+
+# Profile name -> the 7 layer factories, top-down (Application to Physical)
+LAYER_PROFILES: Dict[str, Tuple[Callable[[], OSILayer], ...]] = {}
+_COMPILED_PROFILES: Dict[str, Callable[[str, str, float, SessionHeader], PacketRecord]] = {}
+
+def register_profile(name: str,
+                     application: Callable[[], OSILayer] = ApplicationLayer,
+                     transport: Callable[[], OSILayer] = TransportLayer,
+                     network: Callable[[], OSILayer] = NetworkLayer,
+                     datalink: Callable[[], OSILayer] = DataLinkLayer) -> None:
+    """
+    Register a layer profile
+    
+    Each argument is a layer class (or any zero-argument factory) for that
+    position; presentation, session and physical layers are always the defaults.
+    """
+    LAYER_PROFILES[name] = (application, PresentationLayer, SessionLayer, transport, network, datalink, PhysicalLayer)
+    _COMPILED_PROFILES.pop(name, None)
+
+def build_profile_layers(name: str) -> List[OSILayer]:
+    """Instantiate the layer stack of a registered profile"""
+    if name not in LAYER_PROFILES:
+        raise ValueError(f"Unknown layer profile: {name}")
+    return [factory() for factory in LAYER_PROFILES[name]]
+
+def compile_profile(name: str) -> Callable[[str, str, float, SessionHeader], PacketRecord]:
+    """
+    Compile a profile into one fused function building a PacketRecord
+    
+    Per-layer decisions (protocol numbers, EtherType, shared headers) are made
+    once here, so the returned function does no per-layer dispatch or dict merging.
+    The result is cached per profile name.
+    """
+    fused = _COMPILED_PROFILES.get(name)
+    if fused is not None:
+        return fused
+    
+    context: Dict[str, Any] = {}
+    builders = [layer.compile_record(context) for layer in build_profile_layers(name)]
+    build_application, _, _, build_transport, build_network, build_datalink, _ = builders
+    
+    def fused(host: str, resolved_ip: str, timestamp: float, session: SessionHeader) -> PacketRecord:
+        return PacketRecord(
+            host,
+            resolved_ip,
+            timestamp,
+            build_application(host, resolved_ip),
+            session,
+            build_transport(host, resolved_ip),
+            build_network(host, resolved_ip),
+            build_datalink(host, resolved_ip),
+            name
+        )
+    
+    _COMPILED_PROFILES[name] = fused
+    return fused
+
+register_profile("tcp-http")
+register_profile("tcp-http-vlan", datalink=VLANDataLinkLayer)
+register_profile("tcp-http-ipv6", network=IPv6NetworkLayer)
+register_profile("udp-dns", application=DNSApplicationLayer, transport=UDPTransportLayer)
+register_profile("udp-dns-ipv6", application=DNSApplicationLayer, transport=UDPTransportLayer,
+                 network=IPv6NetworkLayer)
+
+class EncapsulationBatch:
+    """Compact result of a headless batch encapsulation run"""
+    
+    __slots__ = ("stacks", "timestamp", "elapsed")
+    
+    def __init__(self, stacks: List[Mapping], timestamp: float, elapsed: float):
+        self.stacks = stacks
+        self.timestamp = timestamp
+        self.elapsed = elapsed
+    
+    def __len__(self) -> int:
+        return len(self.stacks)
+    
+    def __iter__(self) -> Iterator[Mapping]:
+        return iter(self.stacks)
+    
+    def __getitem__(self, index: int) -> Mapping:
+        return self.stacks[index]
+    
+    def summary(self) -> Dict[str, Any]:
+        """Return batch size and throughput figures"""
+        count = len(self.stacks)
+        return {
+            "packets": count,
+            "elapsed": self.elapsed,
+            "packets_per_second": count / self.elapsed if self.elapsed > 0 else float("inf")
+        }
+
 class PacketEncapsulator:
     """Main class to handle packet encapsulation through all OSI layers"""
     
-    def __init__(self):
-        self.layers = [
-            ApplicationLayer(),
-            PresentationLayer(),
-            SessionLayer(),
-            TransportLayer(),
-            NetworkLayer(),
-            DataLinkLayer(),
-            PhysicalLayer()
-        ]
+    def __init__(self, profile: str = "tcp-http"):
+        self.profile = profile
+        self.layers = build_profile_layers(profile)
+        self.frame_builder = FrameBuilder()
+        self.template_cache = FrameTemplateCache(self.frame_builder)
     
     def encapsulate_packet(self, host: str, resolved_ip: str) -> Dict[str, Any]:
         """Encapsulate data through all OSI layers"""
@@ -355,6 +725,47 @@ class PacketEncapsulator:
         
         return data
     
+    def encapsulate_many(self, hosts_and_ips: Iterable[Tuple[str, ...]], compact: bool = True) -> EncapsulationBatch:
+        """
+        Encapsulate many packets through all OSI layers without rendering
+        
+        Args:
+            hosts_and_ips: Iterable of (host, resolved_ip) or (host, resolved_ip, profile)
+                tuples; pairs use this encapsulator's profile
+            compact: Build slotted PacketRecords with the compiled profile (default)
+                instead of running each layer's dict-based encapsulate()
+            
+        Returns:
+            EncapsulationBatch holding one layer stack per input tuple
+        """
+        start = time.perf_counter()
+        timestamp = time.time()
+        stacks = []
+        
+        if compact:
+            session = SessionHeader(int(timestamp))
+            default = compile_profile(self.profile)
+            for item in hosts_and_ips:
+                fused = compile_profile(item[2]) if len(item) > 2 else default
+                stacks.append(fused(item[0], item[1], timestamp, session))
+            return EncapsulationBatch(stacks, timestamp, time.perf_counter() - start)
+        
+        layer_steps = {self.profile: [layer.encapsulate for layer in self.layers]}
+        for item in hosts_and_ips:
+            profile = item[2] if len(item) > 2 else self.profile
+            if profile not in layer_steps:
+                layer_steps[profile] = [layer.encapsulate for layer in build_profile_layers(profile)]
+            data = {
+                "host": item[0],
+                "resolved_ip": item[1],
+                "timestamp": timestamp
+            }
+            for encapsulate in layer_steps[profile]:
+                data = encapsulate(data)
+            stacks.append(data)
+        
+        return EncapsulationBatch(stacks, timestamp, time.perf_counter() - start)
+    
     def create_scapy_packet(self, data: Dict[str, Any]) -> Packet:
         """Create a Scapy packet from the encapsulated data"""
         try:
@@ -379,13 +790,7 @@ class PacketEncapsulator:
             )
             
             # Create HTTP payload
-            app_data = data.get("application", {})
-            http_payload = f"{app_data.get('method', 'GET')} {app_data.get('path', '/')} {app_data.get('version', 'HTTP/1.1')}\r\n"
-            
-            headers = app_data.get("headers", {})
-            for key, value in headers.items():
-                http_payload += f"{key}: {value}\r\n"
-            http_payload += "\r\n"
+            http_payload = render_http_payload(data.get("application", {}))
             
             # Combine all layers
             packet = ip_pkt / tcp_pkt / Raw(load=http_payload)
@@ -396,16 +801,78 @@ class PacketEncapsulator:
             console.print(f"[red]Error creating Scapy packet: {e}[/red]")
             return None
     
-    def display_packet_hex(self, packet: Packet) -> None:
-        """Display packet in hexadecimal format"""
+    def build_frames(self, stacks: Iterable[Dict[str, Any]]) -> FrameBatch:
+        """Serialize encapsulated stacks into wire-format frames sharing one buffer"""
+        return self.frame_builder.build_many(stacks)
+    
+    def generate_frames(self, data: Dict[str, Any], variations: Iterable[Dict[str, int]]) -> FrameBatch:
+        """
+        Generate frames for one host from its cached template
+        
+        Args:
+            data: Encapsulated layer stack identifying the host
+            variations: Per-frame values for identification, ports, sequence and ack numbers
+        """
+        return self.template_cache.render_many(data, variations)
+    
+    def stream_segments(self, data: Dict[str, Any], payload: BytesLike, mss: int = DEFAULT_MSS) -> Iterator[memoryview]:
+        """
+        Stream wire-format frames carrying a large payload as MSS-sized TCP segments
+        
+        Frames share one reusable buffer: each view is only valid until the next
+        one is produced, so memory use does not grow with the payload size.
+        """
+        return segment_frames(data, payload, mss, self.frame_builder)
+    
+    def display_frame(self, frame: bytes, link: str = "ethernet") -> Dict[str, Any]:
+        """
+        De-encapsulate a raw frame and display it bottom-up, layer by layer
+        
+        Args:
+            frame: Raw frame bytes (e.g. from a capture or build_frames())
+            link: "ethernet" for Ethernet frames, "ip" for bare IP packets
+            
+        Returns:
+            Layer dicts recovered from the frame
+        """
+        data = dissect(frame, link).as_layers()
+        
+        console.print(Panel.fit(
+            f"📥 [bold cyan]Packet De-encapsulation[/bold cyan]\n"
+            f"Frame size: [bold yellow]{len(frame)} bytes[/bold yellow]",
+            border_style="blue"
+        ))
+        console.print()
+        
+        # Process through layers (bottom-up: Data Link to Application)
+        for layer in reversed(self.layers):
+            key = layer.layer_name.lower().replace(" ", "")
+            if key in data:
+                layer.display(data)
+        
+        return data
+    
+    def display_packet_hex(self, packet: Union[Packet, BytesLike], link: Optional[str] = None,
+                           max_lines: Optional[int] = 64, pager: bool = False) -> None:
+        """
+        Display a packet as a hex/ASCII dump with each OSI layer highlighted
+        
+        Args:
+            packet: Scapy packet or raw frame bytes
+            link: "ethernet" for Ethernet frames, "ip" for bare IP packets; by default
+                "ip" for Scapy packets without an Ether layer and "ethernet" otherwise
+            max_lines: Lines shown before the dump is truncated (None for all)
+            pager: Page through the full dump instead of truncating it
+        """
         if packet is None:
             return
         
+        if link is None:
+            link = "ip" if isinstance(packet, Packet) and Ether not in packet else "ethernet"
+        frame = bytes(packet) if isinstance(packet, Packet) else packet
         console.print(Panel.fit(
-            "[bold magenta]📦 Packet Hex Dump[/bold magenta]",
+            f"[bold magenta]📦 Packet Hex Dump[/bold magenta] ({len(frame)} bytes)",
             border_style="magenta"
         ))
         
-        hex_dump = packet.show(dump=True)
-        console.print(f"[dim]{hex_dump}[/dim]")
-        console.print() 
\ No newline at end of file
+        display_hexdump(frame, link, max_lines=max_lines, pager=pager)
\ No newline at end of file
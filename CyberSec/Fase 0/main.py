@@ -19,21 +19,39 @@ import time
 
 # Import our modules
 from layers import PacketEncapsulator
+from dns_bench import default_names, display_bench_results, load_names, run_dns_bench, stub_servers
 from dns_resolver import DNSResolver
+from dns_zone import SimulatedZone
 from tracer import Traceroute
+from topology import TopologyGraph
 from capture import PacketCapture
+from reverse_dns import ReverseDNS
 
 console = Console()
 
 class PacketOdyssey:
     """Main application class for Packet Odyssey"""
     
-    def __init__(self):
+    def __init__(self, dns_cache_path: str = None, dns_zone_path: str = None, topology_path: str = None):
         self.encapsulator = PacketEncapsulator()
-        self.dns_resolver = DNSResolver()
-        self.traceroute = Traceroute()
-        self.capture = PacketCapture()
-        
+        # One PTR lookup service so resolver, traceroute and capture share cached names
+        self.reverse_dns = ReverseDNS()
+        zone = SimulatedZone.from_zone_file(dns_zone_path) if dns_zone_path else None
+        self.dns_resolver = DNSResolver(cache_path=dns_cache_path, reverse_dns=self.reverse_dns, zone=zone)
+        self.topology_path = topology_path
+        topology = TopologyGraph.load(topology_path) if topology_path and os.path.exists(topology_path) else None
+        self.traceroute = Traceroute(self.reverse_dns, topology=topology)
+        self.capture = PacketCapture(self.reverse_dns)
+        
+    def save_topology(self):
+        """Write the traceroute topology graph back to its file, when one was given"""
+        if not self.topology_path:
+            return
+        topology = self.traceroute.topology
+        topology.save(self.topology_path)
+        console.print(f"[dim]Topology: {len(topology)} nodes, {topology.edge_count} links from "
+                      f"{topology.traces} traces saved to {self.topology_path}[/dim]")
+    
     def display_banner(self):
         """Display the application banner"""
         banner = """
@@ -68,7 +86,7 @@ class PacketOdyssey:
         console.print(menu)
         console.print()
     
-    def run_dns_resolution(self, simulate: bool = False):
+    def run_dns_resolution(self, simulate: bool = False, domain: str = None):
         """Run DNS resolution module"""
         console.print(Panel.fit(
             "[bold cyan]🔍 DNS Resolution Module[/bold cyan]",
@@ -77,7 +95,9 @@ class PacketOdyssey:
         console.print()
         
         # Get target domain
-        if simulate:
+        if domain:
+            console.print(f"[dim]Target: {domain}[/dim]")
+        elif simulate:
             domain = "example.com"
             console.print(f"[dim]Simulation mode: Using {domain}[/dim]")
         else:
@@ -138,6 +158,20 @@ class PacketOdyssey:
         
         return hops
     
+    def run_trace_many(self, args):
+        """Trace every target given on the command line or in a file"""
+        targets = [target.strip() for target in args.trace_many.split(",") if target.strip()] \
+            if args.trace_many else []
+        if args.trace_file:
+            targets += load_names(args.trace_file)
+        if not targets:
+            console.print("[red]❌ No targets to trace[/red]")
+            return {}
+        
+        results = self.traceroute.trace_many(targets, args.simulate, args.probe_rate or None, args.trace_concurrency)
+        self.traceroute.display_trace_many_results(results)
+        return results
+    
     def run_packet_capture(self, target: str, simulate: bool = False):
         """Run packet capture module"""
         console.print(Panel.fit(
@@ -150,7 +184,7 @@ class PacketOdyssey:
         packets = self.capture.capture_packets(target, simulate)
         
         # Display results
-        self.capture.display_capture_results(packets)
+        self.capture.display_capture_results(packets, resolve_names=not simulate)
         
         # Analyze traffic
         self.capture.analyze_captured_traffic(packets)
@@ -232,6 +266,37 @@ class PacketOdyssey:
         console.print("[dim]This simulation demonstrates how network packets travel through the OSI model layers.[/dim]")
         console.print()
     
+    def run_dns_bench(self, args):
+        """Benchmark DNS resolution against the given servers, or local stand-in servers"""
+        names = load_names(args.bench_names) if args.bench_names else default_names()
+        servers = [server.strip() for server in args.bench_servers.split(",") if server.strip()] \
+            if args.bench_servers else []
+        console.print(Panel.fit(
+            f"[bold cyan]⏱️ DNS Benchmark[/bold cyan]\n"
+            f"Names: [bold green]{len(names)}[/bold green]  Queries per server: [bold green]{args.bench_queries}[/bold green]\n"
+            f"Rate: [bold yellow]{args.bench_rate or 'unlimited'}[/bold yellow] qps  "
+            f"Concurrency: [bold yellow]{args.bench_concurrency}[/bold yellow]",
+            border_style="cyan"
+        ))
+        console.print()
+        options = {
+            "rate": args.bench_rate or None,
+            "concurrency": args.bench_concurrency,
+            "timeout": args.bench_timeout,
+            "use_cache": not args.bench_no_cache
+        }
+        
+        if servers:
+            reports = run_dns_bench(names, servers, args.bench_queries, **options)
+        else:
+            console.print("[yellow]🔄 No --bench-servers given, using a local stand-in DNS server[/yellow]")
+            console.print()
+            with stub_servers(names, delay=args.bench_stub_delay / 1000, drop_rate=args.bench_stub_loss) as stubs:
+                reports = run_dns_bench(names, stubs, args.bench_queries, **options)
+        
+        display_bench_results(reports)
+        return reports
+    
     def display_osi_guide(self):
         """Display OSI model guide"""
         console.print(Panel.fit(
@@ -358,10 +423,17 @@ class PacketOdyssey:
             console.print("[yellow]🔄 Running in simulation mode[/yellow]")
             console.print()
         
-        if args.full_journey:
+        if args.dns_bench:
+            self.run_dns_bench(args)
+        elif args.monitor:
+            target = args.target or "example.com"
+            self.traceroute.monitor(target, args.simulate, args.monitor_rounds or None, args.monitor_interval)
+        elif args.trace_many or args.trace_file:
+            self.run_trace_many(args)
+        elif args.full_journey:
             self.run_full_journey(args.simulate)
         elif args.dns:
-            self.run_dns_resolution(args.simulate)
+            self.run_dns_resolution(args.simulate, args.target)
         elif args.encapsulation:
             host = args.target or "example.com"
             ip_address = self.run_dns_resolution(args.simulate)
@@ -389,6 +461,12 @@ Examples:
   python main.py --dns example.com  # DNS resolution only
   python main.py --simulate         # Run in simulation mode
   python main.py --traceroute google.com  # Traceroute to Google
+  python main.py --dns example.com --dns-cache dns.sqlite  # Reuse answers across runs
+  python main.py --simulate --dns host1.lab --dns-zone lab.zone  # Simulate from a zone file
+  python main.py --dns-bench --bench-rate 2000 --bench-stub-delay 2  # Benchmark the resolver offline
+  python main.py --trace-file targets.txt --probe-rate 500  # Trace many targets, sharing common hops
+  python main.py --traceroute example.com --topology paths.json  # Record the path, flag route changes
+  python main.py --monitor example.com  # mtr-style live per-hop statistics until Ctrl+C
         """
     )
     
@@ -399,12 +477,39 @@ Examples:
     parser.add_argument("--encapsulation", action="store_true", help="Packet encapsulation only")
     parser.add_argument("--traceroute", action="store_true", help="Traceroute only")
     parser.add_argument("--capture", action="store_true", help="Packet capture only")
+    parser.add_argument("--dns-cache", metavar="PATH", help="Keep resolved names in a cache file across runs")
+    parser.add_argument("--dns-zone", metavar="PATH", help="Zone file of A records answering simulated lookups")
+    parser.add_argument("--topology", metavar="PATH", help="Merge traceroute paths into a topology file across runs")
+    
+    bench = parser.add_argument_group("DNS benchmark")
+    bench.add_argument("--dns-bench", action="store_true", help="Benchmark DNS resolution and report latency percentiles")
+    bench.add_argument("--bench-servers", metavar="LIST", help="Comma-separated DNS servers (default: local stand-in)")
+    bench.add_argument("--bench-names", metavar="PATH", help="File with one name to query per line")
+    bench.add_argument("--bench-queries", type=int, default=5000, help="Queries per server (default: 5000)")
+    bench.add_argument("--bench-rate", type=float, default=0, help="Upstream queries per second, 0 for unlimited")
+    bench.add_argument("--bench-concurrency", type=int, default=64, help="Queries in flight (default: 64)")
+    bench.add_argument("--bench-timeout", type=float, default=1.0, help="Per-query timeout in seconds (default: 1.0)")
+    bench.add_argument("--bench-no-cache", action="store_true", help="Send every query upstream")
+    bench.add_argument("--bench-stub-delay", type=float, default=0.0, help="Stand-in server latency in ms")
+    bench.add_argument("--bench-stub-loss", type=float, default=0.0, help="Stand-in server drop rate (0-1)")
+    
+    trace = parser.add_argument_group("Multi-target traceroute")
+    trace.add_argument("--trace-many", metavar="LIST", help="Comma-separated targets to trace together")
+    trace.add_argument("--trace-file", metavar="PATH", help="File with one target to trace per line")
+    trace.add_argument("--probe-rate", type=float, default=0, help="Probes per second across all traces, 0 for unlimited")
+    trace.add_argument("--trace-concurrency", type=int, default=8, help="Traces in flight (default: 8)")
+    
+    monitor = parser.add_argument_group("Path monitor")
+    monitor.add_argument("--monitor", action="store_true", help="Probe the path continuously with live per-hop statistics (mtr-style)")
+    monitor.add_argument("--monitor-rounds", type=int, default=0, help="Traces to run, 0 to run until Ctrl+C")
+    monitor.add_argument("--monitor-interval", type=float, default=1.0, help="Seconds between traces (default: 1.0)")
     
     args = parser.parse_args()
     
     try:
-        app = PacketOdyssey()
+        app = PacketOdyssey(args.dns_cache, args.dns_zone, args.topology)
         app.run_cli_mode(args)
+        app.save_topology()
     except KeyboardInterrupt:
         console.print("\n[red]❌ Interrupted by user[/red]")
         sys.exit(1)
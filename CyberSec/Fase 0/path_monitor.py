@@ -0,0 +1,215 @@
+"""
+Path Monitor Module for Packet Odyssey
+mtr-style continuous probing with constant-memory per-hop statistics
+"""
+
+import math
+import threading
+import time
+from array import array
+from typing import Any, Callable, Dict, List, Optional
+from rich.console import Console
+from rich.live import Live
+from rich.table import Table
+from rich import box
+from dns_bench import LatencyHistogram
+
+console = Console()
+
+RING_SIZE = 32
+MAX_RESPONDERS = 4  # Addresses remembered per hop; ECMP hops rarely show more
+SPARK_BLOCKS = "▁▂▃▄▅▆▇█"
+WIDE_CONSOLE = 140  # Columns needed for the jitter, percentile and recent-sample columns
+
+class HopStats:
+    """
+    Running statistics of one hop, in memory that does not grow with samples
+    
+    Mean and variance are Welford's, jitter is the RFC 3550 smoothed mean
+    of differences between consecutive RTTs, percentiles come from a
+    fixed-size log-linear histogram, and the last RING_SIZE samples (NaN
+    for lost probes) are kept in a ring buffer.
+    """
+    
+    def __init__(self, hop_number: int, ring_size: int = RING_SIZE):
+        self.hop_number = hop_number
+        self.address = "*"
+        self.hostname = "*"
+        self.responders: Dict[str, int] = {}
+        self.sent = 0
+        self.received = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.best = math.inf
+        self.worst = 0.0
+        self.last: Optional[float] = None
+        self.jitter = 0.0
+        self.histogram = LatencyHistogram()
+        self.recent = array("d", [math.nan]) * ring_size
+        self.position = 0
+    
+    def add(self, rtt: Optional[float]) -> None:
+        """Record one probe: its RTT in ms, or None when it was lost"""
+        self.sent += 1
+        self.recent[self.position] = math.nan if rtt is None else rtt
+        self.position = (self.position + 1) % len(self.recent)
+        if rtt is None:
+            return
+        self.received += 1
+        delta = rtt - self.mean
+        self.mean += delta / self.received
+        self.m2 += delta * (rtt - self.mean)
+        self.best = min(self.best, rtt)
+        self.worst = max(self.worst, rtt)
+        if self.last is not None:
+            self.jitter += (abs(rtt - self.last) - self.jitter) / 16
+        self.last = rtt
+        self.histogram.record(rtt / 1000)
+    
+    def add_hop(self, hop: Dict[str, Any]) -> None:
+        """Record every probe of a hop dictionary from a trace"""
+        if hop["ip"] != "*":
+            self.address = hop["ip"]
+            self.hostname = hop.get("hostname") or hop["ip"]
+            if hop["ip"] not in self.responders and len(self.responders) >= MAX_RESPONDERS:
+                del self.responders[min(self.responders, key=self.responders.__getitem__)]
+            self.responders[hop["ip"]] = self.responders.get(hop["ip"], 0) + 1
+        rtts = hop.get("rtts")
+        if rtts is None:
+            rtts = [hop.get("latency")]
+        for rtt in rtts:
+            self.add(rtt)
+    
+    @property
+    def loss(self) -> float:
+        return 1 - self.received / self.sent if self.sent else 0.0
+    
+    @property
+    def stddev(self) -> float:
+        return math.sqrt(self.m2 / (self.received - 1)) if self.received > 1 else 0.0
+    
+    def percentile(self, fraction: float) -> float:
+        """Approximate RTT percentile in ms"""
+        return self.histogram.percentile(fraction) * 1000
+    
+    def recent_samples(self) -> List[float]:
+        """Ring buffer contents, oldest first"""
+        return list(self.recent[self.position:]) + list(self.recent[:self.position])
+    
+    def sparkline(self) -> str:
+        """Recent samples as bars scaled between their minimum and maximum, "·" for lost probes"""
+        samples = self.recent_samples()
+        unused = len(samples) - min(self.sent, len(samples))
+        answered = [sample for sample in samples if not math.isnan(sample)]
+        low, high = (min(answered), max(answered)) if answered else (0.0, 0.0)
+        scale = (len(SPARK_BLOCKS) - 1) / (high - low) if high > low else 0.0
+        return " " * unused + "".join("·" if math.isnan(sample) else SPARK_BLOCKS[int((sample - low) * scale)]
+                                      for sample in samples[unused:])
+
+class PathMonitor:
+    """
+    Probe a path over and over and keep per-hop statistics, like mtr
+    
+    Each round calls trace() for a fresh list of hop dictionaries and folds
+    it into one HopStats per TTL. Memory is bounded by max_hops HopStats of
+    fixed size, however many rounds run.
+    """
+    
+    def __init__(self, target: str, trace: Callable[[], List[Dict[str, Any]]], max_hops: int = 30,
+                 ring_size: int = RING_SIZE):
+        """
+        Args:
+            target: Name shown in the table title
+            trace: Runs one trace and returns its hops
+            max_hops: Hops beyond this are ignored
+            ring_size: Recent samples kept per hop
+        """
+        self.target = target
+        self.trace = trace
+        self.max_hops = max_hops
+        self.ring_size = ring_size
+        self.hops: List[HopStats] = []
+        self.rounds = 0
+        self.path_length = 0
+        self._lock = threading.Lock()
+    
+    def probe_round(self) -> None:
+        """Run one trace and fold its hops into the statistics"""
+        hops = self.trace()
+        with self._lock:
+            for hop in hops:
+                number = hop["hop_number"]
+                if not 1 <= number <= self.max_hops:
+                    continue
+                while len(self.hops) < number:
+                    self.hops.append(HopStats(len(self.hops) + 1, self.ring_size))
+                self.hops[number - 1].add_hop(hop)
+            if hops:
+                self.path_length = min(hops[-1]["hop_number"], self.max_hops)
+            self.rounds += 1
+    
+    def run(self, rounds: Optional[int] = None, interval: float = 1.0, refresh: float = 4.0) -> List[HopStats]:
+        """
+        Probe until rounds are done (forever when None) or Ctrl+C, showing a live table
+        
+        Args:
+            interval: Seconds between the starts of consecutive rounds
+            refresh: Table redraws per second, independent of the probing rate
+        """
+        with Live(get_renderable=self.render, console=console, refresh_per_second=refresh, screen=False):
+            try:
+                while rounds is None or self.rounds < rounds:
+                    started = time.monotonic()
+                    self.probe_round()
+                    if rounds is None or self.rounds < rounds:
+                        time.sleep(max(interval - (time.monotonic() - started), 0))
+            except KeyboardInterrupt:
+                pass
+        console.print()
+        return self.statistics()
+    
+    def statistics(self) -> List[HopStats]:
+        """Statistics of the hops up to the end of the latest path"""
+        with self._lock:
+            return self.hops[:self.path_length]
+    
+    def render(self) -> Table:
+        """
+        Per-hop table; jitter, percentiles and recent samples only on consoles wide enough for them
+        
+        Live calls this from its refresh thread, so the table is built under
+        the lock to never show a hop halfway through an update.
+        """
+        with self._lock:
+            return self._render(self.hops[:self.path_length])
+    
+    def _render(self, hops: List[HopStats]) -> Table:
+        wide = console.width >= WIDE_CONSOLE
+        table = Table(title=f"📡 Path Monitor: {self.target} ({self.rounds} rounds)", box=box.SIMPLE_HEAD)
+        table.add_column("Hop", style="cyan", justify="right")
+        table.add_column("Host", style="green", no_wrap=True, overflow="ellipsis", max_width=40 if wide else 18)
+        table.add_column("Loss%", style="red", justify="right")
+        columns = ["Sent", "Last", "Avg", "Best", "Worst", "StDev"]
+        if wide:
+            columns += ["Jitter", "p50", "p95", "p99"]
+        for column in columns:
+            table.add_column(column, style="yellow", justify="right")
+        if wide:
+            table.add_column("Recent", style="magenta", no_wrap=True)
+        
+        for stats in hops:
+            host = stats.hostname
+            if wide and stats.hostname != stats.address:
+                host += f" ({stats.address})"
+            if len(stats.responders) > 1:
+                host += f" +{len(stats.responders) - 1}"
+            if stats.received:
+                values = [stats.last, stats.mean, stats.best, stats.worst, stats.stddev]
+                if wide:
+                    values += [stats.jitter, *(stats.percentile(fraction) for fraction in (0.5, 0.95, 0.99))]
+                cells = [f"{value:.1f}" for value in values]
+            else:
+                cells = ["-"] * (len(columns) - 1)
+            table.add_row(str(stats.hop_number), host, f"{stats.loss:.0%}", str(stats.sent), *cells,
+                          *([stats.sparkline()] if wide else []))
+        return table
\ No newline at end of file
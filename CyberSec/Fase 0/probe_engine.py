@@ -0,0 +1,377 @@
+"""
+Probe Engine Module for Packet Odyssey
+Native traceroute that probes every TTL at once and matches ICMP replies by probe ID
+"""
+
+import math
+import selectors
+import socket
+import threading
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from dissector import dissect
+
+BASE_PORT = 33434  # Traditional traceroute destination port range
+ICMP_TIME_EXCEEDED = 11
+ICMP_UNREACHABLE = 3
+ICMP_PORT_UNREACHABLE = 3
+PROBE_PAYLOAD = b"PacketOdyssey-probe"
+
+UNREACHABLE_FLAGS = {0: "!N", 1: "!H", 2: "!P", 9: "!X", 10: "!X", 13: "!X"}
+
+class SocketProbeTransport:
+    """
+    UDP probes out through an ordinary socket, ICMP replies in through a raw one
+    
+    Opening the raw ICMP socket needs administrator rights (CAP_NET_RAW);
+    PermissionError is raised straight away when they are missing.
+    """
+    
+    def __init__(self):
+        self.receiver = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+        self.receiver.setblocking(False)
+        self.sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sender.bind(("", 0))
+        self.source_port = self.sender.getsockname()[1]
+    
+    def fileno(self) -> int:
+        return self.receiver.fileno()
+    
+    def send(self, address: str, port: int, ttl: int, payload: bytes) -> None:
+        self.sender.setsockopt(socket.IPPROTO_IP, socket.IP_TTL, ttl)
+        try:
+            self.sender.sendto(payload, (address, port))
+        except OSError:
+            pass  # e.g. ECONNREFUSED from an earlier probe; the probe just goes unanswered
+    
+    def receive(self) -> Optional[bytes]:
+        """Next raw IP packet, or None when nothing is waiting"""
+        try:
+            return self.receiver.recv(65535)
+        except (BlockingIOError, InterruptedError):
+            return None
+    
+    def close(self) -> None:
+        self.receiver.close()
+        self.sender.close()
+
+class ProbeBudget:
+    """
+    Token bucket limiting the probes per second of every engine sharing it
+    
+    Senders never block on it: try_acquire either takes a token or says how
+    long until the next one, so replies keep being read in the meantime.
+    """
+    
+    def __init__(self, rate: float, burst: float = 1.0):
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def try_acquire(self) -> float:
+        """Take one probe's token: 0.0 when granted, otherwise seconds until one is available"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return 0.0
+            return (1.0 - self.tokens) / self.rate
+
+class StopSet:
+    """
+    Interfaces already discovered, each with the path prefix that led to it
+    
+    Keyed by (address, TTL): a trace that meets a known interface at the
+    same TTL shares the route to it with an earlier trace (Doubletree), so
+    the hops below are copied from that trace instead of being probed.
+    """
+    
+    def __init__(self):
+        self.prefixes: Dict[Tuple[str, int], List[Dict[str, Any]]] = {}
+        self.hits = 0
+        self.longest = 0
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self.prefixes)
+    
+    def add(self, hops: List[Dict[str, Any]]) -> None:
+        """Record every answering hop of a complete path"""
+        with self._lock:
+            self.longest = max(self.longest, len(hops))
+            for position, hop in enumerate(hops):
+                if hop["ip"] != "*":
+                    self.prefixes.setdefault((hop["ip"], hop["hop_number"]), hops[:position + 1])
+    
+    def prefix(self, address: str, ttl: int) -> Optional[List[Dict[str, Any]]]:
+        """Copies of the hops up to and including a known interface, or None"""
+        with self._lock:
+            prefix = self.prefixes.get((address, ttl))
+            if prefix is None:
+                return None
+            self.hits += 1
+        return [dict(hop, shared=True) for hop in prefix]
+
+class ProbeEngine:
+    """
+    Parallel-probe traceroute
+    
+    Every (TTL, attempt) pair gets its own UDP destination port, so each ICMP
+    time-exceeded or port-unreachable reply identifies its probe from the
+    UDP header quoted inside it. All probes are sent up front, optionally
+    paced by send_interval, and replies are collected together: a full trace
+    takes about one round-trip time plus the timeout instead of hops x timeout.
+    """
+    
+    def __init__(self, max_hops: int = 30, probes_per_hop: int = 3, timeout: float = 2.0,
+                 send_interval: float = 0.0, base_port: int = BASE_PORT,
+                 transport_factory: Callable[[], Any] = SocketProbeTransport,
+                 budget: Optional["ProbeBudget"] = None):
+        """
+        Args:
+            max_hops: Highest TTL probed
+            probes_per_hop: Probes sent with each TTL
+            timeout: Seconds to wait for replies after the last probe is sent
+            send_interval: Gap between probes, to stay under routers' ICMP rate limits
+            transport_factory: Creates the object that sends probes and receives replies
+            budget: Probe rate limit shared with other engines and traces
+        """
+        self.max_hops = max_hops
+        self.probes_per_hop = probes_per_hop
+        self.timeout = timeout
+        self.send_interval = send_interval
+        self.base_port = base_port
+        self.transport_factory = transport_factory
+        self.budget = budget
+        self.probes_sent = 0
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def resolve_target(target: str) -> str:
+        """IPv4 address of a name or address literal (raises socket.gaierror)"""
+        return socket.getaddrinfo(target, None, socket.AF_INET, socket.SOCK_DGRAM)[0][4][0]
+    
+    def trace(self, target: str, max_hops: Optional[int] = None, first_ttl: int = 1) -> List[Dict[str, Any]]:
+        """
+        Trace the path to target
+        
+        Args:
+            max_hops: Highest TTL probed (default: self.max_hops)
+            first_ttl: Lowest TTL probed; hops below it are left out
+        
+        Returns:
+            Hop dictionaries (hop_number, ip, hostname, latency, rtts, loss, status, ttl)
+            up to the destination, or to the last hop that answered
+        """
+        address = self.resolve_target(target)
+        max_hops = max_hops or self.max_hops
+        return self._build_hops(*self._probe(address, first_ttl, max_hops), first_ttl)
+    
+    def probe_ttl(self, address: str, ttl: int) -> Dict[str, Any]:
+        """The hop at one TTL, reported with ip "*" when it does not answer"""
+        return self._build_hops(*self._probe(address, ttl, ttl), ttl, trim=False)[0]
+    
+    def _probe(self, address: str, first_ttl: int, max_hops: int) -> Tuple[array, List[Optional[str]], List[str], int]:
+        """Send the probes for TTLs first_ttl..max_hops and collect their replies"""
+        probes = self.probes_per_hop
+        total = max_hops * probes
+        sent = array("d", bytes(8 * total))
+        rtts = array("d", [math.nan]) * total
+        responders: List[Optional[str]] = [None] * total
+        flags: List[str] = [""] * total
+        destination_ttl = max_hops + 1
+        
+        transport = self.transport_factory()
+        selector = selectors.DefaultSelector()
+        selector.register(transport, selectors.EVENT_READ)
+        # Send one probe per TTL per round, so a router never sees a burst of its own probes
+        order = [(ttl - 1) * probes + attempt for attempt in range(probes) for ttl in range(first_ttl, max_hops + 1)]
+        next_probe = 0
+        next_send = time.monotonic()
+        deadline = math.inf
+        answered = 0
+        
+        try:
+            while True:
+                now = time.monotonic()
+                while next_probe < len(order) and now >= next_send:
+                    index = order[next_probe]
+                    ttl = index // probes + 1
+                    if ttl > destination_ttl:
+                        next_probe += 1
+                        continue
+                    if self.budget is not None:
+                        wait = self.budget.try_acquire()
+                        if wait:
+                            next_send = now + wait
+                            break
+                    next_probe += 1
+                    sent[index] = now
+                    transport.send(address, self.base_port + index, ttl, PROBE_PAYLOAD)
+                    with self._lock:
+                        self.probes_sent += 1
+                    if self.send_interval:
+                        next_send = now + self.send_interval
+                        break
+                if next_probe >= len(order) and deadline == math.inf:
+                    deadline = now + self.timeout
+                expected = (min(destination_ttl, max_hops) - first_ttl + 1) * probes
+                if now >= deadline or (next_probe >= len(order) and answered >= expected):
+                    break
+                
+                wait = deadline - now if next_probe >= len(order) else max(next_send - now, 0)
+                if not selector.select(wait):
+                    continue
+                while True:
+                    packet = transport.receive()
+                    if packet is None:
+                        break
+                    received = time.monotonic()
+                    match = self._match(packet, address, transport.source_port, total)
+                    if match is None:
+                        continue
+                    index, responder, icmp_type, icmp_code = match
+                    if not sent[index] or not math.isnan(rtts[index]):
+                        continue  # Never sent (beyond the destination) or a duplicate reply
+                    rtts[index] = received - sent[index]
+                    responders[index] = responder
+                    ttl = index // probes + 1
+                    if ttl <= destination_ttl:
+                        answered += 1
+                    if icmp_type == ICMP_UNREACHABLE:
+                        # The destination's port unreachable, or a router refusing to forward:
+                        # either way nothing lies beyond this TTL
+                        if responder != address or icmp_code != ICMP_PORT_UNREACHABLE:
+                            flags[index] = UNREACHABLE_FLAGS.get(icmp_code, f"!{icmp_code}")
+                        if ttl < destination_ttl:
+                            destination_ttl = ttl
+                            answered = sum(1 for i in range((first_ttl - 1) * probes, ttl * probes)
+                                           if not math.isnan(rtts[i]))
+        finally:
+            selector.close()
+            transport.close()
+        
+        return rtts, responders, flags, min(destination_ttl, max_hops)
+    
+    def trace_many(self, targets: Iterable[str], concurrency: int = 8, start_ttl: int = 4,
+                   stop_set: Optional[StopSet] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Trace many targets concurrently, sharing what earlier traces found
+        
+        The first target is traced in full to seed the stop set. The others
+        are probed forward from start_ttl (no further than the longest path
+        seen so far unless the end is not reached), then backward one TTL at a time
+        only until an interface in the stop set is met; the hops below it
+        are copied from the trace that found it (marked shared=True). Set a
+        budget on the engine to cap the probe rate of all traces together.
+        
+        Returns:
+            target -> hops, in input order; targets that do not resolve get no hops
+        """
+        targets = list(dict.fromkeys(targets))
+        stop_set = stop_set if stop_set is not None else StopSet()
+        results: Dict[str, List[Dict[str, Any]]] = {}
+        if not targets:
+            return results
+        results[targets[0]] = self._trace_shared(targets[0], stop_set, 1)
+        with ThreadPoolExecutor(concurrency, thread_name_prefix="trace") as executor:
+            traces = {target: executor.submit(self._trace_shared, target, stop_set, start_ttl) for target in targets[1:]}
+            for target, future in traces.items():
+                results[target] = future.result()
+        return results
+    
+    def _trace_shared(self, target: str, stop_set: StopSet, start_ttl: int) -> List[Dict[str, Any]]:
+        try:
+            address = self.resolve_target(target)
+        except socket.gaierror:
+            return []
+        if start_ttl <= 1 or not len(stop_set):
+            hops = self._build_hops(*self._probe(address, 1, self.max_hops))
+            stop_set.add(hops)
+            return hops
+        
+        below: List[Dict[str, Any]] = []
+        above: List[Dict[str, Any]] = []
+        # Probe forward no further than the longest path seen so far, then on only if the end is not reached
+        first, last = start_ttl, min(max(stop_set.longest + 2, start_ttl), self.max_hops)
+        while True:
+            above += self._build_hops(*self._probe(address, first, last), first, trim=False)
+            if last >= self.max_hops or (above and (above[-1]["ip"] == address or above[-1]["status"].startswith("!"))):
+                break
+            first, last = last + 1, self.max_hops
+        if above and above[0]["ip"] not in ("*", address):
+            prefix = stop_set.prefix(above[0]["ip"], start_ttl)
+            if prefix is not None:
+                return self._finish(prefix[:-1] + self._trim(above), stop_set)
+        for ttl in range(start_ttl - 1, 0, -1):
+            hop = self.probe_ttl(address, ttl)
+            if hop["ip"] == address:
+                above, below = [hop], []  # The destination is closer than start_ttl
+                continue
+            if hop["ip"] != "*":
+                prefix = stop_set.prefix(hop["ip"], ttl)
+                if prefix is not None:
+                    return self._finish(prefix + below + self._trim(above), stop_set)
+            below.insert(0, hop)
+        return self._finish(below + self._trim(above), stop_set)
+    
+    @staticmethod
+    def _trim(hops: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Nothing past the last hop that answered
+        while hops and hops[-1]["ip"] == "*":
+            hops = hops[:-1]
+        return hops
+    
+    @staticmethod
+    def _finish(hops: List[Dict[str, Any]], stop_set: StopSet) -> List[Dict[str, Any]]:
+        stop_set.add(hops)
+        return hops
+    
+    def _match(self, packet: bytes, address: str, source_port: int, total: int) -> Optional[tuple]:
+        """
+        Probe index, responder, ICMP type and code of a reply to one of our probes
+        
+        The ICMP error quotes the probe's IP header and UDP ports; the source
+        port ties it to this engine and the destination port to one probe.
+        """
+        reply = dissect(packet, link="ip")
+        icmp_type = reply.icmp_type
+        if icmp_type not in (ICMP_TIME_EXCEEDED, ICMP_UNREACHABLE):
+            return None
+        quoted = dissect(reply.payload[4:], link="ip")
+        if quoted.ip_protocol != 17 or quoted.dest_ip != address or quoted.source_port != source_port:
+            return None
+        index = quoted.dest_port - self.base_port
+        if not 0 <= index < total:
+            return None
+        return index, reply.source_ip, icmp_type, reply.icmp_code
+    
+    def _build_hops(self, rtts: array, responders: List[Optional[str]], flags: List[str],
+                    last_ttl: int, first_ttl: int = 1, trim: bool = True) -> List[Dict[str, Any]]:
+        probes = self.probes_per_hop
+        hops = []
+        for ttl in range(first_ttl, last_ttl + 1):
+            window = range((ttl - 1) * probes, ttl * probes)
+            times = [rtts[i] * 1000 for i in window if not math.isnan(rtts[i])]
+            addresses = [responders[i] for i in window if responders[i] is not None]
+            ip = max(set(addresses), key=addresses.count) if addresses else "*"
+            flag = next((flags[i] for i in window if flags[i]), "")
+            hops.append({
+                "hop_number": ttl,
+                "ip": ip,
+                "hostname": ip,
+                "latency": sum(times) / len(times) if times else None,
+                "rtts": [None if math.isnan(rtts[i]) else rtts[i] * 1000 for i in window],
+                "loss": 1 - len(times) / probes,
+                "status": flag or ("OK" if times else "*"),
+                "ttl": 64 - ttl
+            })
+            if len(set(addresses)) > 1:
+                hops[-1]["alternates"] = sorted(set(addresses) - {ip})
+        return self._trim(hops) if trim else hops
\ No newline at end of file
@@ -0,0 +1,133 @@
+"""
+Stub Probe Path Module for Packet Odyssey
+Stand-in network path answering traceroute probes, for tests and benchmarks without raw sockets
+"""
+
+import heapq
+import random
+import socket
+import struct
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+_IPV4 = struct.Struct("!BBHHHBBH4s4s")
+_ICMP = struct.Struct("!BBHI")
+_UDP = struct.Struct("!HHHH")
+
+LOCAL_ADDRESS = "10.0.0.2"
+
+def icmp_reply(responder: str, icmp_type: int, icmp_code: int, probe_destination: str,
+               source_port: int, dest_port: int, local: str = LOCAL_ADDRESS) -> bytes:
+    """Raw IP packet of an ICMP error quoting the IP and UDP headers of one probe"""
+    quoted = _IPV4.pack(0x45, 0, _IPV4.size + _UDP.size + 8, 0, 0, 1, 17, 0,
+                        socket.inet_aton(local), socket.inet_aton(probe_destination))
+    quoted += _UDP.pack(source_port, dest_port, _UDP.size + 8, 0)
+    icmp = _ICMP.pack(icmp_type, icmp_code, 0, 0) + quoted
+    header = _IPV4.pack(0x45, 0, _IPV4.size + len(icmp), 0, 0, 64, 1, 0,
+                        socket.inet_aton(responder), socket.inet_aton(local))
+    return header + icmp
+
+class StubPath:
+    """
+    Probe transport for a made-up path of routers ending at a destination
+    
+    Drop-in for SocketProbeTransport: probes are answered with the ICMP
+    time-exceeded or port-unreachable packet a real path would send, after
+    hop_latency per hop travelled, from a background thread. Hops whose TTL
+    is in silent never answer, and loss_rate drops replies at random.
+    """
+    
+    def __init__(self, routers: Sequence[str], destination: str, hop_latency: float = 0.005,
+                 loss_rate: float = 0.0, silent: Iterable[int] = (), seed: int = 0):
+        self.routers = list(routers)
+        self.destination = destination
+        self.hop_latency = hop_latency
+        self.loss_rate = loss_rate
+        self.silent = set(silent)
+        self.random = random.Random(seed)
+        self.source_port = 40000 + seed % 20000
+        self.probes = 0
+        self._reader, self._writer = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._reader.setblocking(False)
+        self._scheduled: List[Tuple[float, int, bytes]] = []
+        self._order = 0
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._deliver, name="stub-path", daemon=True)
+        self._thread.start()
+    
+    def fileno(self) -> int:
+        return self._reader.fileno()
+    
+    def send(self, address: str, port: int, ttl: int, payload: bytes) -> None:
+        self.probes += 1
+        routers, destination = self.route(address)
+        hops = len(routers) + 1
+        if ttl in self.silent or (self.loss_rate and self.random.random() < self.loss_rate):
+            return
+        if ttl < hops:
+            reply = icmp_reply(routers[ttl - 1], 11, 0, address, self.source_port, port)
+        else:
+            reply = icmp_reply(destination, 3, 3, address, self.source_port, port)
+        due = time.monotonic() + self.hop_latency * min(ttl, hops)
+        with self._condition:
+            self._order += 1
+            heapq.heappush(self._scheduled, (due, self._order, reply))
+            self._condition.notify()
+    
+    def route(self, address: str) -> Tuple[List[str], str]:
+        """Routers on the way to address, and who answers at the end"""
+        return self.routers, self.destination
+    
+    def receive(self) -> Optional[bytes]:
+        try:
+            return self._reader.recv(65535)
+        except (BlockingIOError, InterruptedError):
+            return None
+    
+    def _deliver(self) -> None:
+        with self._condition:
+            while not self._closed:
+                if not self._scheduled:
+                    self._condition.wait()
+                    continue
+                wait = self._scheduled[0][0] - time.monotonic()
+                if wait > 0:
+                    self._condition.wait(wait)
+                    continue
+                _, _, reply = heapq.heappop(self._scheduled)
+                self._writer.send(reply)
+    
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+        self._reader.close()
+        self._writer.close()
+
+class StubNetwork(StubPath):
+    """StubPath with a route of its own for each destination address"""
+    
+    def __init__(self, routes: Dict[str, Sequence[str]], **options):
+        super().__init__((), "", **options)
+        self.routes = routes
+    
+    def route(self, address: str) -> Tuple[List[str], str]:
+        return list(self.routes[address]), address
+
+def shared_prefix_routes(destinations: int, shared: int = 5, branch: int = 4, length: int = 12) -> Dict[str, List[str]]:
+    """
+    Routes from one vantage point that share their first hops, then fan out
+    
+    Every route starts with the same shared routers, then passes through one
+    of branch aggregation routers before hops unique to its destination.
+    """
+    routes = {}
+    for index in range(destinations):
+        path = [f"10.0.{hop}.1" for hop in range(1, shared + 1)]
+        path += [f"10.1.{index % branch}.{hop}" for hop in range(shared + 1, shared + 3)]
+        path += [f"10.2.{index}.{hop}" for hop in range(shared + 3, length + 1)]
+        routes[f"203.0.{index // 250}.{index % 250 + 1}"] = path
+    return routes
\ No newline at end of file
@@ -0,0 +1,138 @@
+"""
+Reverse DNS Module for Packet Odyssey
+Cached, non-blocking PTR lookups shared by the resolver, traceroute and capture views
+"""
+
+import ipaddress
+import socket
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Optional
+from dns_cache import DNSCache
+
+DEFAULT_TIMEOUT = 1.0
+DEFAULT_WORKERS = 16
+PTR_TTL = 3600.0  # gethostbyaddr does not report TTLs
+NEGATIVE_PTR_TTL = 300.0
+
+def is_ip_address(value: str) -> bool:
+    """Whether value is a literal IPv4/IPv6 address (PTR lookups make no sense for names)"""
+    try:
+        ipaddress.ip_address(value)
+    except ValueError:
+        return False
+    return True
+
+def system_ptr_lookup(address: str) -> str:
+    """Blocking PTR lookup through the system resolver"""
+    return socket.gethostbyaddr(address)[0]
+
+class ReverseDNS:
+    """
+    Reverse lookup service with its own cache, worker pool and timeout budget
+    
+    Lookups run in a thread pool and are shared: asking again for an address
+    that is still being resolved returns the same future. Callers wait at
+    most their timeout budget; a lookup that overruns keeps going in the
+    background and its answer is cached for the next caller. Missing PTR
+    records and lookup errors are negatively cached.
+    """
+    
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT, workers: int = DEFAULT_WORKERS,
+                 cache: Optional[DNSCache] = None, lookup: Callable[[str], str] = system_ptr_lookup):
+        """
+        Args:
+            timeout: Default time budget callers wait for answers, in seconds
+            workers: Maximum concurrent PTR lookups
+            cache: Cache for answers (a private one by default)
+            lookup: Blocking address -> name function run in the pool
+        """
+        self.timeout = timeout
+        self.workers = workers
+        self.cache = cache if cache is not None else DNSCache(negative_ttl=NEGATIVE_PTR_TTL)
+        self.lookup = lookup
+        self.pending: Dict[str, "Future[Optional[str]]"] = {}
+        self.timeouts = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+    
+    def cached(self, address: str) -> Optional[str]:
+        """Name for an address if it is already cached; never starts a lookup"""
+        with self._lock:
+            entry = self.cache.get(address, "PTR")
+        return entry.address if entry is not None else None
+    
+    def submit(self, address: str) -> "Future[Optional[str]]":
+        """
+        Start a lookup (or join the one in flight) without waiting for it
+        
+        Returns:
+            Future resolving to the PTR name, or None when there is none
+        """
+        with self._lock:
+            entry = self.cache.get(address, "PTR")
+            if entry is not None:
+                future: "Future[Optional[str]]" = Future()
+                future.set_result(entry.address)
+                return future
+            future = self.pending.get(address)
+            if future is None:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="ptr")
+                future = self.pending[address] = self._executor.submit(self._resolve, address)
+            return future
+    
+    def _resolve(self, address: str) -> Optional[str]:
+        try:
+            name = self.lookup(address)
+        except Exception as e:  # Any failure must still clear pending, or the address stays stuck
+            with self._lock:
+                self.cache.put_failure(address, "PTR", str(e) or "No PTR record")
+                self.pending.pop(address, None)
+            return None
+        with self._lock:
+            self.cache.put(address, "PTR", [name], PTR_TTL, source="System resolver")
+            self.pending.pop(address, None)
+        return name
+    
+    def resolve(self, address: str, timeout: Optional[float] = None) -> Optional[str]:
+        """Name for one address, waiting at most timeout (None when unknown or still pending)"""
+        return self.lookup_many([address], timeout).get(address)
+    
+    def lookup_many(self, addresses: Iterable[str], timeout: Optional[float] = None) -> Dict[str, Optional[str]]:
+        """
+        Resolve many addresses concurrently within one shared time budget
+        
+        Args:
+            addresses: IP addresses; anything that is not an IP literal is skipped
+            timeout: Total seconds to wait for all of them (default: self.timeout)
+        
+        Returns:
+            address -> name for every address, None where there is no PTR record
+            or the lookup did not finish within the budget
+        """
+        timeout = self.timeout if timeout is None else timeout
+        futures = {address: self.submit(address) for address in dict.fromkeys(addresses)
+                   if is_ip_address(address)}
+        _, not_done = wait(futures.values(), timeout=timeout)
+        self.timeouts += len(not_done)
+        return {address: None if future in not_done or future.cancelled() else future.result()
+                for address, future in futures.items()}
+    
+    def label(self, address: str, name: Optional[str]) -> str:
+        """Display form of an address: "name (address)" when a distinct name is known"""
+        return f"{name} ({address})" if name and name != address else address
+    
+    def stats(self) -> Dict[str, Any]:
+        stats = self.cache.stats()
+        stats["pending"] = len(self.pending)
+        stats["timeouts"] = self.timeouts
+        return stats
+    
+    def shutdown(self) -> None:
+        """Stop the pool without waiting for lookups still in flight"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        with self._lock:
+            self.pending.clear()
\ No newline at end of file
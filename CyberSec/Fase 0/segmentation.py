@@ -0,0 +1,124 @@
+"""
+TCP Segmentation Module for Packet Odyssey
+Streams large application payloads as MSS-sized TCP segments without copying
+"""
+
+import mmap
+import os
+from contextlib import contextmanager
+from typing import Any, Iterator, Mapping, Optional, Tuple, Union
+from frames import HEADERS_LEN, TCP_FLAG_BITS, FrameBuilder
+from headers import TransportHeader
+
+DEFAULT_MSS = 1460
+
+BytesLike = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+def segment_payload(payload: BytesLike, mss: int = DEFAULT_MSS, initial_sequence: int = 1001,
+                    ack_number: int = 1, source_port: int = 49152, dest_port: int = 80,
+                    window_size: int = 65535) -> Iterator[Tuple[TransportHeader, memoryview]]:
+    """
+    Lazily split a payload into MSS-sized TCP segments
+    
+    Each item is a (TransportHeader, payload slice) pair. Slices are memoryviews
+    of the original payload, so segmenting a file of any size needs constant
+    memory. Sequence numbers advance by the bytes sent and wrap at 2**32;
+    every segment carries ACK and the last one also carries PSH.
+    
+    Args:
+        initial_sequence: Sequence number of the first payload byte (ISN + 1)
+        ack_number: Acknowledgment number carried by every segment
+    """
+    if mss <= 0:
+        raise ValueError(f"MSS must be positive, got {mss}")
+    
+    view = memoryview(payload)
+    if view.ndim != 1 or view.itemsize != 1:
+        view = view.cast("B")
+    length = len(view)
+    ack_bit = TCP_FLAG_BITS["ACK"]
+    push_bits = ack_bit | TCP_FLAG_BITS["PSH"]
+    
+    for start in range(0, length, mss):
+        end = start + mss
+        yield (
+            TransportHeader(
+                source_port,
+                dest_port,
+                (initial_sequence + start) & 0xFFFFFFFF,
+                ack_number,
+                push_bits if end >= length else ack_bit,
+                window_size
+            ),
+            view[start:end]
+        )
+
+def segment_transport(transport: Mapping, payload: BytesLike,
+                      mss: int = DEFAULT_MSS) -> Iterator[Tuple[TransportHeader, memoryview]]:
+    """
+    Segment a payload sent after the handshake described by a transport layer dict or record
+    
+    A SYN consumes one sequence number, so data starts at sequence_number + 1.
+    """
+    sequence_number = transport.get("sequence_number", 1000)
+    if transport.get("flags", {}).get("SYN"):
+        sequence_number += 1
+    return segment_payload(
+        payload, mss,
+        initial_sequence=sequence_number,
+        ack_number=transport.get("ack_number", 0) or 1,
+        source_port=transport.get("source_port", 49152),
+        dest_port=transport.get("dest_port", 80),
+        window_size=transport.get("window_size", 65535)
+    )
+
+def segment_frames(data: Mapping, payload: BytesLike, mss: int = DEFAULT_MSS,
+                   builder: Optional[FrameBuilder] = None) -> Iterator[memoryview]:
+    """
+    Stream full Ethernet/IPv4/TCP frames for a large transfer
+    
+    Every frame is written into the same reusable buffer, so each yielded view
+    is only valid until the next one is requested; copy it with bytes() to keep it.
+    The IP identification increases by one per segment.
+    """
+    builder = builder or FrameBuilder()
+    buffer = bytearray(HEADERS_LEN + mss)
+    view = memoryview(buffer)
+    identification = data.get("network", {}).get("identification", 12345)
+    
+    for index, (transport, chunk) in enumerate(segment_transport(data.get("transport", {}), payload, mss)):
+        length = builder.write_segment(data, transport, chunk, view, 0, identification + index)
+        yield view[:length]
+
+@contextmanager
+def map_file(path: Union[str, os.PathLike]) -> Iterator[memoryview]:
+    """
+    Memory-map a file read-only and expose it as a memoryview
+    
+    Segments taken from the view must not be kept past the with block.
+    """
+    with open(path, "rb") as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            yield memoryview(b"")
+            return
+        mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mapped)
+        try:
+            yield view
+        finally:
+            view.release()
+            mapped.close()
+
+def segment_count(length: int, mss: int = DEFAULT_MSS) -> int:
+    """Number of segments needed to carry length bytes"""
+    return (length + mss - 1) // mss
+
+def transfer_summary(length: int, mss: int = DEFAULT_MSS, initial_sequence: int = 1001) -> Mapping[str, Any]:
+    """Sequence-space summary of a transfer, without generating any segment"""
+    return {
+        "bytes": length,
+        "mss": mss,
+        "segments": segment_count(length, mss),
+        "first_sequence": initial_sequence & 0xFFFFFFFF,
+        "next_sequence": (initial_sequence + length) & 0xFFFFFFFF
+    }
\ No newline at end of file
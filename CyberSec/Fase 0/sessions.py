@@ -0,0 +1,296 @@
+"""
+TCP Session Simulator Module for Packet Odyssey
+Discrete-event simulation of handshake, windowed transfer and teardown for many flows
+"""
+
+import heapq
+import random
+import time
+from array import array
+from typing import Dict, Any, List, Mapping, Optional, Tuple
+from segmentation import DEFAULT_MSS
+
+# Per-flow connection states
+CLOSED = 0
+SYN_SENT = 1
+ESTABLISHED = 2
+FIN_WAIT = 3
+DONE = 4
+STATE_NAMES = ("CLOSED", "SYN_SENT", "ESTABLISHED", "FIN_WAIT", "DONE")
+
+# Event kinds, in the order they happen to a flow
+_OPEN = 0       # Client sends SYN
+_SYN_ACK = 1    # SYN-ACK arrives: handshake done, first window goes out
+_ACK = 2        # ACK for the window in flight arrives
+_CLOSE = 3      # FIN/ACK exchange finished
+
+INITIAL_RTO = 1.0    # RFC 6298 initial retransmission timeout
+INITIAL_WINDOW = 10  # RFC 6928 initial congestion window, in segments
+
+TraceEntry = Tuple[float, int, str, int, int, str]
+
+class SessionSimulator:
+    """
+    Event-driven simulator for many concurrent TCP flows
+    
+    Per-flow state lives in parallel arrays indexed by flow ID rather than in
+    one object per flow, so 100k+ flows fit in a few megabytes. Events are
+    (time, order, flow, kind) tuples on a binary heap driving a virtual clock.
+    Flow openings are merged in from a start-time-sorted array instead of the
+    heap, so the heap only holds flows that are actually active. Data moves
+    one congestion window per round trip, with slow start, congestion
+    avoidance and fast recovery on loss.
+    """
+    
+    def __init__(self, transport: Optional[Mapping] = None, mss: int = DEFAULT_MSS,
+                 seed: int = 0, trace_flows: int = 0):
+        """
+        Args:
+            transport: Transport layer dict or record supplying ports, ISN and receive window
+            mss: Maximum segment size in bytes
+            seed: Seed for loss sampling, so runs are reproducible
+            trace_flows: Record a per-event trace for the first N flows
+        """
+        transport = transport or {}
+        self.mss = mss
+        self.source_port = transport.get("source_port", 49152)
+        self.dest_port = transport.get("dest_port", 80)
+        self.initial_sequence = transport.get("sequence_number", 1000)
+        self.receive_window = transport.get("window_size", 65535)
+        self.random = random.Random(seed)
+        self.trace_flows = trace_flows
+        self.trace: List[TraceEntry] = []
+        self.now = 0.0
+        self.events_processed = 0
+        
+        self._heap: List[Tuple[float, int, int, int]] = []
+        self._order = 0
+        self._arrivals = array("I")
+        self._next_arrival = 0
+        self._pending: List[int] = []
+        
+        # Flow table: one slot per flow in each column
+        self.state = array("B")
+        self.start_time = array("d")
+        self.finish_time = array("d")
+        self.rtt = array("d")
+        self.loss_rate = array("d")
+        self.total_bytes = array("Q")
+        self.acked_bytes = array("Q")
+        self.in_flight = array("Q")
+        self.cwnd = array("Q")
+        self.ssthresh = array("Q")
+        self.segments = array("I")
+        self.retransmits = array("I")
+    
+    def __len__(self) -> int:
+        return len(self.state)
+    
+    def add_flow(self, start: float, size: int, rtt: float = 0.05, loss_rate: float = 0.0) -> int:
+        """
+        Schedule one flow that opens at start and sends size bytes
+        
+        Returns:
+            The flow ID
+        
+        Raises:
+            ValueError: If loss_rate is not in [0, 1); a flow that loses every segment never finishes
+        """
+        if not 0.0 <= loss_rate < 1.0:
+            raise ValueError(f"loss_rate must be in [0, 1), got {loss_rate}")
+        flow = len(self.state)
+        self.state.append(CLOSED)
+        self.start_time.append(start)
+        self.finish_time.append(0.0)
+        self.rtt.append(rtt)
+        self.loss_rate.append(loss_rate)
+        self.total_bytes.append(size)
+        self.acked_bytes.append(0)
+        self.in_flight.append(0)
+        self.cwnd.append(INITIAL_WINDOW * self.mss)
+        self.ssthresh.append(0xFFFFFFFFFFFFFFFF)
+        self.segments.append(0)
+        self.retransmits.append(0)
+        self._pending.append(flow)
+        return flow
+    
+    def add_flows(self, count: int, size: int = 64 * 1024, rtt: Tuple[float, float] = (0.01, 0.2),
+                  arrival_window: float = 10.0, loss_rate: float = 0.0) -> range:
+        """Schedule count flows with uniformly spread start times and RTTs"""
+        first = len(self.state)
+        uniform = self.random.uniform
+        low, high = rtt
+        for _ in range(count):
+            self.add_flow(uniform(0.0, arrival_window), size, uniform(low, high), loss_rate)
+        return range(first, first + count)
+    
+    def _merge_pending(self) -> None:
+        """Fold flows added since the last run into the sorted arrival array"""
+        if self._pending:
+            start_time = self.start_time
+            waiting = list(self._arrivals[self._next_arrival:]) + self._pending
+            waiting.sort(key=start_time.__getitem__)
+            self._arrivals = array("I", waiting)
+            self._next_arrival = 0
+            self._pending = []
+    
+    def _record(self, now: float, flow: int, event: str, flags: str) -> None:
+        """Append one trace line with the flow's current sequence and ack numbers"""
+        sequence = (self.initial_sequence + 1 + self.acked_bytes[flow]) & 0xFFFFFFFF
+        self.trace.append((now, flow, event, sequence, 1, flags))
+    
+    def run(self, until: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Process events in time order until the heap is empty or the clock passes until
+        
+        Returns:
+            Summary statistics for the run
+        """
+        started = time.perf_counter()
+        self._merge_pending()
+        arrivals, next_arrival = self._arrivals, self._next_arrival
+        arrival_count = len(arrivals)
+        start_time = self.start_time
+        heap = self._heap
+        heappop, heappush = heapq.heappop, heapq.heappush
+        state, rtt, loss_rate = self.state, self.rtt, self.loss_rate
+        total_bytes, acked_bytes, in_flight = self.total_bytes, self.acked_bytes, self.in_flight
+        cwnd, ssthresh = self.cwnd, self.ssthresh
+        segments, retransmits, finish_time = self.segments, self.retransmits, self.finish_time
+        mss, receive_window = self.mss, self.receive_window
+        rand = self.random.random
+        trace_flows = self.trace_flows
+        order = self._order
+        processed = 0
+        
+        now = self.now
+        horizon = float("inf") if until is None else until
+        
+        while True:
+            # Next event: whichever is earlier of the next opening and the heap top
+            if next_arrival < arrival_count and (not heap or start_time[arrivals[next_arrival]] <= heap[0][0]):
+                flow = arrivals[next_arrival]
+                if start_time[flow] > horizon:
+                    break
+                next_arrival += 1
+                now, kind = start_time[flow], _OPEN
+            elif heap and heap[0][0] <= horizon:
+                now, _, flow, kind = heappop(heap)
+            else:
+                break
+            processed += 1
+            tracing = flow < trace_flows
+            
+            if kind == _ACK:
+                # The window in flight is acknowledged, minus one segment if any was lost
+                sent = in_flight[flow]
+                window_segments = -(-sent // mss)
+                if loss_rate[flow] and rand() < 1.0 - (1.0 - loss_rate[flow]) ** window_segments:
+                    lost = min(mss, sent)
+                    retransmits[flow] += 1
+                    ssthresh[flow] = max(cwnd[flow] // 2, 2 * mss)
+                    cwnd[flow] = ssthresh[flow]
+                    if tracing:
+                        self._record(now, flow, "dupack", "ACK")
+                else:
+                    lost = 0
+                    if cwnd[flow] < ssthresh[flow]:
+                        cwnd[flow] += sent
+                    else:
+                        cwnd[flow] += max(mss * mss // cwnd[flow], 1)
+                acked_bytes[flow] += sent - lost
+                in_flight[flow] = 0
+                if tracing:
+                    self._record(now, flow, "ack", "ACK")
+            elif kind == _SYN_ACK:
+                state[flow] = ESTABLISHED
+                if tracing:
+                    self._record(now, flow, "syn-ack", "SYN,ACK")
+            elif kind == _OPEN:
+                state[flow] = SYN_SENT
+                if tracing:
+                    self._record(now, flow, "syn", "SYN")
+                # A lost SYN is retried after the initial RTO
+                delay = rtt[flow]
+                while loss_rate[flow] and rand() < loss_rate[flow]:
+                    retransmits[flow] += 1
+                    delay += INITIAL_RTO
+                order += 1
+                heappush(heap, (now + delay, order, flow, _SYN_ACK))
+                continue
+            else:
+                state[flow] = DONE
+                finish_time[flow] = now
+                if tracing:
+                    self._record(now, flow, "closed", "ACK")
+                continue
+            
+            remaining = total_bytes[flow] - acked_bytes[flow]
+            if remaining:
+                # Send the next window: limited by cwnd, the peer's window and what is left
+                sent = min(cwnd[flow], receive_window, remaining)
+                in_flight[flow] = sent
+                segments[flow] += -(-sent // mss)
+                if tracing:
+                    self._record(now, flow, "data", "ACK,PSH" if sent == remaining else "ACK")
+            else:
+                # FIN, FIN-ACK and the last ACK take one round trip
+                state[flow] = FIN_WAIT
+                segments[flow] += 1
+                if tracing:
+                    self._record(now, flow, "fin", "FIN,ACK")
+            order += 1
+            heappush(heap, (now + rtt[flow], order, flow, _ACK if remaining else _CLOSE))
+        
+        self.now = now
+        self._order = order
+        self._next_arrival = next_arrival
+        self.events_processed += processed
+        return self.summary(time.perf_counter() - started, processed)
+    
+    def summary(self, elapsed: float = 0.0, processed: int = 0) -> Dict[str, Any]:
+        """Aggregate per-flow arrays into run statistics"""
+        state, start_time, finish_time = self.state, self.start_time, self.finish_time
+        durations = sorted(finish_time[i] - start_time[i] for i in range(len(state)) if state[i] == DONE)
+        completed = len(durations)
+        
+        def percentile(fraction: float) -> float:
+            return durations[min(int(fraction * completed), completed - 1)] if completed else 0.0
+        
+        states = [0] * len(STATE_NAMES)
+        for value in state:
+            states[value] += 1
+        delivered = sum(self.acked_bytes)
+        return {
+            "flows": len(state),
+            "completed": completed,
+            "states": dict(zip(STATE_NAMES, states)),
+            "events": processed,
+            "virtual_time": self.now,
+            "wall_time": elapsed,
+            "events_per_second": processed / elapsed if elapsed > 0 else 0.0,
+            "bytes_delivered": delivered,
+            "segments": sum(self.segments),
+            "retransmits": sum(self.retransmits),
+            "mean_completion": sum(durations) / completed if completed else 0.0,
+            "p50_completion": percentile(0.5),
+            "p99_completion": percentile(0.99),
+            "goodput_bps": delivered * 8 / self.now if self.now > 0 else 0.0
+        }
+    
+    def flow_info(self, flow: int) -> Dict[str, Any]:
+        """Materialize one flow's state as a dict"""
+        return {
+            "flow": flow,
+            "state": STATE_NAMES[self.state[flow]],
+            "source_port": (self.source_port + flow) & 0xFFFF,
+            "dest_port": self.dest_port,
+            "start": self.start_time[flow],
+            "finish": self.finish_time[flow],
+            "rtt": self.rtt[flow],
+            "bytes": self.total_bytes[flow],
+            "acked": self.acked_bytes[flow],
+            "cwnd": self.cwnd[flow],
+            "segments": self.segments[flow],
+            "retransmits": self.retransmits[flow]
+        }
\ No newline at end of file
@@ -0,0 +1,223 @@
+"""
+Synthetic Topology Module for Packet Odyssey
+Seeded router graph with AS tiers that simulated traceroutes are routed through
+"""
+
+import heapq
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from dns_zone import name_hash
+
+HOME_ROUTER = "192.168.1.1"
+LAN_LATENCY = 0.3  # One-way ms between the simulated host and its router, and the target and its
+FIRST_ASN = 64512  # Private AS numbers
+TIER_NAMES = {1: "core", 2: "transit", 3: "access"}
+
+class SyntheticTopology:
+    """
+    Reproducible Internet-like router graph for simulated traceroutes
+    
+    Tier-1 ASes are fully meshed, each tier-2 AS buys transit from one or
+    two tier-1s and each tier-3 (access) AS from one or two tier-2s. Every
+    AS is a ring of routers with a few chords. The simulation's home router
+    hangs off one access AS and each target, by the hash of its name, off
+    another, so the same target always takes the same path.
+    
+    Routes are shortest paths by link latency. One Dijkstra run from a
+    source gives its whole route table, which is cached. Probe RTTs and
+    losses for all hops of a batch of traces are drawn with one set of
+    vectorised NumPy calls.
+    """
+    
+    def __init__(self, seed: int = 0, tier1: int = 8, tier2: int = 80, tier3: int = 600,
+                 routers_per_as: Tuple[int, int, int] = (6, 4, 3)):
+        """
+        Args:
+            seed: Seed of the graph and of every trace sampled from it
+            tier1, tier2, tier3: Number of ASes in each tier
+            routers_per_as: Routers in each AS of tiers 1, 2 and 3
+        """
+        self.seed = seed
+        self.random = np.random.default_rng(seed)
+        self.batches = 0
+        self._route_tables: Dict[int, Tuple[List[int], np.ndarray]] = {}
+        self._routes: Dict[Tuple[int, int], Tuple[int, ...]] = {}
+        self._build([tier1, tier2, tier3], routers_per_as)
+    
+    def _build(self, as_counts: List[int], routers_per_as: Tuple[int, ...]) -> None:
+        rng = self.random
+        self.addresses: List[str] = []
+        self.hostnames: List[str] = []
+        self.asns: List[int] = []
+        self.tiers: List[int] = []
+        members: List[List[List[int]]] = [[], [], []]  # Tier -> AS -> router ids
+        links: List[Tuple[int, int, float]] = []
+        
+        as_index = 0
+        for tier, (count, size) in enumerate(zip(as_counts, routers_per_as), start=1):
+            # Long-haul links in the core, metro-scale ones at the edge (one-way ms)
+            low, high = {1: (2.0, 12.0), 2: (0.5, 4.0), 3: (0.2, 1.5)}[tier]
+            for _ in range(count):
+                asn = FIRST_ASN + as_index
+                routers = []
+                for position in range(size):
+                    router = len(self.addresses)
+                    routers.append(router)
+                    self.addresses.append(f"{10 + tier * 40}.{as_index >> 8}.{as_index & 255}.{position + 1}")
+                    self.hostnames.append(f"{TIER_NAMES[tier]}{position + 1}.as{asn}.net")
+                    self.asns.append(asn)
+                    self.tiers.append(tier)
+                latencies = rng.uniform(low, high, size + 1)
+                for position in range(size):
+                    if size > 1 and (size > 2 or position == 0):
+                        links.append((routers[position], routers[(position + 1) % size], latencies[position]))
+                if size > 3:
+                    links.append((routers[0], routers[size // 2], latencies[size]))
+                members[tier - 1].append(routers)
+                as_index += 1
+        
+        def interconnect(customers: List[List[int]], providers: List[List[int]], low: float, high: float) -> None:
+            for routers in customers:
+                choices = rng.choice(len(providers), size=min(len(providers), int(rng.integers(1, 3))), replace=False)
+                for provider in choices:
+                    links.append((routers[int(rng.integers(len(routers)))],
+                                  providers[provider][int(rng.integers(len(providers[provider])))],
+                                  float(rng.uniform(low, high))))
+        
+        for first in range(len(members[0])):
+            for second in range(first + 1, len(members[0])):
+                links.append((members[0][first][int(rng.integers(routers_per_as[0]))],
+                              members[0][second][int(rng.integers(routers_per_as[0]))],
+                              float(rng.uniform(5.0, 40.0))))
+        interconnect(members[1], members[0], 1.0, 10.0)
+        interconnect(members[2], members[1], 0.5, 5.0)
+        
+        # The home router, attached to one access AS
+        self.home = len(self.addresses)
+        self.home_as = members[2][int(rng.integers(len(members[2])))]
+        self.addresses.append(HOME_ROUTER)
+        self.hostnames.append("router.local")
+        self.asns.append(0)
+        self.tiers.append(4)
+        links.append((self.home, self.home_as[0], float(rng.uniform(1.0, 8.0))))
+        self.access = members[2]
+        
+        self.neighbors: List[List[Tuple[int, float]]] = [[] for _ in self.addresses]
+        for first, second, latency in links:
+            self.neighbors[first].append((second, float(latency)))
+            self.neighbors[second].append((first, float(latency)))
+        
+        # Per-router behaviour: queueing jitter scale (ms), probe loss rate, ICMP-silent routers
+        count = len(self.addresses)
+        self.jitter = rng.gamma(2.0, 0.15, count) * (1 + (np.array(self.tiers) == 1))
+        self.loss = np.where(rng.random(count) < 0.05, rng.uniform(0.05, 0.3, count), rng.uniform(0.0, 0.01, count))
+        self.loss[rng.random(count) < 0.03] = 1.0
+        self.loss[self.home] = 0.0
+    
+    def __len__(self) -> int:
+        return len(self.addresses)
+    
+    def route_table(self, source: int) -> Tuple[List[int], np.ndarray]:
+        """
+        Lowest-latency routes from source to every router, computed once and cached
+        
+        Returns:
+            Parent of each router on its route (-1 for source) and its one-way latency in ms
+        """
+        table = self._route_tables.get(source)
+        if table is None:
+            distances = [float("inf")] * len(self.addresses)
+            parents = [-1] * len(self.addresses)
+            distances[source] = 0.0
+            queue = [(0.0, source)]
+            while queue:
+                distance, router = heapq.heappop(queue)
+                if distance > distances[router]:
+                    continue
+                for neighbor, latency in self.neighbors[router]:
+                    candidate = distance + latency
+                    if candidate < distances[neighbor]:
+                        distances[neighbor] = candidate
+                        parents[neighbor] = router
+                        heapq.heappush(queue, (candidate, neighbor))
+            table = self._route_tables[source] = (parents, np.array(distances))
+        return table
+    
+    def route(self, destination: int, source: Optional[int] = None) -> Tuple[int, ...]:
+        """Routers from source (default: the home router) to destination, both included"""
+        source = self.home if source is None else source
+        key = (source, destination)
+        path = self._routes.get(key)
+        if path is None:
+            parents = self.route_table(source)[0]
+            hops = [destination]
+            while hops[-1] != source:
+                hops.append(parents[hops[-1]])
+            path = self._routes[key] = tuple(reversed(hops))
+        return path
+    
+    def attachment(self, target: str) -> int:
+        """Access router a target hangs off, chosen by the hash of its name"""
+        key = name_hash(target.lower().rstrip("."))
+        routers = self.access[key % len(self.access)]
+        return routers[(key >> 32) % len(routers)]
+    
+    def trace(self, target: str, probes: int = 3) -> List[Dict[str, Any]]:
+        return self.trace_many([target], probes)[target]
+    
+    def trace_many(self, targets: Iterable[str], probes: int = 3) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Simulated traceroutes from behind the home router to every target
+        
+        Each call draws from its own generator, seeded by the topology seed
+        and the call count, so a fresh topology with the same seed replays
+        the same traces.
+        
+        Returns:
+            target -> hop dictionaries in ProbeEngine's shape, ending at the target
+        """
+        targets = list(dict.fromkeys(targets))
+        paths = [self.route(self.attachment(target)) for target in targets]
+        lengths = np.array([len(path) + 1 for path in paths])  # The target answers after the last router
+        routers = np.fromiter((router for path in paths for router in (*path, path[-1])), dtype=np.int64,
+                              count=int(lengths.sum()))
+        is_target = np.zeros(len(routers), dtype=bool)
+        is_target[np.cumsum(lengths) - 1] = True
+        
+        rng = np.random.default_rng([self.seed, self.batches])
+        self.batches += 1
+        one_way = LAN_LATENCY + self.route_table(self.home)[1][routers] + np.where(is_target, LAN_LATENCY, 0.0)
+        jitter = np.where(is_target, 0.1, self.jitter[routers])
+        loss = np.where(is_target, 0.0, self.loss[routers])
+        rtts = 2 * one_way[:, None] + rng.gamma(2.0, jitter[:, None], (len(routers), probes))
+        answered = rng.random((len(routers), probes)) >= loss[:, None]
+        counts = answered.sum(axis=1)
+        means = np.where(answered, rtts, 0.0).sum(axis=1) / np.maximum(counts, 1)
+        
+        results = {}
+        rows = iter(zip(np.where(answered, rtts, np.nan).tolist(), counts.tolist(), means.tolist()))
+        for target, path in zip(targets, paths):
+            hops = []
+            for hop_number, router in enumerate((*path, -1), start=1):
+                row, count, mean = next(rows)
+                if not count:
+                    ip = hostname = "*"
+                    asn = None
+                elif router < 0:
+                    ip = hostname = target
+                    asn = None
+                else:
+                    ip, hostname, asn = self.addresses[router], self.hostnames[router], self.asns[router]
+                hops.append({
+                    "hop_number": hop_number,
+                    "ip": ip,
+                    "hostname": hostname,
+                    "latency": mean if count else None,
+                    "rtts": [rtt if rtt == rtt else None for rtt in row],  # NaN marks a lost probe
+                    "loss": 1 - count / probes,
+                    "status": "OK" if count else "*",
+                    "ttl": 64 - hop_number,
+                    "asn": asn
+                })
+            results[target] = hops
+        return results
@@ -6,6 +6,8 @@ Verifies that all modules work correctly
 
 import sys
 import os
+import subprocess
+import time
 
 # Add current directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -65,6 +67,416 @@ def test_dns_simulation():
         print(f"❌ DNS simulation failed: {e}")
         return False
 
+def test_simulated_zone():
+    """Test the indexed simulated DNS zone and its deterministic fallback"""
+    print("\n🔍 Testing simulated DNS zone...")
+    
+    try:
+        import tempfile
+        from dns_resolver import DNSResolver
+        from dns_zone import SimulatedZone, fallback_address, generate_zone
+        
+        with tempfile.TemporaryDirectory() as directory:
+            zone_path = os.path.join(directory, "lab.zone")
+            generate_zone(zone_path, 20000, seed=7)
+            with open(zone_path, "a") as zone_file:
+                zone_file.write("; hand-written records\n")
+                zone_file.write("Web.Lab.  60 IN A 10.1.2.3\n")
+                zone_file.write("mail.lab. 60 IN MX 10 web.lab.\n")
+                zone_file.write("$ORIGIN lab.\n")
+                zone_file.write("@ 30 IN A 10.1.2.4\n")
+                zone_file.write("    IN A 10.1.2.5  ; second address of lab.\n")
+                zone_file.write("broken IN A 10.1.2.300\n")
+                zone_file.write("$TTL\n$ORIGIN\n")
+                zone_file.write("hourly 1h IN A 10.1.2.6\n")
+            
+            with SimulatedZone.from_zone_file(zone_path) as zone, \
+                    SimulatedZone.from_zone_file(zone_path) as reopened:
+                if len(zone) != 20009 or zone.lookup("web.lab") != ("10.1.2.3", 60, "zone"):
+                    print("❌ Zone file records were not indexed")
+                    return False
+                if zone.lookup("lab").address not in ("10.1.2.4", "10.1.2.5") or \
+                        zone.lookup("in.lab").source != "fallback" or zone.lookup("broken.lab").source != "fallback" or \
+                        zone.lookup("hourly.lab") != ("10.1.2.6", 3600, "zone"):
+                    print("❌ $ORIGIN, continuation lines, TTL units or malformed lines were handled wrongly")
+                    return False
+                if any(zone.lookup(f"host{i}.zone{i % 97}.sim").source != "zone" for i in range(0, 20000, 997)):
+                    print("❌ Generated records were not found by the index")
+                    return False
+                if zone.lookup("example.com").address != "93.184.216.34" or zone.lookup("mail.lab").source != "fallback":
+                    print("❌ Static names or skipped record types were answered wrongly")
+                    return False
+                unknown = zone.lookup("unknown.example.org")
+                if unknown.address != fallback_address("UNKNOWN.example.org.") or \
+                        reopened.resolve("host123.zone26.sim") != zone.resolve("host123.zone26.sim"):
+                    print("❌ Answers are not deterministic")
+                    return False
+                
+                resolver = DNSResolver(zone=zone)
+                if resolver.simulate_dns_query("web.lab") != "10.1.2.3":
+                    print("❌ Resolver simulation did not use the zone")
+                    return False
+        
+        print(f"✅ Simulated DNS zone successful: unknown.example.org → {unknown.address}")
+        return True
+    except Exception as e:
+        print(f"❌ Simulated DNS zone failed: {e}")
+        return False
+
+def test_dns_cache():
+    """Test the TTL-aware LRU DNS cache and resolver integration"""
+    print("\n🔍 Testing DNS cache...")
+    
+    try:
+        from dns_cache import DNSCache
+        from dns_resolver import DNSResolver
+        clock = [1000.0]
+        cache = DNSCache(max_entries=2, negative_ttl=5, clock=lambda: clock[0])
+        cache.put("Example.COM.", "A", ["93.184.216.34"], ttl=300)
+        cache.put("example.com", "AAAA", ["2606:2800:220:1::"], ttl=60)
+        if cache.get("example.com", "A").address != "93.184.216.34":
+            print("❌ Cache lookup is not case/dot insensitive")
+            return False
+        
+        cache.put_failure("missing.invalid", "A", "NXDOMAIN")
+        if cache.get("example.com", "AAAA") is not None or not cache.get("missing.invalid").negative:
+            print("❌ LRU eviction or negative caching is wrong")
+            return False
+        
+        clock[0] += 10
+        if cache.get("missing.invalid") is not None or cache.get("example.com").remaining(clock[0]) != 290:
+            print("❌ TTL expiry is wrong")
+            return False
+        
+        stats = cache.stats()
+        if (stats["hits"], stats["negative_hits"], stats["misses"], stats["evictions"]) != (2, 1, 2, 1):
+            print(f"❌ Unexpected cache counters: {stats}")
+            return False
+        
+        resolver = DNSResolver()
+        first = resolver.lookup("localhost")
+        second = resolver.lookup("LOCALHOST")
+        if first is not second or resolver.cache.hits != 1:
+            print("❌ Resolver did not answer the repeated lookup from cache")
+            return False
+        
+        print(f"✅ DNS cache successful: {stats}")
+        return True
+    except Exception as e:
+        print(f"❌ DNS cache failed: {e}")
+        return False
+
+def test_persistent_dns_cache():
+    """Test the SQLite-backed DNS cache across restarts and concurrent writers"""
+    print("\n🔍 Testing persistent DNS cache...")
+    
+    try:
+        import tempfile
+        import threading
+        from dns_cache import PersistentDNSCache
+        from dns_resolver import DNSResolver
+        
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "dns.sqlite")
+            clock = [1000.0]
+            first = PersistentDNSCache(path, clock=lambda: clock[0])
+            first.put("example.com", "A", ["93.184.216.34", "93.184.216.35"], ttl=300, source="8.8.8.8")
+            first.put_failure("missing.invalid", "A", "NXDOMAIN", ttl=30)
+            first.close()
+            
+            clock[0] += 100
+            restarted = PersistentDNSCache(path, clock=lambda: clock[0])
+            entry = restarted.get("EXAMPLE.com.")
+            if entry is None or entry.addresses != ["93.184.216.34", "93.184.216.35"] or \
+                    entry.remaining(clock[0]) != 200 or entry.source != "8.8.8.8":
+                print("❌ Cached answer or its remaining TTL did not survive a restart")
+                return False
+            if restarted.get("missing.invalid") is not None:
+                print("❌ Expired negative entry was loaded from disk")
+                return False
+            
+            writers = [PersistentDNSCache(path, clock=lambda: clock[0]) for _ in range(4)]
+            def write(cache: PersistentDNSCache, index: int) -> None:
+                for i in range(50):
+                    cache.put(f"host{index}-{i}.test", "A", [f"10.{index}.0.{i}"], ttl=300)
+            threads = [threading.Thread(target=write, args=(cache, index)) for index, cache in enumerate(writers)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            if any(restarted.get(f"host{index}-49.test") is None for index in range(4)):
+                print("❌ Writes from concurrent cache instances were lost")
+                return False
+            
+            resolver = DNSResolver(cache_path=path)
+            resolver.lookup("localhost")
+            warm = DNSResolver(cache_path=path)
+            warm.lookup("localhost")
+            if warm.cache.disk_hits != 1 or warm.cache.misses != 0:
+                print("❌ Restarted resolver did not answer from the cache file")
+                return False
+            for cache in [first, restarted, *writers, resolver.cache, warm.cache]:
+                cache.close()
+        
+        print(f"✅ Persistent DNS cache successful: {restarted.stats()['disk_hits']} answers read from disk")
+        return True
+    except Exception as e:
+        print(f"❌ Persistent DNS cache failed: {e}")
+        return False
+
+def test_resolve_many():
+    """Test concurrent bulk resolution with timeouts and streaming results"""
+    print("\n🔍 Testing bulk DNS resolution...")
+    
+    try:
+        import time
+        from dns_resolver import DNSResolver
+        
+        class StubResolver(DNSResolver):
+            def _system_lookup(self, domain, record_type="A"):
+                time.sleep(2.0 if domain.startswith("stall") else 0.02)
+                return [f"10.0.{len(domain)}.1"]
+        
+        resolver = StubResolver()
+        domains = [f"host{i}.test" for i in range(200)] + ["stall.test"]
+        start = time.perf_counter()
+        results = list(resolver.resolve_many(domains + ["host0.test"], concurrency=32, timeout=0.3))
+        elapsed = time.perf_counter() - start
+        
+        failed = [domain for domain, entry in results if entry.negative]
+        if len(results) != len(domains) + 1 or failed != ["stall.test"]:
+            print(f"❌ Unexpected results or timeouts: {failed}")
+            return False
+        if elapsed > 1.5 or results[-1][0] != "stall.test":
+            print(f"❌ Lookups did not run concurrently ({elapsed:.2f}s)")
+            return False
+        
+        real = dict(DNSResolver().resolve_many(["localhost"]))
+        if real["localhost"].address is None:
+            print("❌ localhost did not resolve")
+            return False
+        
+        print(f"✅ Bulk DNS resolution successful: {len(results)} names in {elapsed:.2f}s")
+        return True
+    except Exception as e:
+        print(f"❌ Bulk DNS resolution failed: {e}")
+        return False
+
+def test_dns_wire_client():
+    """Test the UDP DNS wire client against a local stub server"""
+    print("\n🔍 Testing DNS wire client...")
+    
+    try:
+        from dns_resolver import DNSResolver
+        from dns_stub import StubDNSServer
+        from dns_wire import DNSWireClient, reverse_name
+        
+        with StubDNSServer() as server:
+            server.add_record("example.com", "A", "93.184.216.34", ttl=3600)
+            server.add_record("example.com", "AAAA", "2606:2800:220:1:248:1893:25c8:1946", ttl=600)
+            server.add_record("www.example.com", "CNAME", "example.com", ttl=120)
+            server.add_record(reverse_name("93.184.216.34"), "PTR", "example.com", ttl=900)
+            for i in range(500):
+                server.add_record(f"host{i}.test", "A", f"10.0.{i // 256}.{i % 256}", ttl=60)
+            
+            client = DNSWireClient([server.address], timeout=0.5)
+            cname = client.query("www.example.com", "CNAME")
+            chained = client.query("www.example.com", "A")
+            aaaa = client.query("example.com", "AAAA")
+            missing = client.query("missing.test", "A")
+            if cname.addresses != ["example.com"] or chained.addresses != ["93.184.216.34"] or chained.ttl != 120:
+                print("❌ CNAME answers or TTLs are wrong")
+                return False
+            if aaaa.ttl != 600 or missing.status != "NXDOMAIN" or missing.ttl != 60:
+                print("❌ AAAA or NXDOMAIN answers are wrong")
+                return False
+            
+            responses = list(client.query_many((f"host{i}.test", "A") for i in range(500)))
+            expected = {f"host{i}.test": f"10.0.{i // 256}.{i % 256}" for i in range(500)}
+            if len(responses) != 500 or any([expected[r.name]] != r.addresses for r in responses):
+                print("❌ Pipelined responses were not matched to their queries")
+                return False
+            
+            resolver = DNSResolver(use_wire=True, wire_timeout=0.5)
+            resolver.dns_servers = [server.address]
+            ptr = resolver.lookup("93.184.216.34", "PTR")
+            entry = resolver.lookup("example.com")
+            if ptr.addresses != ["example.com"] or entry.ttl != 3600 or entry.source != server.address:
+                print("❌ Resolver did not use the configured DNS server")
+                return False
+        
+        print(f"✅ DNS wire client successful: {client.stats['received']} responses, {client.stats['timeouts']} timeouts")
+        return True
+    except Exception as e:
+        print(f"❌ DNS wire client failed: {e}")
+        return False
+
+def test_hedged_dns_queries():
+    """Test hedged DNS queries racing a stalled server against a fast one"""
+    print("\n🔍 Testing hedged DNS queries...")
+    
+    try:
+        from dns_resolver import DNSResolver
+        from dns_stub import StubDNSServer
+        
+        with StubDNSServer(delay=2.0) as slow, StubDNSServer() as fast:
+            for server in (slow, fast):
+                server.add_record("example.com", "A", "93.184.216.34", ttl=3600)
+            
+            resolver = DNSResolver(use_wire=True, wire_timeout=1.0, hedge=True)
+            resolver.dns_servers = [slow.address, fast.address]
+            client = resolver.wire
+            started = time.monotonic()
+            response = client.race("example.com", "A")
+            elapsed = time.monotonic() - started
+            if response.server != fast.address or response.addresses != ["93.184.216.34"] or elapsed > 0.5:
+                print(f"❌ Race was not won by the fast server ({response.server}, {elapsed:.2f}s)")
+                return False
+            
+            for _ in range(5):
+                client.race("example.com", "A")
+            if client.ranked_servers()[0] != fast.address or client.stats["hedges"] > 1:
+                print("❌ Server ranking did not adapt to the stalled server")
+                return False
+            
+            entry = resolver.lookup("example.com")
+            health = resolver.server_health()
+            if entry.source != fast.address or health[0]["server"] != fast.address:
+                print("❌ Resolver did not use hedged queries")
+                return False
+        
+        with StubDNSServer(rcode=2) as first, StubDNSServer(rcode=2) as second:
+            resolver = DNSResolver(use_wire=True, wire_timeout=1.0, hedge=True)
+            resolver.dns_servers = [first.address, second.address]
+            started = time.monotonic()
+            failed = resolver.wire.race("example.com", "A")
+            if failed.rcode != 2 or time.monotonic() - started > 0.5 or resolver.wire.stats["timeouts"]:
+                print("❌ Race waited out its timeout after every server answered SERVFAIL")
+                return False
+        
+        print(f"✅ Hedged DNS queries successful: won in {elapsed * 1000:.0f} ms, "
+              f"{client.stats['hedges']} hedge(s) sent")
+        return True
+    except Exception as e:
+        print(f"❌ Hedged DNS queries failed: {e}")
+        return False
+
+def test_reverse_dns():
+    """Test the cached, concurrent PTR lookup service and its traceroute integration"""
+    print("\n🔍 Testing reverse DNS service...")
+    
+    try:
+        import socket
+        from reverse_dns import ReverseDNS
+        from tracer import Traceroute
+        
+        calls = []
+        def fake_ptr(address: str) -> str:
+            calls.append(address)
+            if address.startswith("10."):
+                time.sleep(0.05)
+                return f"host-{address.replace('.', '-')}.lan"
+            if address == "192.0.2.99":
+                time.sleep(2.0)
+                return "slow.example"
+            raise socket.herror(1, "Unknown host")
+        
+        service = ReverseDNS(timeout=0.5, lookup=fake_ptr)
+        addresses = [f"10.0.0.{i}" for i in range(20)] + ["203.0.113.5", "192.0.2.99", "not-an-ip"]
+        started = time.monotonic()
+        names = service.lookup_many(addresses + addresses)
+        elapsed = time.monotonic() - started
+        if elapsed > 1.0 or names["10.0.0.7"] != "host-10-0-0-7.lan" or "not-an-ip" in names:
+            print(f"❌ Batch lookup exceeded its budget or returned wrong names ({elapsed:.2f}s)")
+            return False
+        if names["203.0.113.5"] is not None or names["192.0.2.99"] is not None or len(calls) != 22:
+            print("❌ Missing PTR records, timeouts or duplicate lookups were handled wrongly")
+            return False
+        
+        service.lookup_many(addresses, timeout=0)
+        if len(calls) != 22 or service.cached("10.0.0.3") != "host-10-0-0-3.lan":
+            print("❌ Answers and failures were not cached")
+            return False
+        
+        def broken_ptr(address: str) -> str:
+            raise RuntimeError("resolver crashed")
+        broken = ReverseDNS(timeout=0.5, lookup=broken_ptr)
+        if broken.lookup_many(["198.51.100.1"]) != {"198.51.100.1": None} or broken.pending:
+            print("❌ An unexpected lookup error escaped or left the address pending")
+            return False
+        
+        tracer = Traceroute(service)
+        hops = tracer.name_hops([
+            {"hop_number": 1, "ip": "10.0.0.1", "hostname": "10.0.0.1"},
+            {"hop_number": 2, "ip": "10.0.0.50", "hostname": "core.isp.net"},
+            {"hop_number": 3, "ip": "*", "hostname": "*"}
+        ])
+        if [hop["hostname"] for hop in hops] != ["host-10-0-0-1.lan", "core.isp.net", "*"]:
+            print("❌ Traceroute hops were not named from the shared service")
+            return False
+        service.shutdown()
+        
+        print(f"✅ Reverse DNS service successful: {len(names)} addresses in {elapsed * 1000:.0f} ms")
+        return True
+    except Exception as e:
+        print(f"❌ Reverse DNS service failed: {e}")
+        return False
+
+def test_dns_bench():
+    """Test the DNS benchmark histogram, pacing and per-server report"""
+    print("\n🔍 Testing DNS benchmark...")
+    
+    try:
+        import random
+        from dns_bench import LatencyHistogram, bench_server, default_names, stub_servers
+        
+        generator = random.Random(3)
+        samples = sorted(generator.lognormvariate(-6, 1.5) for _ in range(20000))
+        histogram = LatencyHistogram()
+        for sample in samples:
+            histogram.record(sample)
+        for fraction in (0.5, 0.9, 0.99, 0.999):
+            exact = samples[int(fraction * len(samples)) - 1]
+            if abs(histogram.percentile(fraction) - exact) > exact * 0.04 + 1e-6:
+                print(f"❌ p{fraction * 100:g} is off: {histogram.percentile(fraction)} vs {exact}")
+                return False
+        
+        names = default_names(100)
+        with stub_servers(names, delay=0.001) as (server,):
+            paced = bench_server(server, names, 300, rate=1000, use_cache=False)
+            cached = bench_server(server, names, 1000)
+        with stub_servers(names, drop_rate=1.0) as (silent,):
+            lost = bench_server(silent, names[:20], 20, timeout=0.1)
+        
+        if paced["elapsed"] < 0.28 or paced["cache_hit_ratio"] != 0 or paced["timeouts"] or paced["sent"] != 300:
+            print(f"❌ Rate limit or uncached run is wrong: {paced}")
+            return False
+        if cached["cache_hit_ratio"] < 0.8 or not cached["p50"] <= cached["p99"] <= cached["max"]:
+            print(f"❌ Cached run report is wrong: {cached}")
+            return False
+        if lost["timeout_rate"] != 1.0:
+            print(f"❌ Timeouts were not counted: {lost}")
+            return False
+        
+        # Lookup errors are failures, not timeouts
+        from dns_resolver import DNSResolver
+        def broken_lookup(domain, record_type):
+            if domain == "slow.test":
+                time.sleep(0.3)
+            raise RuntimeError("resolver crashed")
+        resolver = DNSResolver()
+        resolver._system_lookup = broken_lookup
+        entries = dict(resolver.resolve_many(["broken.test", "slow.test"], timeout=0.1))
+        if entries["broken.test"].timed_out or not entries["slow.test"].timed_out:
+            print("❌ Timed-out lookups were not told apart from failed ones")
+            return False
+        
+        print(f"✅ DNS benchmark successful: {cached['qps']:.0f} qps, p99 {cached['p99'] * 1000:.2f} ms")
+        return True
+    except Exception as e:
+        print(f"❌ DNS benchmark failed: {e}")
+        return False
+
 def test_encapsulation():
     """Test packet encapsulation"""
     print("\n🔍 Testing packet encapsulation...")
@@ -79,6 +491,742 @@ def test_encapsulation():
         print(f"❌ Packet encapsulation failed: {e}")
         return False
 
+def test_batch_encapsulation():
+    """Test headless batch encapsulation"""
+    print("\n🔍 Testing batch encapsulation...")
+    
+    try:
+        from layers import PacketEncapsulator
+        encapsulator = PacketEncapsulator()
+        batch = encapsulator.encapsulate_many(
+            (f"host{i}.example.com", f"10.0.{i // 256}.{i % 256}") for i in range(1000)
+        )
+        if len(batch) != 1000 or batch[999]["network"]["dest_ip"] != "10.0.3.231":
+            print("❌ Batch encapsulation returned unexpected stacks")
+            return False
+        print(f"✅ Batch encapsulation successful: {batch.summary()['packets_per_second']:.0f} packets/s")
+        return True
+    except Exception as e:
+        print(f"❌ Batch encapsulation failed: {e}")
+        return False
+
+def test_frame_builder():
+    """Test wire-format frame generation and checksums"""
+    print("\n🔍 Testing frame builder...")
+    
+    try:
+        from scapy.all import Ether, IP, TCP
+        from layers import PacketEncapsulator
+        encapsulator = PacketEncapsulator()
+        batch = encapsulator.encapsulate_many([("example.com", "93.184.216.34"), ("github.com", "140.82.113.4")])
+        frames = encapsulator.build_frames(batch)
+        
+        for frame in frames:
+            packet = Ether(bytes(frame))
+            ip_checksum, tcp_checksum = packet[IP].chksum, packet[TCP].chksum
+            del packet[IP].chksum
+            del packet[TCP].chksum
+            rebuilt = Ether(bytes(packet))
+            if (ip_checksum, tcp_checksum) != (rebuilt[IP].chksum, rebuilt[TCP].chksum):
+                print("❌ Frame builder produced invalid checksums")
+                return False
+        
+        print(f"✅ Frame builder successful: {len(frames)} frames, {frames.total_bytes} bytes")
+        return True
+    except Exception as e:
+        print(f"❌ Frame builder failed: {e}")
+        return False
+
+def test_frame_template_cache():
+    """Test template patching against full frame serialization"""
+    print("\n🔍 Testing frame template cache...")
+    
+    try:
+        from layers import PacketEncapsulator
+        encapsulator = PacketEncapsulator()
+        data = encapsulator.encapsulate_many([("example.com", "93.184.216.34")])[0]
+        frames = encapsulator.generate_frames(data, [
+            {"identification": 7, "source_port": 50000, "sequence_number": 0xDEADBEEF},
+            {"dest_port": 8080, "ack_number": 42}
+        ])
+        
+        expected = dict(data, network=dict(data["network"], identification=7),
+                        transport=dict(data["transport"], source_port=50000, sequence_number=0xDEADBEEF))
+        if bytes(frames[0]) != bytes(encapsulator.frame_builder.build_frame(expected)):
+            print("❌ Patched frame differs from a full rebuild")
+            return False
+        
+        expected = dict(data, transport=dict(data["transport"], dest_port=8080, ack_number=42))
+        if bytes(frames[1]) != bytes(encapsulator.frame_builder.build_frame(expected)):
+            print("❌ Patched frame differs from a full rebuild")
+            return False
+        
+        print(f"✅ Frame template cache successful: {encapsulator.template_cache.stats()}")
+        return True
+    except Exception as e:
+        print(f"❌ Frame template cache failed: {e}")
+        return False
+
+def test_dissector():
+    """Test bottom-up de-encapsulation of built frames"""
+    print("\n🔍 Testing frame dissector...")
+    
+    try:
+        from dissector import dissect
+        from layers import PacketEncapsulator
+        encapsulator = PacketEncapsulator()
+        data = encapsulator.encapsulate_many([("example.com", "93.184.216.34")])[0]
+        layers = dissect(encapsulator.frame_builder.build_frame(data)).as_layers()
+        
+        checks = [
+            layers["datalink"]["source_mac"] == data["datalink"]["source_mac"],
+            layers["network"]["dest_ip"] == data["network"]["dest_ip"],
+            layers["network"]["flags"] == data["network"]["flags"],
+            layers["transport"]["flags"] == data["transport"]["flags"],
+            layers["transport"]["sequence_number"] == data["transport"]["sequence_number"],
+            layers["application"]["headers"] == data["application"]["headers"]
+        ]
+        if not all(checks):
+            print("❌ Dissected layers do not match the encapsulated data")
+            return False
+        
+        # Frames cut off inside the TCP header still summarise, without ports or flags
+        frame = encapsulator.frame_builder.build_frame(data)
+        for length in (34, 44):
+            summary = dissect(frame[:length]).summary()
+            if summary["protocol"] != "TCP" or "flags" in summary:
+                print(f"❌ Truncated {length}-byte frame summary is wrong")
+                return False
+        
+        print("✅ Frame dissector successful")
+        return True
+    except Exception as e:
+        print(f"❌ Frame dissector failed: {e}")
+        return False
+
+def test_header_records():
+    """Test that slotted header records match the dict-based layer stacks"""
+    print("\n🔍 Testing header records...")
+    
+    try:
+        from layers import PacketEncapsulator
+        encapsulator = PacketEncapsulator()
+        record = encapsulator.encapsulate_many([("example.com", "93.184.216.34")])[0]
+        legacy = encapsulator.encapsulate_many([("example.com", "93.184.216.34")], compact=False)[0]
+        
+        converted = record.as_dict()
+        for layer in ("application", "presentation", "transport", "network", "datalink", "physical"):
+            if converted[layer] != legacy[layer]:
+                print(f"❌ Header record differs from the {layer} layer dict")
+                return False
+        
+        if hasattr(record.transport, "__dict__"):
+            print("❌ Header records are not slotted")
+            return False
+        
+        print("✅ Header records successful")
+        return True
+    except Exception as e:
+        print(f"❌ Header records failed: {e}")
+        return False
+
+def test_layer_profiles():
+    """Test compiled layer profiles against the per-layer dict path"""
+    print("\n🔍 Testing layer profiles...")
+    
+    try:
+        from layers import PacketEncapsulator, LAYER_PROFILES
+        encapsulator = PacketEncapsulator()
+        items = [("example.com", "93.184.216.34", profile) for profile in LAYER_PROFILES]
+        compiled = encapsulator.encapsulate_many(items)
+        layered = encapsulator.encapsulate_many(items, compact=False)
+        
+        for record, legacy in zip(compiled, layered):
+            converted = record.as_dict()
+            for layer in ("application", "transport", "network", "datalink"):
+                if converted[layer] != legacy[layer]:
+                    print(f"❌ Profile {record.profile} differs in the {layer} layer")
+                    return False
+        
+        dns = encapsulator.encapsulate_many([("example.com", "93.184.216.34", "udp-dns")])[0]
+        if dns["network"]["protocol_id"] != 17 or dns["transport"]["dest_port"] != 53:
+            print("❌ UDP/DNS profile produced wrong protocol fields")
+            return False
+        
+        print(f"✅ Layer profiles successful: {', '.join(LAYER_PROFILES)}")
+        return True
+    except Exception as e:
+        print(f"❌ Layer profiles failed: {e}")
+        return False
+
+def test_fragmentation():
+    """Test IPv4 fragmentation and out-of-order reassembly"""
+    print("\n🔍 Testing IP fragmentation...")
+    
+    try:
+        import random
+        from fragmentation import Fragment, Reassembler, FragmentationNeeded
+        from layers import NetworkLayer
+        network_layer = NetworkLayer()
+        payload = bytes(range(256)) * 16
+        data = network_layer.encapsulate({"resolved_ip": "93.184.216.34"})
+        
+        try:
+            network_layer.fragment(data, payload, mtu=1500)
+            print("❌ DF packet was fragmented")
+            return False
+        except FragmentationNeeded:
+            pass
+        
+        data["network"]["flags"]["DF"] = False
+        fragments = network_layer.fragment(data, payload, mtu=576)
+        if any(len(f.payload) % 8 for f in fragments[:-1]) or fragments[-1].more_fragments:
+            print("❌ Fragment boundaries are wrong")
+            return False
+        
+        random.shuffle(fragments)
+        reassembler = Reassembler()
+        results = [reassembler.add(fragment) for fragment in fragments]
+        completed = [result for result in results if result is not None]
+        if len(completed) != 1 or bytes(completed[0]) != payload or len(reassembler):
+            print("❌ Reassembled payload does not match")
+            return False
+        
+        # A hole at [8, 16): fragments past the last one's end must not fill it
+        def fragment(offset, more, data):
+            return Fragment("10.0.0.1", "10.0.0.2", 7, 17, offset, more, memoryview(data))
+        reassembler = Reassembler()
+        holed = [reassembler.add(fragment(0, True, b"A" * 8)), reassembler.add(fragment(16, False, b"B" * 8)),
+                 reassembler.add(fragment(24, True, b"C" * 8)), reassembler.add(fragment(8, False, b"D" * 8))]
+        if any(result is not None for result in holed) or reassembler.stats["dropped"] != 2:
+            print("❌ Datagram with a hole was reassembled")
+            return False
+        if bytes(reassembler.add(fragment(8, True, b"D" * 8))) != b"A" * 8 + b"D" * 8 + b"B" * 8:
+            print("❌ Filled hole was not reassembled")
+            return False
+        
+        print(f"✅ IP fragmentation successful: {len(fragments)} fragments reassembled")
+        return True
+    except Exception as e:
+        print(f"❌ IP fragmentation failed: {e}")
+        return False
+
+def test_segmentation():
+    """Test TCP segmentation of a large memory-mapped payload"""
+    print("\n🔍 Testing TCP segmentation...")
+    
+    try:
+        import os
+        import tempfile
+        from scapy.all import Ether, IP, TCP
+        from layers import PacketEncapsulator
+        from segmentation import map_file
+        encapsulator = PacketEncapsulator()
+        data = encapsulator.encapsulate_many([("example.com", "93.184.216.34")])[0]
+        transport_layer = encapsulator.layers[3]
+        payload = os.urandom(100000)
+        
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "payload.bin")
+            with open(path, "wb") as handle:
+                handle.write(payload)
+            with map_file(path) as view:
+                segments = [(header, bytes(chunk)) for header, chunk in transport_layer.segment(data, view, 1460)]
+        
+        expected = data["transport"]["sequence_number"] + 1
+        for header, chunk in segments:
+            if header.sequence_number != expected or len(chunk) > 1460:
+                print("❌ Segment sequence numbers are not contiguous")
+                return False
+            expected += len(chunk)
+        if b"".join(chunk for _, chunk in segments) != payload or not segments[-1][0].flags["PSH"]:
+            print("❌ Segmented payload does not match")
+            return False
+        
+        frames = [bytes(frame) for frame in encapsulator.stream_segments(data, payload[:5000], 1460)]
+        packet = Ether(frames[-1])
+        if len(frames) != 4 or packet[TCP].seq != data["transport"]["sequence_number"] + 1 + 3 * 1460:
+            print("❌ Segment frames are wrong")
+            return False
+        ip_checksum, tcp_checksum = packet[IP].chksum, packet[TCP].chksum
+        del packet[IP].chksum
+        del packet[TCP].chksum
+        rebuilt = Ether(bytes(packet))
+        if (ip_checksum, tcp_checksum) != (rebuilt[IP].chksum, rebuilt[TCP].chksum):
+            print("❌ Segment frame checksums are invalid")
+            return False
+        
+        print(f"✅ TCP segmentation successful: {len(segments)} segments")
+        return True
+    except Exception as e:
+        print(f"❌ TCP segmentation failed: {e}")
+        return False
+
+def test_session_simulation():
+    """Test the event-driven multi-flow TCP session simulator"""
+    print("\n🔍 Testing session simulation...")
+    
+    try:
+        from layers import TransportLayer
+        from sessions import SessionSimulator
+        data = TransportLayer().encapsulate({})
+        simulator = SessionSimulator(data["transport"], trace_flows=1)
+        simulator.add_flow(0.0, 20000, rtt=0.1)
+        simulator.add_flows(2000, size=32 * 1024, loss_rate=0.02)
+        
+        partial = simulator.run(until=1.0)
+        summary = simulator.run()
+        if partial["completed"] >= summary["completed"] or summary["completed"] != len(simulator):
+            print("❌ Not every flow completed")
+            return False
+        if summary["bytes_delivered"] != 20000 + 2000 * 32 * 1024 or not summary["retransmits"]:
+            print("❌ Delivered bytes or retransmits are wrong")
+            return False
+        
+        # Flow 0: SYN, SYN-ACK, two windows (IW10 then the rest) and FIN, one RTT each
+        events = [entry[2] for entry in simulator.trace]
+        if events != ["syn", "syn-ack", "data", "ack", "data", "ack", "fin", "closed"]:
+            print(f"❌ Unexpected flow trace: {events}")
+            return False
+        if simulator.trace[-1][3] != 1001 + 20000 or abs(simulator.finish_time[0] - 0.4) > 1e-9:
+            print("❌ Flow 0 sequence numbers or timing are wrong")
+            return False
+        
+        try:
+            simulator.add_flow(0.0, 1000, loss_rate=1.0)
+            print("❌ A flow that can never finish was accepted")
+            return False
+        except ValueError:
+            pass
+        
+        print(f"✅ Session simulation successful: {summary['completed']} flows, {summary['events']} events")
+        return True
+    except Exception as e:
+        print(f"❌ Session simulation failed: {e}")
+        return False
+
+def test_hexdump():
+    """Test the hex dump renderer and per-layer byte ranges"""
+    print("\n🔍 Testing hex dump renderer...")
+    
+    try:
+        import io
+        from dissector import dissect
+        from hexdump import console as hexdump_console, hexdump, hexdump_lines, highlighted_lines, write_hexdump
+        from layers import PacketEncapsulator
+        encapsulator = PacketEncapsulator()
+        batch = encapsulator.encapsulate_many([("example.com", "93.184.216.34")] * 3)
+        frames = encapsulator.build_frames(batch)
+        frame = bytes(frames[0])
+        
+        lines = hexdump(frame).split("\n")
+        if len(lines) != -(-len(frame) // 16) or not lines[0].startswith("0000  00 50 56 c0"):
+            print("❌ Hex dump layout is wrong")
+            return False
+        recovered = bytes.fromhex("".join(line[6:53] for line in lines))
+        if recovered != frame or "|..09@.@" not in lines[1]:
+            print("❌ Hex dump does not round-trip")
+            return False
+        
+        spans = dissect(frame).layer_spans()
+        if [layer for layer, _, _ in spans] != ["datalink", "network", "transport", "application"] \
+                or spans[-1][2] != len(frame):
+            print(f"❌ Unexpected layer spans: {spans}")
+            return False
+        
+        page = list(highlighted_lines(frame, spans, first_line=2, max_lines=3))
+        if len(page) != 3 or page[0].plain != lines[2]:
+            print("❌ Highlighted page does not match the plain dump")
+            return False
+        
+        stream = io.StringIO()
+        if write_hexdump(frames, stream) != 3 or stream.getvalue().count("Frame ") != 3:
+            print("❌ Streaming dump is wrong")
+            return False
+        if sum(1 for _ in hexdump_lines(bytes(100000))) != 6250:
+            print("❌ Large buffer dump is wrong")
+            return False
+        
+        # The encapsulation module dumps a bare IP packet from create_scapy_packet
+        packet = encapsulator.create_scapy_packet(encapsulator.encapsulate_many([("example.com", "93.184.216.34")],
+                                                                                compact=False)[0])
+        with hexdump_console.capture() as capture:
+            encapsulator.display_packet_hex(packet)
+        legend = capture.get()
+        if "Layer 2" in legend or not all(label in legend for label in ("Layer 3", "Layer 4", "Layer 7")):
+            print("❌ IP packet dump highlights the wrong layers")
+            return False
+        
+        print(f"✅ Hex dump renderer successful: {len(lines)} lines, {len(spans)} layers")
+        return True
+    except Exception as e:
+        print(f"❌ Hex dump renderer failed: {e}")
+        return False
+
+def test_probe_engine():
+    """Test the parallel-probe traceroute engine against a stand-in path"""
+    print("\n🔍 Testing parallel-probe traceroute...")
+    
+    try:
+        from probe_engine import ProbeEngine
+        from probe_stub import StubPath
+        from tracer import Traceroute
+        
+        routers = [f"10.{hop}.0.1" for hop in range(1, 13)]
+        paths = []
+        def make_path() -> StubPath:
+            paths.append(StubPath(routers, "203.0.113.10", hop_latency=0.01, silent={4}))
+            return paths[-1]
+        
+        engine = ProbeEngine(max_hops=30, timeout=0.5, transport_factory=make_path)
+        started = time.monotonic()
+        hops = engine.trace("203.0.113.10")
+        elapsed = time.monotonic() - started
+        
+        if len(hops) != 13 or hops[-1]["ip"] != "203.0.113.10" or hops[3]["status"] != "*":
+            print(f"❌ Path was not reconstructed: {[hop['ip'] for hop in hops]}")
+            return False
+        if [hop["ip"] for hop in hops[:3]] != routers[:3] or not all(hop["loss"] == 0 for hop in hops if hop["ip"] != "*"):
+            print("❌ Replies were not matched to their probes")
+            return False
+        if not hops[0]["latency"] < hops[6]["latency"] < hops[12]["latency"]:
+            print("❌ Per-hop round-trip times are wrong")
+            return False
+        # 13 hops x 3 probes one at a time would need at least 4 hops x 3 probes x 0.5s of timeouts
+        if elapsed > 1.0 or paths[0].probes > 30 * 3:
+            print(f"❌ Trace was not parallel ({elapsed:.2f}s, {paths[0].probes} probes)")
+            return False
+        
+        tracer = Traceroute(engine=ProbeEngine(timeout=0.2, transport_factory=lambda: StubPath(routers[:2], "127.0.0.1")))
+        if [hop["ip"] for hop in tracer._real_traceroute("127.0.0.1")] != routers[:2] + ["127.0.0.1"]:
+            print("❌ Traceroute did not use the probe engine")
+            return False
+        
+        print(f"✅ Parallel-probe traceroute successful: {len(hops)} hops in {elapsed * 1000:.0f} ms")
+        return True
+    except Exception as e:
+        print(f"❌ Parallel-probe traceroute failed: {e}")
+        return False
+
+def test_trace_many():
+    """Test multi-target traceroute with a shared stop set and probe budget"""
+    print("\n🔍 Testing multi-target traceroute...")
+    
+    try:
+        from probe_engine import ProbeBudget, ProbeEngine, StopSet
+        from probe_stub import StubNetwork, shared_prefix_routes
+        
+        routes = shared_prefix_routes(24)
+        def make_network() -> StubNetwork:
+            return StubNetwork(routes, hop_latency=0.001)
+        
+        single = ProbeEngine(timeout=0.2, transport_factory=make_network)
+        for target in list(routes)[:4]:
+            single.trace(target)
+        
+        engine = ProbeEngine(timeout=0.2, transport_factory=make_network, budget=ProbeBudget(4000, burst=200))
+        stop_set = StopSet()
+        started = time.monotonic()
+        results = engine.trace_many(routes, concurrency=6, stop_set=stop_set)
+        elapsed = time.monotonic() - started
+        
+        wrong = [target for target, hops in results.items() if [hop["ip"] for hop in hops] != routes[target] + [target]]
+        if list(results) != list(routes) or wrong:
+            print(f"❌ Paths were not reconstructed: {wrong}")
+            return False
+        shared = sum(1 for hops in results.values() for hop in hops if hop.get("shared"))
+        if not stop_set.hits or not shared:
+            print("❌ Common hops were probed again instead of reused")
+            return False
+        # Tracing every target on its own would send single.probes_sent / 4 probes each
+        if engine.probes_sent > single.probes_sent / 4 * len(routes) / 2:
+            print(f"❌ Stop set did not save probes ({engine.probes_sent} sent)")
+            return False
+        if elapsed < (engine.probes_sent - 200) / 4000:
+            print("❌ Probe budget was not respected")
+            return False
+        
+        print(f"✅ Multi-target traceroute successful: {len(results)} targets, {engine.probes_sent} probes, "
+              f"{shared} hops reused")
+        return True
+    except Exception as e:
+        print(f"❌ Multi-target traceroute failed: {e}")
+        return False
+
+def test_topology_graph():
+    """Test merging traces into the topology graph, path queries and persistence"""
+    print("\n🔍 Testing topology graph...")
+    
+    try:
+        import tempfile
+        from topology import TopologyGraph, diff_paths
+        from tracer import Traceroute
+        
+        def hops(addresses, latencies):
+            return [{"ip": ip, "hostname": ip, "latency": latency} for ip, latency in zip(addresses, latencies)]
+        
+        tracer = Traceroute()
+        graph = tracer.topology
+        for _ in range(3):
+            tracer.record_trace("dest", hops(["gw", "isp", "core", "dest"], [1.0, 5.0, 9.0, 12.0]))
+        tracer.record_trace("dest", hops(["gw", "*", "backup", "core", "dest"], [1.0, None, 3.0, 4.0, 6.0]))
+        
+        edge = graph.edge("gw", "isp")
+        if edge.count != 3 or abs(edge.mean - 4.0) > 1e-9 or graph.edge("gw", "backup").gaps != 1:
+            print("❌ Link statistics were not merged")
+            return False
+        if graph.shortest_path("local", "dest") != ["local", "gw", "backup", "core", "dest"]:
+            print("❌ Lowest-latency path is wrong")
+            return False
+        if graph.most_common_path("local", "dest") != ["local", "gw", "isp", "core", "dest"]:
+            print("❌ Most common path is wrong")
+            return False
+        if graph.route_change("dest") != [("replace", ["isp"], ["backup"])]:
+            print(f"❌ Route change not detected: {graph.route_change('dest')}")
+            return False
+        if diff_paths(["a", "b"], ["a", "b"]) or graph.observed_paths("dest")[0][1] != 3:
+            print("❌ Path counting is wrong")
+            return False
+        
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "topology.json")
+            graph.save(path)
+            loaded = TopologyGraph.load(path)
+        if (len(loaded), loaded.edge_count, loaded.traces) != (len(graph), graph.edge_count, 4) \
+                or loaded.edge("gw", "isp").stddev != edge.stddev or loaded.route_change("dest") != graph.route_change("dest"):
+            print("❌ Topology did not survive saving and loading")
+            return False
+        
+        print(f"✅ Topology graph successful: {len(graph)} nodes, {graph.edge_count} links")
+        return True
+    except Exception as e:
+        print(f"❌ Topology graph failed: {e}")
+        return False
+
+def test_path_monitor():
+    """Test mtr-style continuous probing with bounded per-hop statistics"""
+    print("\n🔍 Testing path monitor...")
+    
+    try:
+        import random
+        import statistics
+        from path_monitor import HopStats, PathMonitor
+        from synthetic_topology import SyntheticTopology
+        
+        generator = random.Random(3)
+        samples = [generator.gauss(20.0, 2.0) for _ in range(5000)]
+        stats = HopStats(1, ring_size=16)
+        for sample in samples:
+            stats.add(sample)
+        for _ in range(1000):
+            stats.add(None)
+        
+        if abs(stats.mean - statistics.fmean(samples)) > 1e-9 or abs(stats.stddev - statistics.stdev(samples)) > 1e-9:
+            print("❌ Running mean/variance disagree with the exact ones")
+            return False
+        if abs(stats.loss - 1000 / 6000) > 1e-9 or stats.best != min(samples) or stats.worst != max(samples):
+            print("❌ Loss or extremes are wrong")
+            return False
+        exact_p99 = sorted(samples)[int(0.99 * len(samples))]
+        if abs(stats.percentile(0.99) - exact_p99) / exact_p99 > 0.05 or not 0 < stats.jitter < 5:
+            print("❌ Percentile sketch or jitter is off")
+            return False
+        if len(stats.recent) != 16 or not all(sample != sample for sample in stats.recent_samples()):
+            print("❌ Ring buffer did not keep only the latest samples")
+            return False
+        
+        topology = SyntheticTopology()
+        monitor = PathMonitor("example.com", lambda: topology.trace("example.com"), ring_size=8)
+        for _ in range(300):
+            monitor.probe_round()
+        hops = monitor.statistics()
+        if len(monitor.hops) != len(hops) or hops[-1].address != "example.com" or hops[-1].sent != 900:
+            print("❌ Rounds were not folded into one set of statistics per hop")
+            return False
+        if any(len(hop.recent) != 8 or len(hop.responders) > 4 for hop in monitor.hops):
+            print("❌ Per-hop state grew with the number of rounds")
+            return False
+        
+        monitor.run(rounds=302, interval=0)
+        if monitor.rounds != 302:
+            print("❌ Live mode did not run the requested rounds")
+            return False
+        
+        # No raw sockets and no traceroute command: rounds fall back to simulation
+        from tracer import Traceroute
+        tracer = Traceroute()
+        def denied(*args, **kwargs):
+            raise PermissionError("raw sockets denied")
+        def missing(*args, **kwargs):
+            raise FileNotFoundError("traceroute")
+        tracer.engine.trace, tracer.stream_traceroute = denied, missing
+        round_trace = tracer._monitor_round("example.com")
+        if any(round_trace()[-1]["ip"] != "example.com" for _ in range(2)):
+            print("❌ Monitor rounds did not fall back to simulation")
+            return False
+        
+        print(f"✅ Path monitor successful: {len(hops)} hops over {monitor.rounds} rounds")
+        return True
+    except Exception as e:
+        print(f"❌ Path monitor failed: {e}")
+        return False
+
+def test_traceroute_parser():
+    """Test parsing traceroute and tracert output with every probe per hop"""
+    print("\n🔍 Testing traceroute parser...")
+    
+    try:
+        from traceroute_parser import parse_traceroute_output, parse_traceroute_log
+        
+        unix = (
+            "traceroute to example.com (93.184.216.34), 30 hops max, 60 byte packets\n"
+            " 1  gateway (192.168.1.1)  0.512 ms  0.487 ms  0.470 ms\n"
+            " 2  * * *\n"
+            " 3  a.net (10.0.0.1)  5.1 ms b.net (10.0.0.2)  6.2 ms *\n"
+            "    c.net (10.0.0.3)  7.0 ms\n"
+            " 4  192.0.2.1  20.0 ms !N  21.0 ms !N  22.0 ms !N\n"
+        )
+        hops = parse_traceroute_output(unix)
+        if [hop["ip"] for hop in hops] != ["192.168.1.1", "*", "10.0.0.1", "192.0.2.1"]:
+            print(f"❌ Wrong Unix hop addresses: {[hop['ip'] for hop in hops]}")
+            return False
+        if hops[0]["hostname"] != "gateway" or hops[0]["rtts"] != [0.512, 0.487, 0.470]:
+            print("❌ Hostname or probe RTTs lost")
+            return False
+        if hops[1]["status"] != "*" or hops[1]["loss"] != 1.0:
+            print("❌ Silent hop not reported as lost")
+            return False
+        if hops[2]["alternates"] != ["10.0.0.2", "10.0.0.3"] or hops[2]["rtts"] != [5.1, 6.2, None, 7.0]:
+            print(f"❌ ECMP responders not kept: {hops[2]}")
+            return False
+        if hops[3]["status"] != "!N":
+            print("❌ Unreachable flag not kept")
+            return False
+        
+        windows = (
+            "Tracing route to example.com [93.184.216.34]\r\n"
+            "over a maximum of 30 hops:\r\n\r\n"
+            "  1    <1 ms    <1 ms    <1 ms  192.168.1.1\r\n"
+            "  2     9 ms     *       11 ms  core.isp.net [10.0.0.1]\r\n"
+            "  3     *        *        *     Request timed out.\r\n"
+            "  4  192.0.2.1  reports: Destination host unreachable.\r\n"
+            "\r\nTrace complete.\r\n"
+        )
+        hops = parse_traceroute_output(windows)
+        if [hop["ip"] for hop in hops] != ["192.168.1.1", "10.0.0.1", "*", "192.0.2.1"]:
+            print(f"❌ Wrong tracert hop addresses: {[hop['ip'] for hop in hops]}")
+            return False
+        if hops[1]["hostname"] != "core.isp.net" or hops[1]["latency"] != 10.0 or hops[3]["status"] != "!H":
+            print("❌ tracert hop details wrong")
+            return False
+        
+        runs = list(parse_traceroute_log((unix + windows).splitlines()))
+        if [(target, len(hops)) for target, hops in runs] != [("example.com", 4), ("example.com", 4)]:
+            print("❌ Archived log not split into runs")
+            return False
+        
+        print("✅ Traceroute parser successful")
+        return True
+    except Exception as e:
+        print(f"❌ Traceroute parser failed: {e}")
+        return False
+
+def test_streaming_traceroute():
+    """Test streaming system traceroute output, keeping partial paths on timeout"""
+    print("\n🔍 Testing streaming traceroute...")
+    
+    try:
+        from tracer import Traceroute
+        
+        script = (
+            "import sys, time\n"
+            "print('traceroute to example.com (93.184.216.34), 30 hops max', flush=True)\n"
+            "for hop in range(1, 4):\n"
+            "    time.sleep(0.1)\n"
+            "    print(f' {hop}  10.0.{hop}.1  {hop * 1.5:.3f} ms', flush=True)\n"
+            "time.sleep(30)\n"
+        )
+        
+        class FakeTraceroute(Traceroute):
+            def _traceroute_command(self, target):
+                return [sys.executable, "-c", script]
+        
+        tracer = FakeTraceroute()
+        arrivals = []
+        started = time.monotonic()
+        try:
+            for hop in tracer.stream_traceroute("example.com", timeout=1.0):
+                arrivals.append((time.monotonic() - started, hop))
+            print("❌ Hung traceroute was not timed out")
+            return False
+        except subprocess.TimeoutExpired:
+            pass
+        
+        if [hop["ip"] for _, hop in arrivals] != ["10.0.1.1", "10.0.2.1", "10.0.3.1"] or arrivals[0][0] > 0.6:
+            print(f"❌ Hops were not streamed as they arrived: {arrivals}")
+            return False
+        
+        tracer.command_timeout = 1.0
+        hops = tracer._system_traceroute("example.com")
+        if len(hops) != 3 or hops[2]["latency"] != 4.5:
+            print("❌ Partial path was not kept after the timeout")
+            return False
+        
+        print(f"✅ Streaming traceroute successful: first hop after {arrivals[0][0] * 1000:.0f} ms")
+        return True
+    except Exception as e:
+        print(f"❌ Streaming traceroute failed: {e}")
+        return False
+
+def test_synthetic_topology():
+    """Test the seeded synthetic topology behind simulated traceroutes"""
+    print("\n🔍 Testing synthetic topology...")
+    
+    try:
+        from synthetic_topology import SyntheticTopology
+        from tracer import Traceroute
+        
+        topology = SyntheticTopology(seed=7)
+        if len(topology) < 2000:
+            print(f"❌ Topology too small: {len(topology)} routers")
+            return False
+        
+        targets = [f"host{i}.example" for i in range(2000)]
+        started = time.monotonic()
+        traces = topology.trace_many(targets)
+        elapsed = time.monotonic() - started
+        if traces != SyntheticTopology(seed=7).trace_many(targets):
+            print("❌ Same seed did not replay the same traces")
+            return False
+        if traces == SyntheticTopology(seed=8).trace_many(targets):
+            print("❌ Different seeds gave the same traces")
+            return False
+        
+        for target, hops in traces.items():
+            if hops[0]["ip"] != "192.168.1.1" or hops[-1]["ip"] != target or len(hops[-1]["rtts"]) != 3:
+                print(f"❌ Trace to {target} does not run from the home router to the target")
+                return False
+        tiers = {hop["hostname"].split(".")[0].rstrip("0123456789") for hops in traces.values() for hop in hops}
+        if not {"access", "transit", "core"} <= tiers:
+            print(f"❌ Paths do not cross the AS tiers: {tiers}")
+            return False
+        if topology.route(topology.attachment(targets[0])) is not topology.route(topology.attachment(targets[0])):
+            print("❌ Routes were not cached")
+            return False
+        
+        tracer = Traceroute(synthetic=topology)
+        first = tracer._generate_hop_sequence("example.com")
+        first[0]["latency"] = -1
+        if tracer._generate_hop_sequence("example.com")[0]["latency"] == -1:
+            print("❌ Simulated hops share state between calls")
+            return False
+        
+        print(f"✅ Synthetic topology successful: {len(topology)} routers, {len(traces)} traces in {elapsed * 1000:.0f} ms")
+        return True
+    except Exception as e:
+        print(f"❌ Synthetic topology failed: {e}")
+        return False
+
 def test_traceroute_simulation():
     """Test traceroute simulation"""
     print("\n🔍 Testing traceroute simulation...")
@@ -115,7 +1263,32 @@ def main():
     tests = [
         test_imports,
         test_dns_simulation,
+        test_simulated_zone,
+        test_dns_cache,
+        test_persistent_dns_cache,
+        test_resolve_many,
+        test_dns_wire_client,
+        test_hedged_dns_queries,
+        test_reverse_dns,
+        test_dns_bench,
         test_encapsulation,
+        test_batch_encapsulation,
+        test_frame_builder,
+        test_frame_template_cache,
+        test_dissector,
+        test_header_records,
+        test_layer_profiles,
+        test_fragmentation,
+        test_segmentation,
+        test_session_simulation,
+        test_hexdump,
+        test_probe_engine,
+        test_trace_many,
+        test_topology_graph,
+        test_path_monitor,
+        test_traceroute_parser,
+        test_streaming_traceroute,
+        test_synthetic_topology,
         test_traceroute_simulation,
         test_packet_capture_simulation
     ]
@@ -0,0 +1,292 @@
+"""
+Topology Module for Packet Odyssey
+Network graph merged from traceroute hops, with per-link latency statistics
+"""
+
+import difflib
+import heapq
+import json
+import math
+import os
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+LOCAL = "local"  # The vantage point every trace starts from
+FORMAT_VERSION = 1
+
+Path = Tuple[int, ...]
+
+class EdgeStats:
+    """Observation count and running latency statistics (Welford) of one link"""
+    
+    __slots__ = ("count", "samples", "mean", "m2", "minimum", "maximum", "gaps")
+    
+    def __init__(self):
+        self.count = 0
+        self.samples = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minimum = math.inf
+        self.maximum = 0.0
+        self.gaps = 0  # Times the link was only inferred across silent hops
+    
+    def add(self, latency: Optional[float], gap: int = 0) -> None:
+        """
+        Record one traversal of the link
+        
+        Args:
+            latency: Latency the link adds in ms (difference of the two hops' RTTs), if known
+            gap: Silent hops between the two ends on this trace
+        """
+        self.count += 1
+        if gap:
+            self.gaps += 1
+        if latency is None:
+            return
+        self.samples += 1
+        delta = latency - self.mean
+        self.mean += delta / self.samples
+        self.m2 += delta * (latency - self.mean)
+        self.minimum = min(self.minimum, latency)
+        self.maximum = max(self.maximum, latency)
+    
+    @property
+    def stddev(self) -> float:
+        return math.sqrt(self.m2 / (self.samples - 1)) if self.samples > 1 else 0.0
+    
+    def as_list(self) -> List[Any]:
+        return [self.count, self.samples, self.mean, self.m2,
+                self.minimum if self.samples else None, self.maximum, self.gaps]
+    
+    @classmethod
+    def from_list(cls, values: Sequence[Any]) -> "EdgeStats":
+        edge = cls()
+        edge.count, edge.samples, edge.mean, edge.m2, minimum, edge.maximum, edge.gaps = values
+        edge.minimum = math.inf if minimum is None else minimum
+        return edge
+
+def diff_paths(old: Sequence[str], new: Sequence[str]) -> List[Tuple[str, List[str], List[str]]]:
+    """
+    Differences between two hop address sequences
+    
+    Returns:
+        (operation, old hops, new hops) for each stretch that changed, where
+        operation is "replace", "insert" or "delete"; empty when equal
+    """
+    matcher = difflib.SequenceMatcher(None, list(old), list(new), autojunk=False)
+    return [(operation, list(old[i1:i2]), list(new[j1:j2]))
+            for operation, i1, i2, j1, j2 in matcher.get_opcodes() if operation != "equal"]
+
+class TopologyGraph:
+    """
+    Directed graph of the interfaces traceroutes have passed through
+    
+    Nodes are interned to integer ids and links kept in per-node adjacency
+    dictionaries, so merging a trace costs O(hops) and path queries run
+    Dijkstra over plain integers, restricted to the nodes that can reach
+    the destination. Every trace also counts the exact path
+    seen to its target and keeps the previous one, for route change checks.
+    Silent hops are skipped: the link is drawn across them and counted in
+    its gaps.
+    """
+    
+    def __init__(self):
+        self.addresses: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self.hostnames: Dict[int, str] = {}
+        self.adjacency: List[Dict[int, EdgeStats]] = []
+        self.predecessors: List[List[int]] = []
+        self.departures: List[int] = []  # Traversals of all links leaving each node
+        self.paths: Dict[str, Dict[Path, int]] = {}
+        self.latest: Dict[str, Path] = {}
+        self.previous: Dict[str, Path] = {}
+        self.traces = 0
+    
+    def __len__(self) -> int:
+        return len(self.addresses)
+    
+    @property
+    def edge_count(self) -> int:
+        return sum(len(edges) for edges in self.adjacency)
+    
+    def node(self, address: str) -> int:
+        """Id of an address, adding it to the graph when new"""
+        node = self.ids.get(address)
+        if node is None:
+            node = self.ids[address] = len(self.addresses)
+            self.addresses.append(address)
+            self.adjacency.append({})
+            self.predecessors.append([])
+            self.departures.append(0)
+        return node
+    
+    def add_trace(self, target: str, hops: List[Dict[str, Any]], source: str = LOCAL) -> List[str]:
+        """
+        Merge one trace's hops into the graph
+        
+        Returns:
+            The addresses of the path recorded, starting at source
+        """
+        path = [self.node(source)]
+        previous_latency: Optional[float] = 0.0
+        gap = 0
+        for hop in hops:
+            if hop["ip"] == "*":
+                gap += 1
+                continue
+            node = self.node(hop["ip"])
+            hostname = hop.get("hostname")
+            if hostname and hostname != hop["ip"]:
+                self.hostnames[node] = hostname
+            if node == path[-1]:
+                continue  # The same router answering again, e.g. a destination below max TTL
+            latency = hop.get("latency")
+            edges = self.adjacency[path[-1]]
+            edge = edges.get(node)
+            if edge is None:
+                edge = edges[node] = EdgeStats()
+                self.predecessors[node].append(path[-1])
+            self.departures[path[-1]] += 1
+            # RTTs to consecutive hops are measured independently; clamp jitter below zero
+            edge.add(max(latency - previous_latency, 0.0) if latency is not None and previous_latency is not None
+                     else None, gap)
+            path.append(node)
+            previous_latency = latency
+            gap = 0
+        
+        key = tuple(path)
+        counts = self.paths.setdefault(target, {})
+        counts[key] = counts.get(key, 0) + 1
+        if target in self.latest:
+            self.previous[target] = self.latest[target]
+        self.latest[target] = key
+        self.traces += 1
+        return [self.addresses[node] for node in key]
+    
+    def edge(self, source: str, destination: str) -> Optional[EdgeStats]:
+        if source not in self.ids or destination not in self.ids:
+            return None
+        return self.adjacency[self.ids[source]].get(self.ids[destination])
+    
+    def neighbors(self, address: str) -> List[str]:
+        if address not in self.ids:
+            return []
+        return [self.addresses[node] for node in self.adjacency[self.ids[address]]]
+    
+    def hostname(self, address: str) -> str:
+        return self.hostnames.get(self.ids.get(address, -1), address)
+    
+    def _dijkstra(self, source: str, destination: str,
+                  cost: Callable[[EdgeStats, int], float]) -> Optional[List[str]]:
+        if source not in self.ids or destination not in self.ids:
+            return None
+        start, goal = self.ids[source], self.ids[destination]
+        # Only nodes with a way to the destination can be on a path; in traceroute graphs
+        # those are the few paths converging on it, however large the graph is
+        relevant = {goal}
+        stack = [goal]
+        while stack:
+            for predecessor in self.predecessors[stack.pop()]:
+                if predecessor not in relevant:
+                    relevant.add(predecessor)
+                    stack.append(predecessor)
+        if start not in relevant:
+            return None
+        distances = {start: 0.0}
+        parents: Dict[int, int] = {}
+        queue = [(0.0, start)]
+        while queue:
+            distance, node = heapq.heappop(queue)
+            if node == goal:
+                path = [node]
+                while node != start:
+                    node = parents[node]
+                    path.append(node)
+                return [self.addresses[node] for node in reversed(path)]
+            if distance > distances[node]:
+                continue
+            total = self.departures[node]
+            for neighbor, edge in self.adjacency[node].items():
+                if neighbor not in relevant:
+                    continue
+                candidate = distance + cost(edge, total)
+                if candidate < distances.get(neighbor, math.inf):
+                    distances[neighbor] = candidate
+                    parents[neighbor] = node
+                    heapq.heappush(queue, (candidate, neighbor))
+        return None
+    
+    def shortest_path(self, source: str, destination: str, by: str = "latency") -> Optional[List[str]]:
+        """
+        Lowest-latency (by="latency") or fewest-hop (by="hops") path seen between two nodes
+        
+        Links without latency samples count as zero latency; every link adds
+        a microsecond so ties go to the shorter path. None when unconnected.
+        """
+        if by == "hops":
+            return self._dijkstra(source, destination, lambda edge, total: 1.0)
+        return self._dijkstra(source, destination, lambda edge, total: edge.mean + 0.001)
+    
+    def most_common_path(self, source: str, destination: str) -> Optional[List[str]]:
+        """
+        Path most traces would follow between two nodes
+        
+        Each link is weighted by how often traces leaving its first node took
+        it, and the path maximising the product of those frequencies wins.
+        """
+        return self._dijkstra(source, destination, lambda edge, total: -math.log(edge.count / total))
+    
+    def observed_paths(self, target: str) -> List[Tuple[List[str], int]]:
+        """Distinct paths traced to target with how often each was seen, most frequent first"""
+        counts = self.paths.get(target, {})
+        return [([self.addresses[node] for node in path], count)
+                for path, count in sorted(counts.items(), key=lambda item: -item[1])]
+    
+    def route_change(self, target: str) -> List[Tuple[str, List[str], List[str]]]:
+        """Differences between the last two traces to target (empty when unchanged or traced once)"""
+        if target not in self.previous:
+            return []
+        return diff_paths([self.addresses[node] for node in self.previous[target]],
+                          [self.addresses[node] for node in self.latest[target]])
+    
+    def save(self, path: str) -> None:
+        """Write the graph to a JSON file, replacing it atomically"""
+        data = {
+            "version": FORMAT_VERSION,
+            "traces": self.traces,
+            "addresses": self.addresses,
+            "hostnames": {str(node): name for node, name in self.hostnames.items()},
+            "edges": [[source, destination, *edge.as_list()]
+                      for source, edges in enumerate(self.adjacency) for destination, edge in edges.items()],
+            "paths": {target: [[count, list(key)] for key, count in counts.items()]
+                      for target, counts in self.paths.items()},
+            "latest": {target: list(key) for target, key in self.latest.items()},
+            "previous": {target: list(key) for target, key in self.previous.items()}
+        }
+        temporary = f"{path}.tmp{os.getpid()}"
+        with open(temporary, "w") as output:
+            json.dump(data, output, separators=(",", ":"))
+        os.replace(temporary, path)
+    
+    @classmethod
+    def load(cls, path: str) -> "TopologyGraph":
+        """Read a graph written by save"""
+        with open(path) as source:
+            data = json.load(source)
+        if data.get("version") != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a compatible topology file")
+        graph = cls()
+        graph.traces = data["traces"]
+        graph.addresses = data["addresses"]
+        graph.ids = {address: node for node, address in enumerate(graph.addresses)}
+        graph.hostnames = {int(node): name for node, name in data["hostnames"].items()}
+        graph.adjacency = [{} for _ in graph.addresses]
+        graph.predecessors = [[] for _ in graph.addresses]
+        graph.departures = [0] * len(graph.addresses)
+        for source, destination, *values in data["edges"]:
+            edge = graph.adjacency[source][destination] = EdgeStats.from_list(values)
+            graph.predecessors[destination].append(source)
+            graph.departures[source] += edge.count
+        graph.paths = {target: {tuple(key): count for count, key in counts} for target, counts in data["paths"].items()}
+        graph.latest = {target: tuple(key) for target, key in data["latest"].items()}
+        graph.previous = {target: tuple(key) for target, key in data["previous"].items()}
+        return graph
\ No newline at end of file
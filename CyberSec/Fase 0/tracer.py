@@ -5,24 +5,38 @@ Handles network path discovery with hop-by-hop analysis
 
 import subprocess
 import platform
+import queue
+import socket
+import threading
 import time
-import random
-from typing import List, Dict, Optional, Tuple
+from typing import Callable, Iterator, List, Dict, Optional, Tuple
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich import box
+from path_monitor import HopStats, PathMonitor
+from probe_engine import ProbeBudget, ProbeEngine, StopSet
+from reverse_dns import ReverseDNS, is_ip_address
+from synthetic_topology import SyntheticTopology
+from topology import TopologyGraph
+from traceroute_parser import TracerouteParser, parse_traceroute_output
 
 console = Console()
 
 class Traceroute:
     """Handles traceroute functionality with cross-platform support"""
     
-    def __init__(self):
+    def __init__(self, reverse_dns: Optional[ReverseDNS] = None, engine: Optional[ProbeEngine] = None,
+                 topology: Optional[TopologyGraph] = None, synthetic: Optional[SyntheticTopology] = None):
         self.system = platform.system().lower()
         self.max_hops = 30
         self.timeout = 3
+        self.command_timeout = 30
+        self.engine = engine if engine is not None else ProbeEngine(self.max_hops, timeout=self.timeout)
+        self.reverse_dns = reverse_dns if reverse_dns is not None else ReverseDNS()
+        self.topology = topology if topology is not None else TopologyGraph()
+        self._synthetic = synthetic
     
     def trace_route(self, target: str, simulate: bool = False) -> List[Dict[str, any]]:
         """
@@ -43,48 +57,263 @@ class Traceroute:
         console.print()
         
         if simulate:
-            return self._simulate_traceroute(target)
+            hops = self._simulate_traceroute(target)
+        else:
+            hops = self._real_traceroute(target)
+        self.record_trace(target, hops)
+        return hops
+    
+    def record_trace(self, target: str, hops: List[Dict[str, any]]) -> None:
+        """Merge a trace into the topology graph, pointing out a changed route to the same target"""
+        if not hops:
+            return
+        self.topology.add_trace(target, hops)
+        for operation, old, new in self.topology.route_change(target):
+            console.print(f"[yellow]⚠️ Route to {target} changed: {' → '.join(old) or '(none)'} "
+                          f"became {' → '.join(new) or '(none)'}[/yellow]")
+    
+    def trace_many(self, targets: List[str], simulate: bool = False, rate: Optional[float] = None,
+                   concurrency: int = 8) -> Dict[str, List[Dict[str, any]]]:
+        """
+        Trace many targets concurrently, sharing the hops their paths have in common
+        
+        Args:
+            targets: Target IPs or domains
+            simulate: Whether to simulate the traceroutes
+            rate: Probes per second across all traces (unlimited when None)
+            concurrency: Traces in flight at once
+            
+        Returns:
+            Target -> list of hop information dictionaries
+        """
+        console.print(Panel.fit(
+            f"🗺️ [bold cyan]Multi-Target Traceroute[/bold cyan]\n"
+            f"Targets: [bold green]{len(targets)}[/bold green]  "
+            f"Probe rate: [bold yellow]{rate or 'unlimited'}[/bold yellow]",
+            border_style="cyan"
+        ))
+        console.print()
+        
+        if simulate:
+            results = self.synthetic.trace_many(targets)
         else:
-            return self._real_traceroute(target)
+            results = self._trace_many_real(targets, rate, concurrency)
+        
+        for target, hops in results.items():
+            self.record_trace(target, hops)
+        return results
+    
+    def _trace_many_real(self, targets: List[str], rate: Optional[float],
+                         concurrency: int) -> Dict[str, List[Dict[str, any]]]:
+        """Trace with the probe engine, one target at a time with the system command without raw sockets"""
+        engine = ProbeEngine(self.engine.max_hops, self.engine.probes_per_hop, self.engine.timeout,
+                             self.engine.send_interval, self.engine.base_port, self.engine.transport_factory,
+                             ProbeBudget(rate, burst=max(rate / 20, 1.0)) if rate else None)
+        stop_set = StopSet()
+        try:
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                console=console
+            ) as progress:
+                progress.add_task(f"Tracing {len(targets)} targets, {concurrency} at a time...", total=None)
+                started = time.perf_counter()
+                results = engine.trace_many(targets, concurrency, stop_set=stop_set)
+                elapsed = time.perf_counter() - started
+        except PermissionError:
+            console.print("[yellow]⚠️ Raw sockets need administrator rights, tracing one target at a time[/yellow]")
+            console.print()
+            results = {target: self._system_traceroute(target) for target in targets}
+        except OSError as e:
+            console.print(f"[red]❌ Error during traceroute: {e}[/red]")
+            results = {target: self._simulate_traceroute(target) for target in targets}
+        else:
+            console.print(f"[dim]{engine.probes_sent} probes in {elapsed:.1f}s, "
+                          f"{stop_set.hits} path prefixes reused from the stop set[/dim]")
+            console.print()
+            self.name_hops([hop for hops in results.values() for hop in hops])
+        return results
+    
+    def monitor(self, target: str, simulate: bool = False, rounds: Optional[int] = None,
+                interval: float = 1.0) -> List[HopStats]:
+        """
+        Probe the path to target repeatedly with live per-hop statistics, like mtr
+        
+        Args:
+            target: Target IP or domain
+            simulate: Whether to simulate the traceroutes
+            rounds: Traces to run (until Ctrl+C when None)
+            interval: Seconds between the starts of consecutive traces
+            
+        Returns:
+            Statistics of each hop on the latest path
+        """
+        console.print(Panel.fit(
+            f"📡 [bold cyan]Path Monitor[/bold cyan]\n"
+            f"Target: [bold green]{target}[/bold green]  Interval: [bold yellow]{interval:g}s[/bold yellow]\n"
+            f"[dim]Press Ctrl+C to stop[/dim]",
+            border_style="cyan"
+        ))
+        console.print()
+        
+        if simulate:
+            trace = lambda: self.synthetic.trace(target)
+        else:
+            try:
+                self.engine.resolve_target(target)
+            except socket.gaierror as e:
+                console.print(f"[red]❌ Cannot resolve {target}: {e}[/red]")
+                return []
+            trace = self._monitor_round(target)
+        
+        return PathMonitor(target, trace, self.max_hops).run(rounds, interval)
+    
+    def _monitor_round(self, target: str) -> Callable[[], List[Dict[str, any]]]:
+        """
+        One-trace function for the monitor: the probe engine, the system command
+        without raw sockets, and simulation when neither can run
+        """
+        mode = "engine"
+        
+        def trace() -> List[Dict[str, any]]:
+            nonlocal mode
+            if mode == "engine":
+                try:
+                    return self.name_hops(self.engine.trace(target))
+                except PermissionError:
+                    console.print("[yellow]⚠️ Raw sockets need administrator rights, using the traceroute command[/yellow]")
+                    mode = "command"
+                except OSError as e:
+                    console.print(f"[red]❌ Error during traceroute: {e}[/red]")
+                    mode = "command"
+            if mode == "command":
+                hops = []
+                try:
+                    for hop in self.stream_traceroute(target):
+                        hops.append(hop)
+                except subprocess.TimeoutExpired:
+                    pass  # Keep the hops seen so far for this round
+                except FileNotFoundError:
+                    console.print("[yellow]⚠️ Traceroute command not found, using simulation[/yellow]")
+                    mode = "simulate"
+                except OSError as e:
+                    console.print(f"[red]❌ Error during traceroute: {e}, using simulation[/red]")
+                    mode = "simulate"
+                if mode == "command":
+                    return self.name_hops(hops)
+            return self.synthetic.trace(target)
+        
+        return trace
     
     def _real_traceroute(self, target: str) -> List[Dict[str, any]]:
-        """Perform real traceroute using system command"""
+        """Perform real traceroute with the native probe engine, or the system command without raw sockets"""
+        try:
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                console=console
+            ) as progress:
+                progress.add_task(f"Probing up to {self.engine.max_hops} hops in parallel...", total=None)
+                hops = self.engine.trace(target)
+        except PermissionError:
+            console.print("[yellow]⚠️ Raw sockets need administrator rights, using the traceroute command[/yellow]")
+            console.print()
+            return self._system_traceroute(target)
+        except socket.gaierror as e:
+            console.print(f"[red]❌ Cannot resolve {target}: {e}[/red]")
+            return self._simulate_traceroute(target)
+        except OSError as e:
+            console.print(f"[red]❌ Error during traceroute: {e}[/red]")
+            return self._system_traceroute(target)
+        
+        return self.name_hops(hops)
+    
+    def _traceroute_command(self, target: str) -> List[str]:
+        """System traceroute command line for this OS"""
+        if self.system == "windows":
+            return ["tracert", "-h", str(self.max_hops), "-w", str(self.timeout * 1000), target]
+        return ["traceroute", "-m", str(self.max_hops), "-w", str(self.timeout), target]
+    
+    def stream_traceroute(self, target: str, timeout: Optional[float] = None) -> Iterator[Dict[str, any]]:
+        """
+        Run the system traceroute command and yield each hop as soon as its line is printed
+        
+        Output is read line by line on a background thread, so the caller is
+        never blocked for longer than the time left before the deadline.
+        ECMP responders printed on continuation lines are merged into the hop
+        already yielded, in place.
+        
+        Raises:
+            subprocess.TimeoutExpired: after the process is killed at the deadline;
+                hops yielded before that are complete and can be kept
+            FileNotFoundError: when the command is not installed
+        """
+        timeout = self.command_timeout if timeout is None else timeout
+        cmd = self._traceroute_command(target)
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                   stdin=subprocess.DEVNULL, text=True, bufsize=1)
+        lines: "queue.Queue[Optional[str]]" = queue.Queue()
+        
+        def read_lines() -> None:
+            for line in process.stdout:
+                lines.put(line)
+            lines.put(None)
+        
+        reader = threading.Thread(target=read_lines, name="traceroute-output", daemon=True)
+        reader.start()
+        parser = TracerouteParser()
+        deadline = time.monotonic() + timeout
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise subprocess.TimeoutExpired(cmd, timeout)
+                try:
+                    line = lines.get(timeout=remaining)
+                except queue.Empty:
+                    continue
+                if line is None:
+                    return
+                hop = parser.feed(line.rstrip("\r\n"))
+                if hop:
+                    yield hop
+        finally:
+            if process.poll() is None:
+                process.kill()
+            process.wait()
+            reader.join(timeout=1)
+            process.stdout.close()
+    
+    def _system_traceroute(self, target: str) -> List[Dict[str, any]]:
+        """Perform real traceroute using the system command, showing hops as they arrive"""
         hops = []
         
         try:
-            # Determine traceroute command based on OS
-            if self.system == "windows":
-                cmd = ["tracert", "-h", str(self.max_hops), "-w", str(self.timeout * 1000), target]
-            else:
-                cmd = ["traceroute", "-m", str(self.max_hops), "-w", str(self.timeout), target]
-            
-            console.print(f"[dim]Executing: {' '.join(cmd)}[/dim]")
+            console.print(f"[dim]Executing: {' '.join(self._traceroute_command(target))}[/dim]")
             console.print()
             
-            # Execute traceroute
             with Progress(
                 SpinnerColumn(),
                 TextColumn("[progress.description]{task.description}"),
                 console=console
             ) as progress:
                 task = progress.add_task("Tracing route...", total=None)
-                
-                result = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    text=True,
-                    timeout=30
-                )
-                
-                progress.update(task, description="Parsing results...")
-                time.sleep(1)
-            
-            # Parse output
-            hops = self._parse_traceroute_output(result.stdout, result.stderr)
+                for hop in self.stream_traceroute(target):
+                    hops.append(hop)
+                    if is_ip_address(hop["ip"]):
+                        self.reverse_dns.submit(hop["ip"])  # Collected by name_hops at the end
+                    latency = f"{hop['latency']:.1f} ms" if hop["latency"] else "*"
+                    progress.console.print(f"  [cyan]{hop['hop_number']:>2}[/cyan]  {hop['ip']:<40} {latency}")
+                    progress.update(task, description=f"Tracing route... hop {hop['hop_number']}")
+            console.print()
             
         except subprocess.TimeoutExpired:
-            console.print("[red]❌ Traceroute timed out[/red]")
-            return self._simulate_traceroute(target)
+            if not hops:
+                console.print("[red]❌ Traceroute timed out[/red]")
+                return self._simulate_traceroute(target)
+            console.print(f"[yellow]⚠️ Traceroute timed out after {self.command_timeout}s, "
+                          f"keeping the {len(hops)} hops found so far[/yellow]")
+            console.print()
         except FileNotFoundError:
             console.print("[yellow]⚠️ Traceroute command not found, using simulation[/yellow]")
             return self._simulate_traceroute(target)
@@ -92,6 +321,19 @@ class Traceroute:
             console.print(f"[red]❌ Error during traceroute: {e}[/red]")
             return self._simulate_traceroute(target)
         
+        return self.name_hops(hops)
+    
+    def name_hops(self, hops: List[Dict[str, any]], timeout: Optional[float] = None) -> List[Dict[str, any]]:
+        """
+        Fill in hostnames of hops only known by address with concurrent PTR lookups
+        
+        All hops share one time budget; hops whose lookup has not finished keep
+        their address as hostname.
+        """
+        unnamed = [hop for hop in hops if hop.get("hostname", hop["ip"]) == hop["ip"] and is_ip_address(hop["ip"])]
+        names = self.reverse_dns.lookup_many((hop["ip"] for hop in unnamed), timeout)
+        for hop in unnamed:
+            hop["hostname"] = names.get(hop["ip"]) or hop["ip"]
         return hops
     
     def _simulate_traceroute(self, target: str) -> List[Dict[str, any]]:
@@ -126,83 +368,22 @@ class Traceroute:
     
     def _generate_hop_sequence(self, target: str) -> List[Dict[str, any]]:
         """Generate realistic hop sequence for simulation"""
-        hops = []
-        
-        # Common network topology simulation
-        network_path = [
-            {"ip": "192.168.1.1", "hostname": "router.local", "latency": 1.2, "ttl": 64},
-            {"ip": "10.0.0.1", "hostname": "gateway.isp.com", "latency": 5.8, "ttl": 63},
-            {"ip": "172.16.0.1", "hostname": "core-router.isp.com", "latency": 12.3, "ttl": 62},
-            {"ip": "203.0.113.1", "hostname": "border-router.isp.com", "latency": 18.7, "ttl": 61},
-            {"ip": "198.51.100.1", "hostname": "peering-router.isp.com", "latency": 25.4, "ttl": 60},
-            {"ip": "203.0.113.254", "hostname": "transit-router.net", "latency": 32.1, "ttl": 59},
-            {"ip": "198.51.100.254", "hostname": "backbone-router.net", "latency": 45.6, "ttl": 58},
-            {"ip": "192.0.2.1", "hostname": "destination-router.com", "latency": 52.3, "ttl": 57},
-            {"ip": target, "hostname": target, "latency": 58.9, "ttl": 56}
-        ]
-        
-        # Add some randomness and packet loss simulation
-        for i, hop in enumerate(network_path):
-            # Simulate occasional packet loss
-            if random.random() < 0.1:  # 10% chance of packet loss
-                hop["status"] = "*"
-                hop["latency"] = None
-            else:
-                hop["status"] = "OK"
-                # Add some latency variation
-                hop["latency"] += random.uniform(-2, 2)
-                hop["latency"] = max(0.1, hop["latency"])
-            
-            hop["hop_number"] = i + 1
-            hops.append(hop)
-        
-        return hops
+        return self.synthetic.trace(target)
+    
+    @property
+    def synthetic(self) -> SyntheticTopology:
+        """Synthetic router graph simulated traces are routed through, built on first use"""
+        if self._synthetic is None:
+            self._synthetic = SyntheticTopology()
+        return self._synthetic
     
     def _parse_traceroute_output(self, stdout: str, stderr: str) -> List[Dict[str, any]]:
-        """Parse traceroute command output"""
-        hops = []
-        lines = stdout.split('\n')
-        
-        for line in lines:
-            line = line.strip()
-            if not line or line.startswith('traceroute') or line.startswith('tracert'):
-                continue
-            
-            # Parse hop information (simplified parsing)
-            hop_info = self._parse_hop_line(line)
-            if hop_info:
-                hops.append(hop_info)
-        
-        return hops
+        """Parse traceroute or tracert command output"""
+        return parse_traceroute_output(stdout)
     
     def _parse_hop_line(self, line: str) -> Optional[Dict[str, any]]:
-        """Parse a single hop line from traceroute output"""
-        try:
-            # This is a simplified parser - real implementation would be more robust
-            parts = line.split()
-            if len(parts) < 2:
-                return None
-            
-            hop_num = int(parts[0])
-            ip = parts[1]
-            
-            # Extract latency if available
-            latency = None
-            for part in parts[2:]:
-                if part.replace('.', '').replace('ms', '').isdigit():
-                    latency = float(part.replace('ms', ''))
-                    break
-            
-            return {
-                "hop_number": hop_num,
-                "ip": ip,
-                "hostname": ip,  # Simplified
-                "latency": latency,
-                "status": "OK" if latency else "*",
-                "ttl": 64 - hop_num
-            }
-        except:
-            return None
+        """Parse a single hop line from traceroute output (None when it is not one)"""
+        return TracerouteParser().feed(line)
     
     def display_traceroute_results(self, hops: List[Dict[str, any]]) -> None:
         """Display traceroute results in a formatted table"""
@@ -246,6 +427,32 @@ class Traceroute:
                          f"average latency: {avg_latency:.1f}ms[/dim]")
             console.print()
     
+    def display_trace_many_results(self, results: Dict[str, List[Dict[str, any]]]) -> None:
+        """Display one summary row per traced target"""
+        if not results:
+            console.print("[red]❌ No traceroute data available[/red]")
+            return
+        
+        table = Table(title="🗺️ Multi-Target Traceroute Results", box=box.ROUNDED)
+        table.add_column("Target", style="cyan", no_wrap=True)
+        table.add_column("Hops", justify="right")
+        table.add_column("Last Hop", style="green")
+        table.add_column("Latency (ms)", style="yellow", justify="right")
+        table.add_column("Shared Hops", style="magenta", justify="right")
+        
+        for target, hops in results.items():
+            last = hops[-1] if hops else None
+            table.add_row(
+                target,
+                str(len(hops)),
+                last.get("hostname") or last["ip"] if last else "-",
+                f"{last['latency']:.1f}" if last and last["latency"] else "*",
+                str(sum(1 for hop in hops if hop.get("shared")))
+            )
+        
+        console.print(table)
+        console.print()
+    
     def analyze_network_path(self, hops: List[Dict[str, any]]) -> None:
         """Analyze the network path and provide insights"""
         if not hops:
@@ -0,0 +1,199 @@
+"""
+Traceroute Parser Module for Packet Odyssey
+Parses Unix traceroute and Windows tracert output into hop dictionaries
+"""
+
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# One probe result: responder address (None when lost), its name, RTT in ms, unreachable flag
+Probe = Tuple[Optional[str], Optional[str], Optional[float], str]
+
+_HOP_NUMBER = re.compile(r"\s*(\d+)\s+(.*)")
+# Tokens of a Unix traceroute hop: "name (address)", "12.3 ms", "!H", "*" or a bare address
+_UNIX_TOKEN = re.compile(
+    r"(?P<name>[^\s()]+)\s+\((?P<address>[^()\s]+)\)"
+    r"|(?P<rtt>\d+(?:\.\d+)?)\s*ms\b"
+    r"|(?P<flag>!\S*)"
+    r"|(?P<star>\*)"
+    r"|(?P<bare>\S+)"
+)
+_TRACERT_RTT = r"(<?\d+)\s*ms|\*"
+_TRACERT_HOP = re.compile(rf"\s*(\d+)\s+(?:{_TRACERT_RTT})\s+(?:{_TRACERT_RTT})\s+(?:{_TRACERT_RTT})\s+(.*)")
+_TRACERT_RESPONDER = re.compile(r"(?:(\S+)\s+\[([^\]\s]+)\]|([0-9A-Fa-f.:]+))(?:\s+reports:\s*(.*))?")
+_TRACERT_REPORT = re.compile(r"\s*(\d+)\s+(?:(\S+)\s+\[([^\]\s]+)\]|([0-9A-Fa-f.:]+))\s+reports:\s*(.*)")
+_TRACE_HEADER = re.compile(r"\s*(?:traceroute6?\s+to|Tracing\s+route\s+to)\s+(\S+)", re.IGNORECASE)
+
+# tracert "reports:" messages and the flag Unix traceroute would print for them
+_TRACERT_FLAGS = (("net unreachable", "!N"), ("host unreachable", "!H"), ("protocol unreachable", "!P"),
+                  ("port unreachable", ""))
+
+def _tracert_flag(report: Optional[str]) -> str:
+    if not report:
+        return ""
+    report = report.lower()
+    for message, flag in _TRACERT_FLAGS:
+        if message in report:
+            return flag
+    return "!X"
+
+def _tracert_rtt(value: Optional[str]) -> Optional[float]:
+    # "<1 ms" is reported as its 1 ms upper bound
+    return float(value.lstrip("<")) if value is not None else None
+
+def build_hop(hop_number: int, probes: List[Probe]) -> Dict[str, Any]:
+    """
+    Hop dictionary from its probe results, in the same shape as ProbeEngine's
+    
+    The address answering most probes becomes the hop's ip; others (ECMP
+    paths) are listed under alternates with their names in alternate_names.
+    """
+    names: Dict[str, str] = {}
+    responders: Dict[str, int] = {}
+    rtts: List[Optional[float]] = []
+    times: List[float] = []
+    flag = ""
+    for address, name, rtt, probe_flag in probes:
+        rtts.append(rtt)
+        if rtt is not None:
+            times.append(rtt)
+        if address is not None:
+            responders[address] = responders.get(address, 0) + 1
+            if name and name != address and address not in names:
+                names[address] = name
+        if probe_flag and not flag:
+            flag = probe_flag
+    ip = max(responders, key=responders.__getitem__) if responders else "*"
+    hop = {
+        "hop_number": hop_number,
+        "ip": ip,
+        "hostname": names.get(ip, ip),
+        "latency": sum(times) / len(times) if times else None,
+        "rtts": rtts,
+        "loss": 1 - len(times) / len(probes) if probes else 1.0,
+        "status": flag or ("OK" if times else "*"),
+        "ttl": 64 - hop_number
+    }
+    if len(responders) > 1:
+        hop["alternates"] = sorted(set(responders) - {ip})
+        hop["alternate_names"] = {address: names[address] for address in hop["alternates"] if address in names}
+    return hop
+
+def _unix_probes(text: str, probes: List[Probe]) -> None:
+    """Append the probes of a Unix hop line (after the hop number) to probes"""
+    address = name = None
+    for token in _UNIX_TOKEN.finditer(text):
+        kind = token.lastgroup
+        if kind == "rtt":
+            probes.append((address, name, float(token.group("rtt")), ""))
+        elif kind == "star":
+            probes.append((None, None, None, ""))
+        elif kind == "flag":
+            # Flags follow the RTT of the probe they belong to
+            if probes:
+                responder, responder_name, rtt, _ = probes[-1]
+                probes[-1] = (responder, responder_name, rtt, token.group("flag"))
+        elif kind == "address":  # lastgroup of "name (address)"
+            address, name = token.group("address"), token.group("name")
+        else:
+            address = name = token.group("bare")
+
+def _tracert_probes(match: "re.Match") -> Optional[List[Probe]]:
+    """Probes of a tracert hop line, or None when its tail is not a tracert responder"""
+    hop_text = match.group(5)
+    rtts = [_tracert_rtt(match.group(group)) for group in (2, 3, 4)]
+    responder = _TRACERT_RESPONDER.fullmatch(hop_text.rstrip(". "))
+    if responder is None:
+        # "Request timed out." and other messages: only valid when nothing answered
+        if any(rtt is not None for rtt in rtts):
+            return None
+        return [(None, None, None, "")] * 3
+    name, bracketed, bare, report = responder.groups()
+    address = bracketed or bare
+    flag = _tracert_flag(report)
+    return [(address, name or address, rtt, flag) if rtt is not None else (None, None, None, "") for rtt in rtts]
+
+class TracerouteParser:
+    """
+    Incremental parser for traceroute (Linux, BSD, macOS) and tracert (Windows) output
+    
+    Feed it lines as they arrive. Every probe on a hop line is kept: its RTT,
+    responder address and name, and any !H/!N style flag. BSD and macOS print
+    further ECMP responders of a hop on indented lines without a hop number;
+    those are merged into the hop they continue, updating it in place.
+    """
+    
+    def __init__(self):
+        self.current: Optional[Dict[str, Any]] = None
+        self._probes: List[Probe] = []
+    
+    def feed(self, line: str) -> Optional[Dict[str, Any]]:
+        """
+        Parse one output line
+        
+        Returns:
+            The hop the line starts, or None for headers, blank lines,
+            continuation lines and anything unrecognised
+        """
+        match = _TRACERT_HOP.fullmatch(line)
+        if match is not None:
+            probes = _tracert_probes(match)
+            if probes is not None:
+                return self._start(int(match.group(1)), probes)
+        match = _TRACERT_REPORT.fullmatch(line) if "reports:" in line else None
+        if match is not None:
+            hop_number, name, bracketed, bare, report = match.groups()
+            address = bracketed or bare
+            return self._start(int(hop_number), [(address, name or address, None, _tracert_flag(report))])
+        match = _HOP_NUMBER.fullmatch(line)
+        if match is not None:
+            probes: List[Probe] = []
+            _unix_probes(match.group(2), probes)
+            return self._start(int(match.group(1)), probes) if probes else None
+        
+        if self.current is not None and line[:1].isspace() and line.strip():
+            _unix_probes(line, self._probes)
+            self.current.update(build_hop(self.current["hop_number"], self._probes))
+        return None
+    
+    def _start(self, hop_number: int, probes: List[Probe]) -> Dict[str, Any]:
+        self._probes = probes
+        self.current = build_hop(hop_number, probes)
+        return self.current
+    
+    def parse(self, lines: Iterable[str]) -> List[Dict[str, Any]]:
+        """All hops in lines"""
+        hops = []
+        for line in lines:
+            hop = self.feed(line.rstrip("\r\n"))
+            if hop is not None:
+                hops.append(hop)
+        return hops
+
+def parse_traceroute_output(text: str) -> List[Dict[str, Any]]:
+    """Hops of one traceroute or tracert run's output"""
+    return TracerouteParser().parse(text.splitlines())
+
+def parse_traceroute_log(lines: Iterable[str]) -> Iterator[Tuple[Optional[str], List[Dict[str, Any]]]]:
+    """
+    Split an archive of concatenated traceroute runs into (target, hops) pairs
+    
+    Each "traceroute to" or "Tracing route to" header starts a new run; hops
+    before the first header are reported with target None.
+    """
+    target: Optional[str] = None
+    parser = TracerouteParser()
+    hops: List[Dict[str, Any]] = []
+    for line in lines:
+        line = line.rstrip("\r\n")
+        header = _TRACE_HEADER.match(line)
+        if header is not None:
+            if hops or target is not None:
+                yield target, hops
+            target, parser, hops = header.group(1).rstrip(","), TracerouteParser(), []
+            continue
+        hop = parser.feed(line)
+        if hop is not None:
+            hops.append(hop)
+    if hops or target is not None:
+        yield target, hops
\ No newline at end of file